@@ -1,10 +1,8 @@
-import cv2
-
 # Detector Settings
-DETECTOR_TYPE = 'yolo'  # 'mediapipe' or 'yolo'
+DETECTOR_TYPE = 'yolo'  # 'mediapipe', 'yolo', 'onnx' (YOLO11-Pose on ONNX Runtime) or 'vitpose'
 GPU_DEVICE = 'cuda:0'  # 'cuda:0', 'cuda:1', or 'cpu'
-YOLO_MODEL_SIZE = 'm'  # 'n' (nano), 's' (small), 'm' (medium), 'l' (large), 'x' (xlarge)
-VITPOSE_MODEL_PATH = 'checkpoints/vitpose-b.onnx'  # Legacy, kept for reference
+YOLO_MODEL_SIZE = 'auto'  # 'n' (nano), 's' (small), 'm' (medium), 'l' (large), 'x' (xlarge), or 'auto' (benchmark at startup)
+VITPOSE_MODEL_PATH = 'checkpoints/vitpose-b.onnx'  # --detector vitpose (scripts/download_vitpose.py)
 
 # System Constraints
 TARGET_FPS = 20
@@ -36,10 +34,142 @@ MIN_REPS_FOR_FATIGUE = 5
 SPEED_DROP_THRESHOLD = 0.5  # Relative drop threshold
 DANGER_LONG_BOTTOM_TIME = 7.0  # Seconds
 DANGER_RECOVERY_ATTEMPTS = 2
+NEAR_DANGER_RATIO = 0.7  # A metric at this fraction of its danger threshold counts as "near danger"
 
 # Consistency
 STATE_CONSISTENCY_WINDOW = 0.5  # Seconds to suppress short changes
 
+# Adaptive Inference Cadence (per-bench inference rate from bench activity)
+ADAPTIVE_CADENCE = True
+CADENCE_EMPTY_INTERVAL = 1.0  # Seconds between inferences when nobody is on the bench
+CADENCE_EMPTY_MISSES = 3  # Consecutive detections without a person before a bench counts as empty
+CADENCE_IDLE_INTERVAL = 0.25  # Racked bar / resting lifter
+CADENCE_IDLE_WINDOW = 2.0  # Bar must be still this long before a bench counts as idle
+CADENCE_IDLE_THRESHOLD = 0.02  # Max bar travel (relative height) within the idle window
+CADENCE_RACKED_MAX_Y = 0.4  # Bar above this line is racked (analyzer's stall zone starts here)
+
+# Motion Gate (skip inference on static ROIs, reuse previous keypoints)
+MOTION_GATE = True
+MOTION_THUMB_WIDTH = 64  # Width of the grayscale thumbnail used for differencing
+MOTION_PIXEL_DELTA = 12  # Gray-level change that counts as a changed pixel
+MOTION_MIN_CHANGED = 0.005  # Fraction of changed pixels that counts as motion
+MOTION_MAX_REUSE_SEC = 2.0  # Force a fresh inference at least this often
+
+# Keypoint Tracking between sparse detections (CPU-only machines)
+TRACKER_MODE = 'off'  # 'off', 'lk' (Lucas-Kanade optical flow) or 'kalman' (constant velocity)
+TRACKER_DETECT_INTERVAL = 5  # Run the pose model every N analyzed frames per bench
+TRACKER_MIN_CONFIDENCE = 0.5  # Below this, fall back to a full detection
+TRACKER_LK_SCALE = 0.5  # Downscale ROI before optical flow
+TRACKER_MAX_FB_ERROR = 1.5  # Forward-backward error (px at tracking scale) for a good point
+TRACKER_KALMAN_ACCEL = 1.0  # Process noise: expected bar acceleration (ROI units / s^2)
+TRACKER_KALMAN_MEAS_STD = 0.01  # Detection noise (ROI-normalized)
+TRACKER_KALMAN_MAX_STD = 0.08  # Position uncertainty at which confidence reaches 0 (0.5 at half)
+
+# Tight Crop (detect on the last person box + margin instead of the whole ROI)
+TIGHT_CROP = True
+TIGHT_CROP_MARGIN = 0.25  # Margin on each side, fraction of the person box size
+TIGHT_CROP_MIN_SIZE = 0.3  # Minimum crop size, fraction of the ROI size
+
+# ONNX Runtime Backends (--detector onnx: YOLO11-Pose without PyTorch, --detector vitpose)
+# Export with: python scripts/export_yolo_onnx.py [--int8 --calib-video VIDEO]
+ONNX_MODEL_PATH = 'checkpoints/yolo11m-pose.onnx'
+ONNX_INT8_MODEL_PATH = 'checkpoints/yolo11m-pose-int8.onnx'  # Static int8 quantized
+ONNX_USE_INT8 = False
+ONNX_INTRA_THREADS = 0  # Threads per operator (0 = one per physical core), both backends
+ONNX_INTER_THREADS = 1  # Parallel operators (1 = sequential graph execution)
+ONNX_CONF_THRESHOLD = 0.25  # Person score (ultralytics default)
+ONNX_IOU_THRESHOLD = 0.7  # NMS IoU (ultralytics default)
+VITPOSE_MAX_BATCH = 6  # Bench crops per ViTPose session call (one per bench)
+VITPOSE_PERSON_THRESHOLD = 0.3  # Mean keypoint confidence below this = no person in the crop
+
+# Two-stage Top-down Pipeline (person boxes at a low rate, pose per box every frame)
+TOPDOWN_PERSON_MODEL = 'yolo11n.pt'  # Any ultralytics detect/pose weights
+TOPDOWN_PERSON_IMGSZ = 320  # Small: the lifter fills most of the ROI
+TOPDOWN_PERSON_CONF = 0.4
+TOPDOWN_REDETECT_SEC = 1.0  # Refresh each bench's box this often (boxes follow keypoints in between)
+
+# Model Size Calibration (YOLO_MODEL_SIZE = 'auto')
+CALIBRATION_SIZES = ('n', 's', 'm', 'l', 'x')  # Candidates, smallest first
+CALIBRATION_BUDGET = 0.6  # Fraction of the 1/TARGET_FPS frame period inference may use
+CALIBRATION_RUNS = 10  # Timed frames per model size (after warm-up)
+CALIBRATION_CACHE = 'checkpoints/model_calibration.json'  # Per machine + config results
+
+# Danger-priority Scheduling (order of bench inference when demand exceeds the budget)
+PRIORITY_SCHEDULING = True
+PRIORITY_BUDGET = 0.6  # Fraction of the 1/TARGET_FPS frame period spent on pose inference
+PRIORITY_STARVATION_SEC = 1.0  # A deferred bench is inferred after waiting this long, budget or not
+PRIORITY_TILT_RATE = 20.0  # Bar tilt rising faster than this (degrees/s) counts as urgent
+PRIORITY_TREND_SEC = 0.5  # Window for the tilt trend
+
+# Overload Load Shedding (degrade step by step when per-frame latency > MAX_LATENCY_SEC)
+LOAD_SHEDDING = True
+SHED_HIGH_RATIO = 1.0  # Step down while smoothed latency > this x MAX_LATENCY_SEC
+SHED_LOW_RATIO = 0.5  # Step back up while smoothed latency < this x MAX_LATENCY_SEC
+SHED_HOLD_SEC = 2.0  # Latency must stay over/under the limit this long per level change
+SHED_SMOOTHING = 0.2  # EMA weight of the newest latency sample
+SHED_NORMAL_INTERVAL = 0.2  # 'cadence' level: seconds between inferences for NORMAL benches
+SHED_IMGSZ = 480  # 'imgsz' level: YOLO inference size (default 640)
+
+# ROI Reconfiguration (edits applied as a diff, see BenchPipeline.set_rois)
+ROI_MATCH_OVERLAP = 0.5  # An edited ROI covering this much of an old one (or vice versa) keeps its history
+ROI_SAME_EPS = 1e-3  # ROIs closer than this (normalized) count as unchanged
+
+# Camera Profiles (source, bench ROIs, detector settings - resumed at startup)
+PROFILES_PATH = 'checkpoints/profiles.json'
+PROFILE_AUTOLOAD = True  # GUI: resume the last profile without dialogs
+
+# Startup
+STARTUP_PAINT_BUDGET_SEC = 3.0  # test_startup.py: process start -> first window paint
+
+# Playback Speed (recorded video in main.py and the GUI)
+PLAYBACK_SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)  # Above 1x skipped frames are grab()bed, not decoded
+
+# Seek Index (keyframes + frame timestamps of recorded video, built once and cached)
+SEEK_INDEX_SUFFIX = '.seekidx.npz'  # Sidecar next to the video: <video><suffix>
+SEEK_INDEX_DIR = 'checkpoints/seek_index'  # Used where the video's directory is read-only
+
+# Offline File Analysis (main.py --offline: every frame, media timestamps, no throttling)
+OFFLINE_QUEUE_SIZE = 32  # Frames decoded ahead of the pipeline
+OFFLINE_REPORT_DIR = 'reports'  # Per-video JSON reports
+OFFLINE_PROGRESS_SEC = 10.0  # Wall-clock seconds between progress lines
+
+# Batch Analysis (scripts/batch_analyze.py: a library of recorded clips through a process pool)
+BATCH_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v')
+BATCH_WORKER_MEMORY_MB = 1500  # RAM per worker (decoder + model); caps the default pool size
+BATCH_OUTPUT_DIR = 'reports/batch'
+
+# Segment-parallel Analysis (one long video split across processes, main.py --offline --segments N)
+SEGMENT_WARMUP_SEC = 12.0  # Frames analyzed before each segment, unreported (never below BUFFER_SIZE_SEC)
+SEGMENT_MIN_SEC = 60.0  # Shortest segment worth a process
+
+# Multiprocess Inference Pool (CPU machines with many cores)
+INFERENCE_WORKERS = 0  # 0 = infer in the processing thread; N = N worker processes
+INFERENCE_RING_SLOTS = 4  # Frames held in the shared-memory ring
+INFERENCE_TIMEOUT_SEC = 5.0  # Per-shard deadline; a worker that misses it (hung or dead) is restarted
+
+# Remote Inference (offload pose inference to one machine on the LAN)
+REMOTE_INFERENCE_HOST = None  # e.g. '192.168.1.50'; None = infer locally
+REMOTE_PORT = 7860
+REMOTE_DEADLINE_SEC = 0.15  # Per-request budget; crops not answered in time are inferred locally
+REMOTE_CONNECTIONS = 2  # Persistent connections per client
+REMOTE_MAX_INFLIGHT = 8  # Pipelined requests per connection before the client waits
+REMOTE_ENCODING = 'jpeg'  # ROI crop encoding: 'jpeg' or 'raw'
+REMOTE_JPEG_QUALITY = 90
+REMOTE_RECONNECT_SEC = 2.0  # Min delay between reconnect attempts
+REMOTE_SERVER_QUEUE = 16  # Requests queued on the server before it stops reading (backpressure)
+
+# Split-process Deployment (gui_app.py --split)
+STAGE_RING_SLOTS = 4  # Frames in the capture ring shared by inference and GUI
+STAGE_QUEUE_SIZE = 8  # Pending keypoint/state messages; producers drop instead of blocking
+STAGE_OPEN_TIMEOUT_SEC = 10.0  # GUI wait for the capture ring after selecting a source
+SUPERVISOR_POLL_SEC = 0.5  # Stage health check interval
+SUPERVISOR_RESTART_DELAY = 1.0  # Delay before restarting a crashed stage
+
+# Profiling (Chrome Trace Event export, open in chrome://tracing or Perfetto)
+TRACE_ENABLED = False  # Record per-frame spans for capture/worker/GUI threads
+TRACE_MAX_EVENTS = 20000  # Bounded window - oldest events are dropped
+TRACE_OUTPUT = 'pipeline_trace.json'
+
 # ROI Defaults (normalized 0-1) - This would ideally be set via UI
 DEFAULT_ROI = {
     "x": 0.2,
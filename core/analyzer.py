@@ -1,28 +1,26 @@
-import time
-import sys
-import os
 import math
 import numpy as np
 
-# Add parent dir to path to allow imports if run directly
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-if parent_dir not in sys.path:
-    sys.path.append(parent_dir)
-
-from config import *
+from config import (
+    TARGET_FPS, BUFFER_SIZE_SEC, TILT_THRESHOLD, DANGER_SHAKE_PCT,
+    DANGER_DROP_VELOCITY_THRESHOLD, DANGER_STALL_TIME, DANGER_LONG_BOTTOM_TIME,
+    NEAR_DANGER_RATIO, STATE_CONSISTENCY_WINDOW, PRIORITY_TILT_RATE, PRIORITY_TREND_SEC
+)
 from core.temporal_buffer import TemporalBuffer
-from utils.geometry import calculate_horizontal_tilt, calculate_distance
+from utils.geometry import calculate_horizontal_tilt, calculate_distance, remap_point
 
 from core.barbell import Barbell
+from core.clock import wall_clock
 
 class BenchPressAnalyzer:
-    def __init__(self, fps=TARGET_FPS):
+    def __init__(self, fps=TARGET_FPS, clock=None):
         self.fps = fps
+        self.clock = clock or wall_clock  # "Now" when analyze() gets no timestamp
         self.history = TemporalBuffer(maxlen=int(BUFFER_SIZE_SEC * fps))
         self.state = "NORMAL"
         self.last_state_change = 0
         self.danger_reason = ""
+        self.metrics = {}  # Latest measurements, used by near_danger()
         
         self.barbell = Barbell()
         
@@ -31,7 +29,7 @@ class BenchPressAnalyzer:
         Analyzes the current frame landmarks to determine state.
         Returns (state, reason, metrics).
         """
-        current_time = timestamp if timestamp is not None else time.time()
+        current_time = timestamp if timestamp is not None else self.clock.time()
         
         if not landmarks:
             return self.update_state("NORMAL", "No Detection", current_time)
@@ -48,6 +46,7 @@ class BenchPressAnalyzer:
         }
         
         self.history.add(current_data)
+        self.metrics = dict(current_data)
         
         # 1. Check Loss of Stability (Immediate)
         if current_data['tilt'] > TILT_THRESHOLD:
@@ -69,12 +68,15 @@ class BenchPressAnalyzer:
         # Or better stick to shoulders as per original logic to avoid breaking change in logic behavior?
         # Let's use shoulders to be safe unless user insists.
         shoulder_width = abs(landmarks[11]['x'] - landmarks[12]['x'])
+        self.metrics['shake'] = shake
+        self.metrics['shake_limit'] = shoulder_width * DANGER_SHAKE_PCT
         
         if shake > (shoulder_width * DANGER_SHAKE_PCT):
             return self.update_state("DANGER", f"Unstable: Shake {shake:.3f} > {shoulder_width*DANGER_SHAKE_PCT:.3f}", current_time)
 
         # 2. Check Uncontrolled Drop (Velocity based)
         velocity = self.history.get_average_velocity(0.5, self.fps)
+        self.metrics['velocity'] = velocity
         if velocity > DANGER_DROP_VELOCITY_THRESHOLD: 
              return self.update_state("DANGER", f"Drop detected: Vel {velocity:.2f}", current_time)
 
@@ -90,8 +92,74 @@ class BenchPressAnalyzer:
         
         return self.update_state("NORMAL", "", current_time)
 
+    def near_danger(self, ratio=NEAR_DANGER_RATIO):
+        """
+        Checks if the bench is in DANGER or close to any danger threshold.
+        A metric is "close" once it reaches `ratio` of its threshold.
+        """
+        if self.state == "DANGER":
+            return True
+        
+        m = self.metrics
+        if not m:
+            return False
+        
+        if m['tilt'] > TILT_THRESHOLD * ratio:
+            return True
+        if 'shake' in m and m['shake'] > m['shake_limit'] * ratio:
+            return True
+        if m.get('velocity', 0) > DANGER_DROP_VELOCITY_THRESHOLD * ratio:
+            return True
+        if m['y'] > 0.4 and self.history.is_stagnant(DANGER_STALL_TIME * ratio, self.fps, threshold=0.03):
+            return True
+        
+        return False
+
+    def tilt_rising(self, seconds=PRIORITY_TREND_SEC, rate=PRIORITY_TILT_RATE):
+        """
+        Checks if the barbell tilt grew faster than `rate` degrees per second
+        over the last `seconds` (a bar starting to tip before it crosses
+        TILT_THRESHOLD).
+        """
+        data = self.history.get_last(seconds, self.fps)
+        if len(data) < 2:
+            return False
+        
+        duration = data[-1]['time'] - data[0]['time']
+        if duration <= 0:
+            return False
+        return (data[-1]['tilt'] - data[0]['tilt']) / duration > rate
+
+    def remap(self, old_roi, new_roi):
+        """
+        Re-express history and latest measurements in a moved/resized ROI,
+        so an edited bench keeps its buffer instead of starting cold.
+        """
+        kx = old_roi['w'] / new_roi['w']
+        ky = old_roi['h'] / new_roi['h']
+        
+        def tilt(angle):
+            # Scaling x and y differently changes the bar angle too
+            rad = math.radians(angle)
+            return abs(math.degrees(math.atan2(math.sin(rad) * ky, math.cos(rad) * kx)))
+        
+        for sample in self.history.buffer:
+            sample['x'], sample['y'] = remap_point(sample['x'], sample['y'], old_roi, new_roi)
+            sample['tilt'] = tilt(sample['tilt'])
+        
+        m = self.metrics
+        if m:
+            m['x'], m['y'] = remap_point(m['x'], m['y'], old_roi, new_roi)
+            m['tilt'] = tilt(m['tilt'])
+            for key, scale in (('shake', kx), ('shake_limit', kx), ('velocity', ky)):
+                if key in m:
+                    m[key] *= scale
+        
+        # Keypoints from the old crop are not valid in the new one
+        self.barbell = Barbell()
+
     def update_state(self, new_state, reason, timestamp=None):
-        now = timestamp if timestamp is not None else time.time()
+        now = timestamp if timestamp is not None else self.clock.time()
         
         # Consistency Filter
         if new_state != self.state:
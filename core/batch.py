@@ -0,0 +1,451 @@
+"""
+Batch analysis of recorded session videos across a process pool.
+
+QA re-validates every rules change against a library of labelled clips.
+run_batch() analyzes each video with core.offline.analyze_video() in a pool
+of spawned worker processes; every worker loads its detector once and then
+decodes and analyzes whole videos, one at a time. The pool is sized to the
+cores and the available memory (BATCH_WORKER_MEMORY_MB per worker).
+
+Output directory:
+
+    <name>.json         per-video report (core.offline format + source info)
+    <name>.events.csv   DANGER events: bench, start, end, duration, reason
+    summary.json / .csv per-video totals of the whole batch
+
+A video whose report exists and still matches the file (size, mtime), the
+ROIs and the analysis settings (detector, model size, tracker mode and the
+DANGER_*/TILT_* thresholds) is skipped, so an interrupted batch resumes
+where it stopped.
+
+analyze_segments() uses the same workers the other way round: one long
+video is split into time segments analyzed concurrently, each primed with a
+warm-up of at least BUFFER_SIZE_SEC, and the segments are merged into one
+event timeline identical to a sequential run.
+"""
+import csv
+import glob
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+
+import cv2
+
+import config
+from config import (
+    BATCH_VIDEO_EXTENSIONS, BATCH_WORKER_MEMORY_MB, BUFFER_SIZE_SEC,
+    SEGMENT_WARMUP_SEC, SEGMENT_MIN_SEC
+)
+from core.camera import VideoFileReader
+from core.offline import SessionReport, write_report
+from core.seek_index import load_index
+
+_worker = {}  # Per worker process: 'detector', 'person_detector', 'tracker_mode'
+
+
+def find_videos(patterns, extensions=BATCH_VIDEO_EXTENSIONS):
+    """
+    Expand directories (recursively) and glob patterns to video files.
+
+    Returns:
+        list: Absolute paths, sorted, without duplicates
+    """
+    videos = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*')
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path) and path.lower().endswith(extensions):
+                videos.add(os.path.abspath(path))
+    return sorted(videos)
+
+
+def output_names(videos):
+    """Report name per video: the file name, plus a path hash where names collide"""
+    stems = [os.path.splitext(os.path.basename(video))[0] for video in videos]
+    names = {}
+    for video, stem in zip(videos, stems):
+        if stems.count(stem) > 1:
+            stem = f"{stem}-{hashlib.sha1(video.encode()).hexdigest()[:8]}"
+        names[video] = stem
+    return names
+
+
+def settings_fingerprint(kind, model_size, tracker_mode):
+    """
+    Short hash of the settings besides the file and ROIs that change a report.
+
+    Args:
+        kind, model_size: Detector settings ('auto' must be resolved)
+        tracker_mode: KeypointTracker mode
+
+    Returns:
+        str: Hex digest of the detector settings and the DANGER_*/TILT_* thresholds
+    """
+    thresholds = {name: value for name, value in vars(config).items()
+                  if name.startswith(('DANGER_', 'TILT_'))}
+    settings = {'detector': kind, 'model_size': model_size, 'tracker_mode': tracker_mode,
+                'thresholds': thresholds}
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def source_info(video, rois, settings):
+    """What a finished report must match to be reused on resume (settings: settings_fingerprint())"""
+    stat = os.stat(video)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'rois': rois, 'settings': settings}
+
+
+def is_finished(report_file, video, rois, settings):
+    """True if report_file is a complete report of this video file with these ROIs and settings"""
+    try:
+        with open(report_file) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return report.get('source') == json.loads(json.dumps(source_info(video, rois, settings)))
+
+
+def pool_size(videos, requested=None, memory_mb=BATCH_WORKER_MEMORY_MB):
+    """
+    Number of worker processes.
+
+    Args:
+        videos: Number of videos to analyze
+        requested: Explicit worker count (None = from cores and memory)
+        memory_mb: Memory needed per worker
+
+    Returns:
+        int: At least 1, at most one per video
+    """
+    if requested:
+        return max(1, min(requested, videos))
+
+    workers = os.cpu_count() or 1
+    try:
+        available_mb = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 2**20
+        workers = min(workers, int(available_mb // memory_mb))
+    except (ValueError, OSError, AttributeError):
+        pass  # No sysconf (Windows): cores only
+    return max(1, min(workers, videos))
+
+
+def _init_worker(kind, device, model_size, tracker_mode, threads):
+    """Pool initializer: one detector per worker process, loaded once"""
+    # Limit intra-op threads before torch/onnxruntime are imported (see InferencePool)
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    import cv2
+    cv2.setNumThreads(1)
+
+    from core.detector_factory import create_detector, create_person_detector
+    _worker['tracker_mode'] = tracker_mode
+    try:
+        _worker['detector'] = create_detector(kind, device, model_size)
+        _worker['person_detector'] = create_person_detector(kind, device)
+    except Exception as e:
+        # Raising here would make the pool respawn workers forever
+        _worker['error'] = f"Detector failed to load: {type(e).__name__}: {e}"
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _analyze_task(task):
+    """Analyze one video in a worker; errors are returned, not raised, so the batch goes on"""
+    from core.offline import analyze_video
+
+    video, rois, report_file, settings = task
+    if 'error' in _worker:
+        return video, None, _worker['error']
+    try:
+        report = analyze_video(video, rois, _worker['detector'],
+                               person_detector=_worker['person_detector'],
+                               tracker_mode=_worker['tracker_mode'], progress_sec=0)
+    except Exception as e:
+        return video, None, f"{type(e).__name__}: {e}"
+
+    report['source'] = source_info(video, rois, settings)
+    write_report(report, report_file)
+    write_events(report, f"{os.path.splitext(report_file)[0]}.events.csv")
+    return video, report, None
+
+
+def write_events(report, path):
+    """DANGER event log of one video as CSV"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['bench', 'start', 'end', 'duration', 'reason'])
+        for event in report['events']:
+            writer.writerow([event['bench'], event['start'], event['end'],
+                             event['duration'], event['reason']])
+
+
+def summarize(report):
+    """One summary row per video"""
+    return {
+        'video': report['video'],
+        'frames': report['frames'],
+        'duration_sec': report['duration_sec'],
+        'processing_sec': report['processing_sec'],
+        'speed': report['speed'],
+        'danger_events': len(report['events']),
+        'danger_sec': round(sum(bench['danger_sec'] for bench in report['benches']), 3),
+        'benches_with_danger': sum(bench['danger_events'] > 0 for bench in report['benches'])
+    }
+
+
+def run_batch(videos, rois, out_dir, kind, device, model_size, tracker_mode,
+              workers=None, force=False):
+    """
+    Analyze videos in a process pool and write reports and a summary.
+
+    Args:
+        videos: Video file paths
+        rois: Normalized bench ROIs (the same camera setup for every video)
+        out_dir: Output directory
+        kind, device, model_size: Detector settings ('auto' must be resolved)
+        tracker_mode: KeypointTracker mode
+        workers: Worker processes (None = sized to cores and memory)
+        force: Re-analyze videos that already have a matching report
+
+    Returns:
+        dict: Batch summary ('videos', 'analyzed', 'skipped', 'failed', 'rows')
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = output_names(videos)
+    report_files = {video: os.path.join(out_dir, f"{names[video]}.json") for video in videos}
+
+    settings = settings_fingerprint(kind, model_size, tracker_mode)
+    todo = [video for video in videos
+            if force or not is_finished(report_files[video], video, rois, settings)]
+    skipped = len(videos) - len(todo)
+    if skipped:
+        print(f"[Batch] Resuming: {skipped} of {len(videos)} video(s) already analyzed")
+
+    failed = {}
+    if todo:
+        count = pool_size(len(todo), workers)
+        threads = max(1, (os.cpu_count() or 1) // count)
+        print(f"[Batch] Analyzing {len(todo)} video(s) with {count} worker(s), {threads} thread(s) each")
+
+        start = time.time()
+        ctx = mp.get_context('spawn')  # No forked CUDA state in workers
+        with ctx.Pool(count, initializer=_init_worker,
+                      initargs=(kind, device, model_size, tracker_mode, threads)) as pool:
+            tasks = [(video, rois, report_files[video], settings) for video in todo]
+            for done, (video, report, error) in enumerate(pool.imap_unordered(_analyze_task, tasks), 1):
+                if error is not None:
+                    failed[video] = error
+                    print(f"[Batch] {done}/{len(todo)} FAILED {os.path.basename(video)}: {error}")
+                else:
+                    print(f"[Batch] {done}/{len(todo)} {os.path.basename(video)}: "
+                          f"{len(report['events'])} DANGER event(s), {report['speed']}x real time")
+        print(f"[Batch] Done in {time.time() - start:.1f}s")
+
+    rows = []
+    for video in videos:
+        if video in failed:
+            rows.append({'video': video, 'error': failed[video]})
+            continue
+        with open(report_files[video]) as f:
+            rows.append(summarize(json.load(f)))
+
+    summary = {'videos': len(videos), 'analyzed': len(todo) - len(failed), 'skipped': skipped,
+               'failed': len(failed), 'rows': rows}
+    write_summary(summary, out_dir)
+    return summary
+
+
+def write_summary(summary, out_dir):
+    """summary.json and summary.csv (one row per video)"""
+    write_report(summary, os.path.join(out_dir, 'summary.json'))
+
+    fields = ['video', 'frames', 'duration_sec', 'processing_sec', 'speed',
+              'danger_events', 'danger_sec', 'benches_with_danger', 'error']
+    with open(os.path.join(out_dir, 'summary.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in summary['rows']:
+            writer.writerow(row)
+
+
+# --- Segment-parallel analysis of one long video -----------------------------
+
+def warmup_sec(warmup=SEGMENT_WARMUP_SEC):
+    """
+    Unreported lead-in before a segment, long enough to refill the analyzer.
+
+    The analyzers run at the video's frame rate, so their history always
+    spans BUFFER_SIZE_SEC of media time.
+    """
+    return max(warmup, BUFFER_SIZE_SEC)
+
+
+def plan_segments(duration, count, min_sec=SEGMENT_MIN_SEC):
+    """
+    Split [0, duration) into up to count equal segments of at least min_sec.
+
+    Returns:
+        list: (start, end) in seconds; the last end is None (to the end of
+              the file, whatever its exact length)
+    """
+    count = max(1, min(count, int(duration // min_sec)))
+    bounds = [duration * idx / count for idx in range(count)]
+    return [(start, bounds[idx + 1] if idx + 1 < count else None) for idx, start in enumerate(bounds)]
+
+
+def _snapshot(pipeline):
+    """Everything that carries over from one frame to the next in every-frame mode"""
+    return tuple(
+        (bench['state'], bench['reason'], bench.get('person_box'), bench['analyzer'].state,
+         bench['analyzer'].danger_reason, bench['analyzer'].last_state_change,
+         tuple(tuple(sorted(sample.items())) for sample in bench['analyzer'].history.buffer))
+        for bench in pipeline.benches
+    )
+
+
+def _segment_task(task):
+    """
+    Analyze one segment in a worker.
+
+    Frames before start only prime the analyzers. The pipeline state is
+    snapshotted after the first frame at or after start ('head') and after
+    the first frame at or after end ('tail', which is then not reported).
+    """
+    from core.offline import build_pipeline
+
+    path, rois, start, end, warmup = task
+    if 'error' in _worker:
+        return {'error': _worker['error']}
+
+    reader = VideoFileReader(path, start_sec=max(0.0, start - warmup)).start()
+    pipeline = build_pipeline(rois, _worker['detector'], _worker['person_detector'], fps=reader.fps,
+                              every_frame=True)
+    part = {'frames': [], 'head': None, 'tail': None, 'warmup': warmup}
+    try:
+        while True:
+            item = reader.read()
+            if item is None:
+                break
+            frame, timestamp = item
+            results = pipeline.process(frame, timestamp)
+            if timestamp < start:
+                continue
+            if end is not None and timestamp >= end:
+                part['tail'] = (timestamp, _snapshot(pipeline))
+                break
+            if part['head'] is None:
+                part['head'] = (timestamp, _snapshot(pipeline))
+            part['frames'].append((timestamp, [(result['id'], result['state'], result['reason'],
+                                                result['inferred']) for result in results]))
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    finally:
+        reader.stop()
+    part['stats'] = pipeline.stats()
+    return part
+
+
+def merge_segments(parts, rois):
+    """Replay the segments' frames, in order, into one SessionReport (as a sequential run feeds it)"""
+    report = SessionReport(rois)
+    for part in parts:
+        for timestamp, results in part['frames']:
+            report.add([{'id': bench_id, 'state': state, 'reason': reason, 'inferred': inferred}
+                        for bench_id, state, reason, inferred in results], timestamp)
+    return report
+
+
+def analyze_segments(path, rois, kind, device, model_size, segments, workers=None,
+                     warmup=SEGMENT_WARMUP_SEC):
+    """
+    Analyze one video as time segments in parallel processes.
+
+    Each segment seeks to its start minus the warm-up and analyzes every
+    frame (core.offline every_frame mode), reporting the frames of its own
+    time range. A segment is accepted when its pipeline state at its first
+    frame equals the previous segment's state at that same frame: from
+    there on both runs are the same computation, so the merged report is
+    the one a sequential every-frame run gives. Segments that do not match
+    (e.g. a state-change debounce still echoing from before the warm-up)
+    are re-run with twice the warm-up; at worst a segment warms up from the
+    start of the file.
+
+    Args:
+        path: Video file
+        rois: Normalized bench ROIs
+        kind, device, model_size: Detector settings ('auto' must be resolved)
+        segments: Number of segments (fewer if the video is short)
+        workers: Worker processes (None = sized to cores and memory)
+        warmup: Minimum warm-up in seconds (see warmup_sec)
+
+    Returns:
+        dict: Report in the core.offline format, plus 'segments' and
+              'reruns' (segments analyzed again with a longer warm-up)
+    """
+    # Index once here: the workers only load it, and seek by it to their warm-up start
+    index = load_index(path)
+    if index is not None:
+        video_fps, duration = index.fps, index.duration
+    else:
+        cap = cv2.VideoCapture(path)
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        video_fps = video_fps if 0 < video_fps <= 240 else 30.0
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        cap.release()
+        duration = frame_count / video_fps if frame_count > 0 else 0.0
+
+    plan = plan_segments(duration, segments)
+    lead = warmup_sec(warmup)
+    count = pool_size(len(plan), workers)
+    threads = max(1, (os.cpu_count() or 1) // count)
+    print(f"[Segments] {os.path.basename(path)}: {len(plan)} segment(s), {lead:.0f}s warm-up, "
+          f"{count} worker(s)")
+
+    start_time = time.perf_counter()
+    reruns = 0
+    ctx = mp.get_context('spawn')
+    with ctx.Pool(count, initializer=_init_worker,
+                  initargs=(kind, device, model_size, 'off', threads)) as pool:
+        todo = list(range(len(plan)))
+        parts = [None] * len(plan)
+        warmups = [lead] * len(plan)
+        while todo:
+            tasks = [(path, rois, plan[idx][0], plan[idx][1], warmups[idx]) for idx in todo]
+            for idx, part in zip(todo, pool.map(_segment_task, tasks)):
+                if 'error' in part:
+                    raise RuntimeError(f"Segment analysis of {path} failed: {part['error']}")
+                parts[idx] = part
+
+            # Segment 0 starts cold exactly like a sequential run
+            todo = [idx for idx in range(1, len(plan))
+                    if parts[idx]['head'] != parts[idx - 1]['tail'] and warmups[idx] < plan[idx][0]]
+            for idx in todo:
+                warmups[idx] *= 2
+            if todo:
+                reruns += len(todo)
+                print(f"[Segments] {len(todo)} segment(s) not converged at their start - "
+                      f"re-running with a longer warm-up")
+    elapsed = time.perf_counter() - start_time
+
+    report = merge_segments(parts, rois)
+    last = next((part['frames'][-1][0] for part in reversed(parts) if part['frames']), None)
+    duration = last + 1.0 / video_fps if last is not None else 0.0
+
+    result = {
+        'video': os.path.abspath(path),
+        'duration_sec': round(duration, 3),
+        'frames': sum(len(part['frames']) for part in parts),
+        'processing_sec': round(elapsed, 3),
+        'speed': round(duration / elapsed, 2) if elapsed > 0 else None,
+        'segments': len(plan),
+        'reruns': reruns
+    }
+    result.update(report.finish(duration))
+    result['stats'] = {key: sum(part['stats'][key] for part in parts)
+                       for key in ('inferred', 'skipped', 'tracked', 'person_detections')}
+    return result
@@ -0,0 +1,185 @@
+"""
+Automatic YOLO model-size selection (YOLO_MODEL_SIZE = 'auto').
+
+At startup each model size is timed on synthetic crops of the configured
+ROI sizes, one crop per bench, as the pipeline runs them on a frame where
+every bench needs inference. The largest size whose frame time fits
+CALIBRATION_BUDGET of the 1 / TARGET_FPS frame period is used.
+
+Results are cached in CALIBRATION_CACHE under a key of the machine (host,
+CPU, GPU) and the configuration (device, bench ROI sizes, TARGET_FPS,
+budget), so later startups with the same setup skip the benchmark.
+"""
+import hashlib
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from config import (
+    TARGET_FPS, YOLO_MODEL_SIZE, CALIBRATION_SIZES, CALIBRATION_BUDGET,
+    CALIBRATION_RUNS, CALIBRATION_CACHE
+)
+from utils.geometry import roi_to_pixels
+
+ROI_SIZE_STEP = 32  # ROI sizes are rounded to this many pixels for the cache key
+
+
+def machine_info(device):
+    """Identify the hardware the benchmark ran on"""
+    info = {
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'device': device
+    }
+    if 'cuda' in device.lower():
+        try:
+            import torch
+            index = int(device.split(':')[1]) if ':' in device else 0
+            info['gpu'] = torch.cuda.get_device_name(index)
+        except Exception:
+            info['gpu'] = None
+    return info
+
+
+def roi_sizes(rois, frame_w, frame_h):
+    """Pixel (w, h) of each ROI, rounded for stable cache keys"""
+    sizes = []
+    for roi in rois:
+        rect = roi_to_pixels(roi, frame_w, frame_h)
+        if rect is not None:
+            w, h = rect[2], rect[3]
+            sizes.append((max(ROI_SIZE_STEP, round(w / ROI_SIZE_STEP) * ROI_SIZE_STEP),
+                          max(ROI_SIZE_STEP, round(h / ROI_SIZE_STEP) * ROI_SIZE_STEP)))
+    return sorted(sizes)
+
+
+def cache_key(machine, sizes, fps, budget):
+    payload = json.dumps({'machine': machine, 'rois': sizes, 'fps': fps, 'budget': budget,
+                          'candidates': list(CALIBRATION_SIZES)}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path, cache):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+def time_model(model_size, device, sizes, runs=CALIBRATION_RUNS):
+    """
+    Median time to detect on one synthetic crop per bench.
+
+    Args:
+        model_size: YOLO size letter
+        device: 'cuda:0' or 'cpu'
+        sizes: (w, h) per bench
+        runs: Timed frames (after warm-up)
+
+    Returns:
+        float: Seconds per frame
+    """
+    from core.detector_yolo import YOLOPoseDetector
+
+    detector = YOLOPoseDetector(model_size=model_size, device=device)
+    rng = np.random.default_rng(0)
+    crops = [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for w, h in sizes]
+
+    for crop in crops[:1] * 3:  # Warm-up (CUDA context, cuDNN autotune)
+        detector.find_pose(crop)
+
+    frame_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for crop in crops:
+            detector.find_pose(crop)
+            detector.find_position(crop)
+        frame_times.append(time.perf_counter() - start)
+    return float(np.median(frame_times))
+
+
+def calibrate(sizes, device, fps=TARGET_FPS, budget=CALIBRATION_BUDGET):
+    """
+    Time model sizes from small to large and keep the largest that fits.
+
+    Args:
+        sizes: (w, h) per bench
+        device: 'cuda:0' or 'cpu'
+        fps: Target processing rate
+        budget: Fraction of the frame period inference may use
+
+    Returns:
+        (model_size, frame_ms): Chosen size and measured ms per frame for each tried size
+    """
+    budget_ms = 1000.0 * budget / fps
+    chosen, frame_ms = CALIBRATION_SIZES[0], {}
+
+    for model_size in CALIBRATION_SIZES:
+        frame_ms[model_size] = 1000.0 * time_model(model_size, device, sizes)
+        fits = frame_ms[model_size] <= budget_ms
+        print(f"[Calibration] yolo11{model_size}-pose: {frame_ms[model_size]:.1f} ms/frame "
+              f"for {len(sizes)} bench(es) (budget {budget_ms:.1f} ms) {'OK' if fits else 'too slow'}")
+        if not fits:
+            break  # Larger models are only slower
+        chosen = model_size
+
+    return chosen, frame_ms
+
+
+def resolve_model_size(rois, frame_w, frame_h, device, model_size=YOLO_MODEL_SIZE,
+                       cache_path=CALIBRATION_CACHE):
+    """
+    Model size to use: model_size itself, or the calibrated size if 'auto'.
+
+    Args:
+        rois: Normalized bench ROIs
+        frame_w, frame_h: Frame size in pixels
+        device: 'cuda:0' or 'cpu'
+        model_size: Configured size ('n'...'x' or 'auto')
+        cache_path: JSON cache of earlier calibrations
+
+    Returns:
+        str: Model size letter
+    """
+    if model_size != 'auto':
+        return model_size
+
+    sizes = roi_sizes(rois, frame_w, frame_h) or [(frame_w, frame_h)]
+    machine = machine_info(device)
+    key = cache_key(machine, sizes, TARGET_FPS, CALIBRATION_BUDGET)
+
+    cache = _load_cache(cache_path)
+    if key in cache:
+        chosen = cache[key]['model_size']
+        print(f"[Calibration] Cached: yolo11{chosen}-pose for {len(sizes)} bench(es) on {machine['device']}")
+        return chosen
+
+    print(f"[Calibration] Timing model sizes for {len(sizes)} bench(es) at {TARGET_FPS} FPS on {device}...")
+    chosen, frame_ms = calibrate(sizes, device)
+    print(f"[Calibration] Selected yolo11{chosen}-pose")
+
+    cache[key] = {
+        'model_size': chosen,
+        'frame_ms': {size: round(ms, 2) for size, ms in frame_ms.items()},
+        'machine': machine,
+        'rois': sizes,
+        'fps': TARGET_FPS,
+        'budget': CALIBRATION_BUDGET,
+        'calibrated': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+    _save_cache(cache_path, cache)
+    return chosen
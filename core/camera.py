@@ -1,11 +1,70 @@
 import cv2
-import time
+import os
+import queue
 import threading
 from collections import deque
 
+from config import OFFLINE_QUEUE_SIZE, PLAYBACK_SPEEDS
+from core.clock import wall_clock
+from core.seek_index import load_index
+from core.tracing import tracer
+
+def step_speed(speed, faster):
+    """Next playback speed up or down the PLAYBACK_SPEEDS ladder"""
+    if faster:
+        return next((s for s in PLAYBACK_SPEEDS if s > speed), PLAYBACK_SPEEDS[-1])
+    return next((s for s in reversed(PLAYBACK_SPEEDS) if s < speed), PLAYBACK_SPEEDS[0])
+
+
+def media_time(stream, fps):
+    """Media time (seconds) of the frame last read from a file capture"""
+    msec = stream.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0:
+        return msec / 1000.0
+    return max(0.0, stream.get(cv2.CAP_PROP_POS_FRAMES) - 1) / fps
+
+
+class PlaybackStepper:
+    """
+    Moves a file capture `speed` frames per playback step.
+
+    Only the last frame of a step is decoded with read(); the frames skipped
+    over are grab()bed, which demuxes and decodes but skips retrieve() and
+    the colour conversion. Below 1x some steps advance no frame at all.
+    """
+
+    def __init__(self):
+        self.credit = 0.0
+        self.skipped = 0
+
+    def read(self, stream, speed):
+        """
+        Args:
+            stream: cv2.VideoCapture of a file
+            speed: Frames to advance per step (fractions accumulate)
+
+        Returns:
+            (grabbed, frame): frame is None if no frame is due on this step;
+                              grabbed is False at the end of the file
+        """
+        self.credit += speed
+        count = int(self.credit)
+        if count == 0:
+            return True, None
+        self.credit -= count
+
+        for _ in range(count - 1):
+            if not stream.grab():
+                return False, None
+            self.skipped += 1
+        return stream.read()
+
+
 class CameraStream:
-    def __init__(self, src=0, name="Camera", width=1280, height=720):
+    def __init__(self, src=0, name="Camera", width=1280, height=720, start_sec=0.0, clock=None):
         self.src = src
+        # Frame times, throttling and latency; a MediaClock paces video files itself
+        self.clock = clock or wall_clock
         self.name = name
         self.width = width
         self.height = height
@@ -19,11 +78,18 @@ class CameraStream:
         self.frame = None
         self.stopped = False
         self.frame_count = 0
-        self.start_time = time.time()
+        self.start_time = self.clock.time()
         
         # Latency monitoring
         self.last_frame_time = 0
         
+        # Recorded video: playback speed and the media time of self.frame
+        self.speed = 1.0
+        self.media_time = 0.0
+        self.latest = (None, 0.0)
+        self.stepper = PlaybackStepper()
+        self.start_sec = start_sec  # Video files: begin playback here (seek index)
+        
         # Check if source is a local file (string and not RTSP/HTTP)
         self.is_file = False
         if isinstance(self.src, str):
@@ -33,9 +99,16 @@ class CameraStream:
     def start(self):
         """Starts the thread to read frames from the video stream."""
         if self.stream.isOpened():
+            if self.is_file and self.start_sec > 0:
+                self.seek(self.start_sec)
             self.grabbed, self.frame = self.stream.read()
+            if self.is_file:
+                self.media_time = media_time(self.stream, self.file_fps())
+                self.clock.tick(self.media_time)
+            self.latest = (self.frame, self.media_time)
+            self.start_time = self.clock.time()
             if self.grabbed:
-                t = threading.Thread(target=self.update, args=())
+                t = threading.Thread(target=self.update, args=(), name=f"CameraStream-{self.name}")
                 t.daemon = True
                 t.start()
                 return self
@@ -47,18 +120,25 @@ class CameraStream:
         # For files, we need to throttle to simulate stream
         chunk_delay = 0
         if self.is_file:
-            fps = self.stream.get(cv2.CAP_PROP_FPS)
-            if fps <= 0 or fps > 120: fps = 30
+            fps = self.file_fps()
             chunk_delay = 1.0 / fps
             
         while True:
-            start_read = time.time()
+            start_read = self.clock.time()
             
             if self.stopped:
                 self.stream.release()
                 return
 
-            grabbed, frame = self.stream.read()
+            with tracer.span("capture.read", "capture", frame=self.frame_count):
+                if self.is_file:
+                    grabbed, frame = self.stepper.read(self.stream, self.speed)
+                else:
+                    grabbed, frame = self.stream.read()
+            if grabbed and frame is None:
+                # Slow motion: no frame due on this step
+                self.clock.sleep(chunk_delay)
+                continue
             if not grabbed:
                 # Loop video for demo purposes? Or stop?
                 # User said "demo on available video", looping is usually better for kiosk/demo
@@ -69,35 +149,170 @@ class CameraStream:
             
             # Update the latest frame
             self.grabbed = grabbed
+            if self.is_file:
+                self.media_time = media_time(self.stream, fps)
+                self.clock.tick(self.media_time)
+                self.latest = (frame, self.media_time)
             self.frame = frame
             self.frame_count += 1
-            self.last_frame_time = time.time()
+            self.last_frame_time = self.clock.time()
             
             # Throttle if file
             if self.is_file:
-                process_time = time.time() - start_read
+                process_time = self.clock.time() - start_read
                 wait = chunk_delay - process_time
                 if wait > 0:
-                    time.sleep(wait)
+                    self.clock.sleep(wait)
             else:
                 # Simple sleep to prevent CPU hogging
-                time.sleep(0.001)
+                self.clock.sleep(0.001)
+
+    def file_fps(self):
+        fps = self.stream.get(cv2.CAP_PROP_FPS)
+        return fps if 0 < fps <= 120 else 30
+
+    def seek(self, seconds):
+        """Move a video file to the frame shown at a media time (before start())"""
+        index = load_index(self.src)
+        if index is not None:
+            index.seek(self.stream, index.frame_at(seconds))
+        else:
+            self.stream.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000.0)
 
     def read(self):
         """Returns the most recent frame."""
         return self.frame
 
+    def read_media(self):
+        """Most recent frame of a video file with its media time: (frame, seconds)"""
+        return self.latest
+
     def stop(self):
         """Indicate that the thread should be stopped."""
         self.stopped = True
 
     def get_fps(self):
         """Calculates actual FPS being received."""
-        elapsed = time.time() - self.start_time
+        elapsed = self.clock.time() - self.start_time
         if elapsed > 0:
             return self.frame_count / elapsed
         return 0
 
     def get_latency(self):
         """Returns time since last frame was received (in seconds)."""
-        return time.time() - self.last_frame_time
+        return self.clock.time() - self.last_frame_time
+
+
+class VideoFileReader:
+    """
+    Every frame of a video file, decoded ahead as fast as it is consumed.
+
+    Unlike CameraStream nothing is throttled or dropped: a decoder thread
+    fills a bounded queue and blocks while it is full. Each frame comes with
+    its media timestamp (CAP_PROP_POS_MSEC, or frame index / FPS where the
+    backend reports none), so analysis does not depend on wall clock.
+
+    start_sec / end_sec read one time range of the file (segment-parallel
+    analysis); timestamps stay those of the whole file. With a seek index
+    (core.seek_index) the start is found from the keyframe before it and
+    timestamps come from the index, so every segment worker sees the frames
+    and times a sequential read of the file gives.
+    """
+
+    def __init__(self, path, queue_size=OFFLINE_QUEUE_SIZE, start_sec=0.0, end_sec=None):
+        """
+        Args:
+            path: Video file
+            queue_size: Decoded frames held ahead of the consumer
+            start_sec: Seek here before decoding
+            end_sec: Stop at the first frame at or after this media time
+        """
+        self.path = path
+        self.stream = cv2.VideoCapture(path)
+        if not self.stream.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+
+        fps = self.stream.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if 0 < fps <= 240 else 30.0
+        self.index = load_index(path)
+        if self.index is not None:
+            self.frame_count = self.index.frame_count
+            self.duration = self.index.duration
+        else:
+            frames = self.stream.get(cv2.CAP_PROP_FRAME_COUNT)
+            self.frame_count = int(frames) if frames > 0 else None
+            self.duration = self.frame_count / self.fps if self.frame_count else None
+
+        self.start_index = 0
+        if start_sec > 0 and self.index is not None:
+            self.start_index = self.index.frame_at(start_sec)
+            self.index.seek(self.stream, self.start_index)
+        elif start_sec > 0:
+            self.stream.set(cv2.CAP_PROP_POS_FRAMES, int(round(start_sec * self.fps)))
+            self.start_index = int(self.stream.get(cv2.CAP_PROP_POS_FRAMES))
+        self.end_sec = end_sec
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        """Start decoding in the background"""
+        self.thread = threading.Thread(target=self.update, name=f"VideoFileReader-{os.path.basename(self.path)}",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def update(self):
+        index = self.start_index
+        last = None
+        while not self.stopped:
+            with tracer.span("capture.read", "capture", frame=index):
+                grabbed, frame = self.stream.read()
+            if not grabbed:
+                break
+            timestamp = self._timestamp(index, last)
+            if self.end_sec is not None and timestamp >= self.end_sec:
+                break
+            last = timestamp
+            index += 1
+            self._put((frame, timestamp))
+        self.stream.release()
+        self._put(None)
+
+    def _timestamp(self, index, last):
+        """Media time of the frame just decoded, strictly increasing"""
+        if self.index is not None and index < self.index.frame_count:
+            timestamp = self.index.timestamp(index)
+        else:
+            msec = self.stream.get(cv2.CAP_PROP_POS_MSEC)
+            timestamp = msec / 1000.0 if msec > 0 or index == 0 else index / self.fps
+        if last is not None and timestamp <= last:
+            timestamp = last + 1.0 / self.fps
+        return timestamp
+
+    def _put(self, item):
+        # Block while the consumer is behind, but notice stop()
+        while not self.stopped:
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(self):
+        """
+        Next frame in file order (waits for the decoder).
+
+        Returns:
+            (frame, timestamp) or None at the end of the file
+        """
+        if self.stopped:
+            return None
+        item = self.queue.get()
+        if item is None:
+            self.stopped = True
+        return item
+
+    def stop(self):
+        self.stopped = True
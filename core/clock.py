@@ -0,0 +1,115 @@
+"""
+Clocks for the components that need the current time.
+
+Analyzer debounce, capture latency, failure log timestamps and the GUI's
+PIP cycling all read "now" from a clock object instead of time.time(), so
+the same code runs on:
+
+    RealClock    wall clock (default everywhere)
+    MediaClock   media time of a recording, set by the source frame by
+                 frame; tick() can pace playback at `rate` x real time
+    ManualClock  advanced by hand (tests)
+
+A clock has time(), sleep(seconds) and tick(timestamp), which a
+recorded-video source calls with the media time of each frame it
+delivers. Durations measured on a media or manual clock are zero unless
+the source or the test moves it, so a run on recorded input does not
+depend on how fast the machine is: the same file gives the same results
+every time.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class RealClock:
+    """Wall clock"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def tick(self, timestamp):
+        """Media time does not move the wall clock"""
+
+    def isoformat(self):
+        """Current time for logs"""
+        return datetime.now().isoformat()
+
+
+class MediaClock:
+    """
+    Media time of a recording.
+
+    The source calls tick() with the timestamp of every frame it delivers.
+    With a rate, tick() holds the source back so media time runs at most
+    `rate` x real time (rate=50: an hour of video in 72 s); without one,
+    playback runs as fast as the pipeline takes frames.
+    """
+
+    def __init__(self, rate=None, origin=0.0):
+        """
+        Args:
+            rate: Playback pace in x real time (None = unthrottled)
+            origin: Epoch seconds of media time 0 (recording start), for
+                    log timestamps
+        """
+        self.rate = rate
+        self.origin = origin
+        self.now = 0.0
+        self.anchor = None  # (media time, wall time) the pacing is measured from
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def tick(self, timestamp):
+        """Advance to the media time of the next frame (waits if ahead of `rate`)"""
+        with self.lock:
+            if self.anchor is None or timestamp < self.anchor[0]:
+                self.anchor = (timestamp, time.perf_counter())  # First frame or a loop / seek back
+            self.now = timestamp
+            media_start, wall_start = self.anchor
+        if self.rate:
+            wait = wall_start + (timestamp - media_start) / self.rate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+    def sleep(self, seconds):
+        """Returns at once: media time only moves with frames, pacing is done in tick()"""
+
+    def isoformat(self):
+        return datetime.fromtimestamp(self.origin + self.now, timezone.utc).isoformat()
+
+
+class ManualClock:
+    """Clock that only moves when told to (deterministic tests)"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def set(self, timestamp):
+        self.now = timestamp
+
+    def tick(self, timestamp):
+        self.now = timestamp
+
+    def sleep(self, seconds):
+        """Sleeping moves the clock instead of waiting"""
+        if seconds > 0:
+            self.now += seconds
+
+    def isoformat(self):
+        return datetime.fromtimestamp(self.now, timezone.utc).isoformat()
+
+
+wall_clock = RealClock()  # Shared default
@@ -0,0 +1,114 @@
+"""
+Tight crop refinement around the tracked lifter.
+
+Bench ROIs are drawn generously, so most of each crop is floor and rack.
+Once a person has been detected, the next detection only sees the person's
+keypoint box plus a margin. Smaller input is cheaper to letterbox and gives
+distant benches more effective resolution. If the person is lost in the tight
+crop, detection is retried on the full ROI in the same frame.
+
+Landmarks detected on a tight crop are mapped back to ROI-normalized
+coordinates, so Barbell, the analyzer and the drawing code never see the
+difference.
+"""
+from config import TIGHT_CROP, TIGHT_CROP_MARGIN, TIGHT_CROP_MIN_SIZE
+
+MIN_VISIBILITY = 0.3
+
+
+class TightCropper:
+    """Chooses the detection window inside a bench ROI"""
+
+    def __init__(self, enabled=TIGHT_CROP, margin=TIGHT_CROP_MARGIN, min_size=TIGHT_CROP_MIN_SIZE):
+        """
+        Args:
+            enabled: Crop to the last person box (False = always full ROI)
+            margin: Margin added on each side, as a fraction of the box size
+            min_size: Minimum crop size as a fraction of the ROI size
+        """
+        self.enabled = enabled
+        self.margin = margin
+        self.min_size = min_size
+
+    def crop_rect(self, bench, roi_w, roi_h, force=False):
+        """
+        Pixel window (x, y, w, h) inside the ROI to run detection on.
+
+        Args:
+            bench: Bench dict (last box stored under 'person_box')
+            roi_w, roi_h: ROI size in pixels
+            force: Crop even if tight cropping is disabled (top-down pose models)
+
+        Returns:
+            tuple or None: Window, or None for the full ROI
+        """
+        box = bench.get('person_box')
+        if not (self.enabled or force) or box is None:
+            return None
+
+        x1, y1, x2, y2 = box
+        bw, bh = x2 - x1, y2 - y1
+
+        # Margin around the box, then enforce the minimum size around its center
+        x1 -= bw * self.margin
+        x2 += bw * self.margin
+        y1 -= bh * self.margin
+        y2 += bh * self.margin
+        x1, x2 = self._grow(x1, x2, self.min_size)
+        y1, y2 = self._grow(y1, y2, self.min_size)
+
+        px1 = max(0, int(x1 * roi_w))
+        py1 = max(0, int(y1 * roi_h))
+        px2 = min(roi_w, int(x2 * roi_w + 0.5))
+        py2 = min(roi_h, int(y2 * roi_h + 0.5))
+
+        if px2 - px1 >= roi_w and py2 - py1 >= roi_h:
+            return None
+        return px1, py1, px2 - px1, py2 - py1
+
+    @staticmethod
+    def _grow(lo, hi, min_size):
+        if hi - lo >= min_size:
+            return lo, hi
+        center = (lo + hi) / 2
+        return center - min_size / 2, center + min_size / 2
+
+    def update(self, bench, lm_list):
+        """
+        Store the person box from ROI-normalized landmarks (None if lost).
+
+        Args:
+            bench: Bench dict
+            lm_list: Landmarks in ROI-normalized coordinates
+        """
+        visible = [lm for lm in lm_list if lm.get('visibility', 0) > MIN_VISIBILITY]
+        if not visible:
+            bench['person_box'] = None
+            return
+
+        xs = [lm['x'] for lm in visible]
+        ys = [lm['y'] for lm in visible]
+        bench['person_box'] = (min(xs), min(ys), max(xs), max(ys))
+
+    def to_roi(self, lm_list, rect, roi_w, roi_h):
+        """
+        Map landmarks detected on a crop window back to ROI coordinates.
+
+        Args:
+            lm_list: Landmarks normalized to the crop window
+            rect: Crop window (x, y, w, h) in ROI pixels
+            roi_w, roi_h: ROI size in pixels
+
+        Returns:
+            list: New landmark dicts normalized to the ROI
+        """
+        cx, cy, cw, ch = rect
+        mapped = []
+        for lm in lm_list:
+            lm = dict(lm)
+            lm['x_px'] = cx + lm['x_px']
+            lm['y_px'] = cy + lm['y_px']
+            lm['x'] = (cx + lm['x'] * cw) / roi_w
+            lm['y'] = (cy + lm['y'] * ch) / roi_h
+            mapped.append(lm)
+        return mapped
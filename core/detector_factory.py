@@ -0,0 +1,73 @@
+"""
+Detector backends by name ('mediapipe', 'yolo', 'onnx', 'vitpose').
+
+Backends are described as ('module:ClassName', kwargs) so the same choice
+works in-process, in InferencePool workers (which import the class
+themselves) and as the local fallback of RemotePoseDetector.
+"""
+from config import (
+    DETECTOR_TYPE, GPU_DEVICE, YOLO_MODEL_SIZE, VITPOSE_MODEL_PATH,
+    DEFAULT_ROI, CAMERA_WIDTH, CAMERA_HEIGHT
+)
+from core.inference_pool import load_detector_class
+
+DETECTORS = {
+    'mediapipe': 'core.detector:PoseDetector',
+    'yolo': 'core.detector_yolo:YOLOPoseDetector',
+    'onnx': 'core.detector_onnx:YOLOOnnxPoseDetector',
+    'vitpose': 'core.detector_vitpose:ViTPoseDetector'
+}
+
+# Backends that output the 17 COCO keypoints (the rest use MediaPipe's 33)
+COCO_DETECTORS = ('yolo', 'onnx', 'vitpose')
+
+# Top-down backends expect one person per crop: BenchPipeline gets a PersonDetector
+TOPDOWN_DETECTORS = ('vitpose',)
+
+# The GUI draws COCO skeletons, so it runs a COCO backend
+GUI_DETECTOR = DETECTOR_TYPE if DETECTOR_TYPE in COCO_DETECTORS else 'yolo'
+
+
+def keypoint_count(kind):
+    """Keypoints per person a backend outputs (17 COCO or 33 MediaPipe)"""
+    return 17 if kind in COCO_DETECTORS else 33
+
+
+def detector_spec(kind=DETECTOR_TYPE, device=GPU_DEVICE, model_size=YOLO_MODEL_SIZE):
+    """
+    Args:
+        kind: Backend name, one of DETECTORS
+        device: 'cuda:0' or 'cpu' (ignored by MediaPipe)
+        model_size: YOLO size; 'auto' is calibrated for one DEFAULT_ROI bench
+                    (callers that know their ROIs resolve it first, see
+                    core.calibration.resolve_model_size)
+
+    Returns:
+        tuple: ('module:ClassName', constructor kwargs)
+    """
+    if kind == 'yolo':
+        if model_size == 'auto':
+            from core.calibration import resolve_model_size
+            model_size = resolve_model_size([DEFAULT_ROI], CAMERA_WIDTH, CAMERA_HEIGHT, device)
+        return DETECTORS[kind], {'model_size': model_size, 'device': device}
+    if kind == 'onnx':
+        return DETECTORS[kind], {'device': device}
+    if kind == 'vitpose':
+        return DETECTORS[kind], {'model_path': VITPOSE_MODEL_PATH, 'device': device}
+    if kind == 'mediapipe':
+        return DETECTORS[kind], {'detection_con': 0.7, 'track_con': 0.7}
+    raise ValueError(f"Unknown detector '{kind}', expected one of {list(DETECTORS)}")
+
+
+def create_detector(kind=DETECTOR_TYPE, device=GPU_DEVICE, model_size=YOLO_MODEL_SIZE):
+    """Build a detector in this process"""
+    path, kwargs = detector_spec(kind, device, model_size)
+    return load_detector_class(path)(**kwargs)
+
+
+def create_person_detector(kind=DETECTOR_TYPE, device=GPU_DEVICE):
+    """PersonDetector for top-down backends, None for the others"""
+    if kind not in TOPDOWN_DETECTORS:
+        return None
+    from core.person_detector import PersonDetector
+    return PersonDetector(device=device)
@@ -0,0 +1,274 @@
+import cv2
+import numpy as np
+import onnxruntime as ort
+from typing import List, Dict, Optional, Tuple
+
+from config import (
+    ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH, ONNX_USE_INT8,
+    ONNX_INTRA_THREADS, ONNX_INTER_THREADS, ONNX_CONF_THRESHOLD, ONNX_IOU_THRESHOLD
+)
+
+NUM_KEYPOINTS = 17
+LETTERBOX_COLOR = 114
+
+
+def letterbox(img: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize keeping aspect ratio and pad to a square, like ultralytics does.
+
+    Args:
+        img: BGR image
+        size: Model input size (square)
+        out: Optional preallocated (size, size, 3) uint8 buffer
+
+    Returns:
+        padded: (size, size, 3) BGR image
+        scale: Resize factor applied to img
+        pad: (pad_x, pad_y) offset of the image inside padded
+    """
+    h, w = img.shape[:2]
+    scale = min(size / w, size / h)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    if out is None:
+        out = np.empty((size, size, 3), dtype=np.uint8)
+    out[:] = LETTERBOX_COLOR
+    out[pad_y:pad_y+new_h, pad_x:pad_x+new_w] = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return out, scale, (pad_x, pad_y)
+
+
+def to_tensor(padded: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """BGR uint8 HWC -> RGB float32 1x3xHxW in [0, 1]"""
+    size = padded.shape[0]
+    if out is None:
+        out = np.empty((1, 3, size, size), dtype=np.float32)
+    # Reverse channels while transposing: BGR -> RGB planes
+    np.multiply(padded[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=out[0], casting='unsafe')
+    return out
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> List[int]:
+    """
+    Greedy non-maximum suppression.
+
+    Args:
+        boxes: (n, 4) xyxy boxes
+        scores: (n,) scores
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+
+    Returns:
+        list: Indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(int(i))
+        rest = order[1:]
+
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+def decode_pose(output: np.ndarray, conf_threshold: float, iou_threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode the raw YOLO11-Pose head.
+
+    Args:
+        output: (1, 5 + 17*3, anchors) model output - cx, cy, w, h, person
+                score, then x, y, visibility per keypoint (input pixels)
+        conf_threshold: Minimum person score
+        iou_threshold: NMS IoU threshold
+
+    Returns:
+        boxes: (n, 4) xyxy, scores: (n,), keypoints: (n, 17, 3) - sorted by score
+    """
+    pred = output[0].T  # (anchors, 56)
+    pred = pred[pred[:, 4] > conf_threshold]
+    if len(pred) == 0:
+        return np.zeros((0, 4)), np.zeros(0), np.zeros((0, NUM_KEYPOINTS, 3))
+
+    cx, cy, bw, bh = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+    scores = pred[:, 4]
+
+    keep = nms(boxes, scores, iou_threshold)
+    keypoints = pred[keep, 5:5 + NUM_KEYPOINTS * 3].reshape(-1, NUM_KEYPOINTS, 3)
+    return boxes[keep], scores[keep], keypoints
+
+
+class YOLOOnnxPoseDetector:
+    """
+    YOLO11-Pose on ONNX Runtime (CPU by default).
+    Same interface as YOLOPoseDetector, without importing PyTorch/ultralytics.
+    Export the model with scripts/export_yolo_onnx.py.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, device: str = 'cpu', int8: bool = ONNX_USE_INT8,
+                 intra_threads: int = ONNX_INTRA_THREADS, inter_threads: int = ONNX_INTER_THREADS,
+                 conf_threshold: float = ONNX_CONF_THRESHOLD, iou_threshold: float = ONNX_IOU_THRESHOLD):
+        """
+        Initialize ONNX YOLO11-Pose detector.
+
+        Args:
+            model_path: ONNX file (default: ONNX_MODEL_PATH, or ONNX_INT8_MODEL_PATH if int8)
+            device: 'cpu', or 'cuda:N' to use the CUDA execution provider when installed
+            int8: Use the statically quantized model
+            intra_threads: Threads inside one operator (0 = onnxruntime default)
+            inter_threads: Threads across independent operators
+            conf_threshold: Minimum person score
+            iou_threshold: NMS IoU threshold
+        """
+        if model_path is None:
+            model_path = ONNX_INT8_MODEL_PATH if int8 else ONNX_MODEL_PATH
+        self.model_path = model_path
+        self.device = device
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_threads
+        options.inter_op_num_threads = inter_threads
+        if inter_threads > 1:
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+
+        providers = []
+        if 'cuda' in device.lower() and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.append(('CUDAExecutionProvider', {
+                'device_id': int(device.split(':')[1]) if ':' in device else 0,
+            }))
+        providers.append('CPUExecutionProvider')
+
+        print(f"[YOLO-ONNX] Loading {model_path}")
+        print(f"[YOLO-ONNX] Providers: {providers}, threads: intra={intra_threads} inter={inter_threads}")
+
+        try:
+            self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+        except Exception as e:
+            print(f"[ERROR] Failed to load ONNX model: {e}")
+            print(f"[INFO] Export it first: python scripts/export_yolo_onnx.py")
+            raise
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        size = model_input.shape[2]
+        self.input_size = size if isinstance(size, int) else 640  # Dynamic export -> default size
+
+        # Preallocated letterbox and tensor buffers (reused every call)
+        self._padded = np.empty((self.input_size, self.input_size, 3), dtype=np.uint8)
+        self._tensor = np.empty((1, 3, self.input_size, self.input_size), dtype=np.float32)
+
+        # Keypoint IDs for barbell detection (COCO format)
+        self.LEFT_WRIST_ID = 9
+        self.RIGHT_WRIST_ID = 10
+        self.LEFT_SHOULDER_ID = 5
+        self.RIGHT_SHOULDER_ID = 6
+
+        self.keypoints = None
+        print(f"[YOLO-ONNX] Model loaded successfully. Input size: {self.input_size}")
+
+    def infer(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run the model and decode all people.
+
+        Args:
+            img: Input image BGR format
+
+        Returns:
+            boxes (n, 4) xyxy, scores (n,), keypoints (n, 17, 3) in img pixels
+        """
+        padded, scale, (pad_x, pad_y) = letterbox(img, self.input_size, self._padded)
+        tensor = to_tensor(padded, self._tensor)
+
+        output = self.session.run(None, {self.input_name: tensor})[0]
+        boxes, scores, keypoints = decode_pose(output, self.conf_threshold, self.iou_threshold)
+
+        # Undo the letterbox
+        boxes = (boxes - [pad_x, pad_y, pad_x, pad_y]) / scale
+        keypoints[..., 0] = (keypoints[..., 0] - pad_x) / scale
+        keypoints[..., 1] = (keypoints[..., 1] - pad_y) / scale
+        return boxes, scores, keypoints
+
+    def find_pose(self, img: np.ndarray, draw: bool = False) -> np.ndarray:
+        """
+        Run pose estimation on image.
+
+        Args:
+            img: Input image BGR format
+            draw: Whether to draw keypoints on image
+
+        Returns:
+            img: Image (with keypoints drawn if draw=True)
+        """
+        _, _, keypoints = self.infer(img)
+
+        # Highest-scoring person, like YOLOPoseDetector
+        self.keypoints = keypoints[0] if len(keypoints) else None
+
+        if draw and self.keypoints is not None:
+            img = img.copy()
+            for x, y, conf in self.keypoints:
+                if conf > 0.3:
+                    cv2.circle(img, (int(x), int(y)), 4, (0, 255, 0), -1)
+
+        return img
+
+    def find_position(self, img: np.ndarray) -> List[Dict]:
+        """
+        Extract landmarks compatible with MediaPipe format.
+
+        Args:
+            img: Input image (used for shape reference)
+
+        Returns:
+            lm_list: List of landmark dicts with same format as MediaPipe
+        """
+        if self.keypoints is None:
+            return []
+
+        h, w = img.shape[:2]
+        return [{
+            "id": idx,
+            "x_px": int(x_px),
+            "y_px": int(y_px),
+            "x": float(x_px) / w,
+            "y": float(y_px) / h,
+            "visibility": float(conf)
+        } for idx, (x_px, y_px, conf) in enumerate(self.keypoints)]
+
+    def get_barbell_landmarks(self, lm_list: List[Dict]) -> Optional[Dict]:
+        """
+        Extract barbell position from wrists (COCO format).
+
+        Args:
+            lm_list: Landmark list from find_position()
+
+        Returns:
+            Dict with 'left', 'right', 'midpoint' or None
+        """
+        if not lm_list or len(lm_list) < 17:
+            return None
+
+        left_wrist = lm_list[self.LEFT_WRIST_ID]
+        right_wrist = lm_list[self.RIGHT_WRIST_ID]
+
+        if left_wrist['visibility'] < 0.3 or right_wrist['visibility'] < 0.3:
+            return None
+
+        mid_x = (left_wrist['x'] + right_wrist['x']) / 2
+        mid_y = (left_wrist['y'] + right_wrist['y']) / 2
+
+        return {
+            "left": left_wrist,
+            "right": right_wrist,
+            "midpoint": {"x": mid_x, "y": mid_y}
+        }
@@ -3,44 +3,119 @@ import numpy as np
 import onnxruntime as ort
 from typing import List, Dict, Tuple, Optional
 
+from config import (
+    VITPOSE_MODEL_PATH, VITPOSE_MAX_BATCH, VITPOSE_PERSON_THRESHOLD,
+    ONNX_INTRA_THREADS, ONNX_INTER_THREADS
+)
+
+# ImageNet normalization folded into one multiply-add on uint8 pixels (RGB order)
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def decode_heatmaps(heatmaps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized argmax + subpixel refinement of all heatmaps at once.
+
+    The peak is refined per axis by fitting a parabola through the log of the
+    peak and its two neighbours (a Gaussian in heatmap space), which removes
+    most of the quantization error of the 4x downsampled heatmaps.
+
+    Args:
+        heatmaps: (B, K, H, W) model output
+
+    Returns:
+        coords: (B, K, 2) float x, y in heatmap pixels
+        maxvals: (B, K) peak values (keypoint confidence)
+    """
+    b, k, h, w = heatmaps.shape
+    flat = heatmaps.reshape(b * k, h * w)
+    idx = flat.argmax(axis=1)
+    rows = np.arange(b * k)
+    ys, xs = np.divmod(idx, w)
+
+    # Log of the peak and its 4 neighbours (clamped at the border)
+    neighbours = np.stack([
+        idx,
+        ys * w + np.maximum(xs - 1, 0), ys * w + np.minimum(xs + 1, w - 1),
+        np.maximum(ys - 1, 0) * w + xs, np.minimum(ys + 1, h - 1) * w + xs
+    ])
+    peak, left, right, up, down = np.log(np.maximum(flat[rows, neighbours], 1e-10))
+
+    def offset(lo, hi, pos, size):
+        # Vertex of the parabola; only where the peak is a proper interior maximum
+        curvature = lo - 2 * peak + hi
+        valid = (curvature < 0) & (pos > 0) & (pos < size - 1)
+        delta = 0.5 * (lo - hi) / np.where(valid, curvature, -1.0)
+        return np.where(valid, np.clip(delta, -0.5, 0.5), 0.0)
+
+    coords = np.stack([xs + offset(left, right, xs, w), ys + offset(up, down, ys, h)], axis=-1)
+    return coords.reshape(b, k, 2).astype(np.float32), flat[rows, idx].reshape(b, k)
+
+
 class ViTPoseDetector:
     """
-    ViTPose detector using ONNX Runtime for GPU inference.
+    ViTPose detector using ONNX Runtime (CPU or GPU).
     Avoids MMCV compilation issues on Windows.
+
+    Top-down model: every crop is assumed to contain one lifter. All bench
+    crops of a frame run in one batched session call (detect_batch).
     """
-    
-    def __init__(self, model_path: str = "checkpoints/vitpose-b.onnx", device: str = 'cuda:0'):
+
+    def __init__(self, model_path: str = VITPOSE_MODEL_PATH, device: str = 'cuda:0',
+                 intra_threads: int = ONNX_INTRA_THREADS, inter_threads: int = ONNX_INTER_THREADS,
+                 max_batch: int = VITPOSE_MAX_BATCH):
         """
         Initialize ViTPose detector with ONNX model.
-        
+
         Args:
             model_path: Path to ONNX model file
             device: 'cuda:0' for GPU, 'cpu' for CPU
+            intra_threads: Threads inside one operator (0 = onnxruntime default)
+            inter_threads: Threads across independent operators
+            max_batch: Crops per session call (models exported with batch 1 run one at a time)
         """
         self.model_path = model_path
         self.device = device
-        
+
         # Setup ONNX Runtime providers
         providers = []
-        if 'cuda' in device.lower():
+        if 'cuda' in device.lower() and 'CUDAExecutionProvider' in ort.get_available_providers():
             providers.append(('CUDAExecutionProvider', {
                 'device_id': int(device.split(':')[1]) if ':' in device else 0,
             }))
         providers.append('CPUExecutionProvider')
-        
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_threads
+        options.inter_op_num_threads = inter_threads
+
         print(f"[ViTPose] Initializing with providers: {providers}")
-        
+
         # Load ONNX model
         try:
-            self.session = ort.InferenceSession(model_path, providers=providers)
+            self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
             self.input_name = self.session.get_inputs()[0].name
-            self.input_shape = self.session.get_inputs()[0].shape  # Usually [1, 3, 256, 192]
+            self.input_shape = self.session.get_inputs()[0].shape  # Usually [1 or 'batch', 3, 256, 192]
             print(f"[ViTPose] Model loaded successfully. Input shape: {self.input_shape}")
         except Exception as e:
             print(f"[ERROR] Failed to load ONNX model: {e}")
             print(f"[INFO] Please download ViTPose ONNX model first!")
             raise
-        
+
+        self.target_h, self.target_w = self.input_shape[2], self.input_shape[3]  # 256, 192
+
+        # A fixed batch dimension of 1 means the model was exported without batching
+        batch_dim = self.input_shape[0]
+        self.max_batch = max_batch if not isinstance(batch_dim, int) or batch_dim <= 0 else batch_dim
+
+        # Preallocated buffers, reused every call
+        self._padded = np.zeros((self.target_h, self.target_w, 3), dtype=np.uint8)
+        self._batch = np.empty((self.max_batch, 3, self.target_h, self.target_w), dtype=np.float32)
+        self._scale = (1.0 / (255.0 * IMAGENET_STD))[:, None, None]
+        self._bias = (-IMAGENET_MEAN / IMAGENET_STD)[:, None, None]
+
         # COCO keypoint names (17 keypoints)
         self.keypoint_names = [
             'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
@@ -48,187 +123,181 @@ class ViTPoseDetector:
             'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
             'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
         ]
-        
+
         # Keypoint IDs for barbell detection
         self.LEFT_WRIST_ID = 9
         self.RIGHT_WRIST_ID = 10
         self.LEFT_SHOULDER_ID = 5
         self.RIGHT_SHOULDER_ID = 6
-        
+
         self.results = None
-        
-    def preprocess(self, img: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+
+    def preprocess(self, img: np.ndarray, out: np.ndarray) -> Tuple[float, Tuple[int, int]]:
         """
-        Preprocess image for ViTPose model.
-        
+        Letterbox one crop and normalize it straight into a batch slot.
+
         Args:
             img: Input image (H, W, 3) BGR format
-            
+            out: (3, target_h, target_w) float32 slot of the batch tensor
+
         Returns:
-            preprocessed: Model input (1, 3, 256, 192)
             scale: Scale factor used
-            center: Center point of transformation
+            pad: (pad_w, pad_h) offset of the resized image
         """
         h, w = img.shape[:2]
-        target_h, target_w = self.input_shape[2], self.input_shape[3]  # 256, 192
-        
+
         # Calculate scale to fit image into model input
-        scale = min(target_w / w, target_h / h)
-        
-        # Resize image
+        scale = min(self.target_w / w, self.target_h / h)
         new_w = int(w * scale)
         new_h = int(h * scale)
-        resized = cv2.resize(img, (new_w, new_h))
-        
-        # Pad to target size
-        pad_w = (target_w - new_w) // 2
-        pad_h = (target_h - new_h) // 2
-        
-        padded = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-        padded[pad_h:pad_h+new_h, pad_w:pad_w+new_w] = resized
-        
-        # Convert BGR to RGB and normalize
-        rgb = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB)
-        normalized = rgb.astype(np.float32) / 255.0
-        
-        # Normalize with ImageNet mean/std
-        mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
-        std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
-        normalized = (normalized - mean) / std
-        
-        # Transpose to (C, H, W) and add batch dimension
-        transposed = normalized.transpose(2, 0, 1)[np.newaxis, ...]
-        
-        center = (w // 2, h // 2)
-        return transposed, scale, center
-        
-    def postprocess(self, heatmaps: np.ndarray, scale: float, orig_shape: Tuple[int, int]) -> np.ndarray:
-        """
-        Convert heatmaps to keypoints.
-        
+        pad_w = (self.target_w - new_w) // 2
+        pad_h = (self.target_h - new_h) // 2
+
+        # Resize into the reused padded buffer
+        padded = self._padded
+        padded[:] = 0
+        cv2.resize(img, (new_w, new_h), dst=padded[pad_h:pad_h+new_h, pad_w:pad_w+new_w])
+
+        # BGR -> RGB planes, then (x / 255 - mean) / std as one multiply-add
+        np.multiply(padded[:, :, ::-1].transpose(2, 0, 1), self._scale, out=out)
+        out += self._bias
+
+        return scale, (pad_w, pad_h)
+
+    def postprocess(self, heatmaps: np.ndarray, params: List[Tuple[float, Tuple[int, int]]]) -> np.ndarray:
+        """
+        Convert a batch of heatmaps to keypoints in crop coordinates.
+
         Args:
-            heatmaps: Model output heatmaps (1, 17, H, W)
-            scale: Scale factor from preprocessing
-            orig_shape: Original image (h, w)
-            
+            heatmaps: Model output heatmaps (B, 17, H, W)
+            params: (scale, pad) per crop from preprocess()
+
         Returns:
-            keypoints: (17, 3) array [x, y, confidence]
+            keypoints: (B, 17, 3) array [x, y, confidence]
         """
-        num_keypoints = heatmaps.shape[1]
+        coords, maxvals = decode_heatmaps(heatmaps)
         heatmap_h, heatmap_w = heatmaps.shape[2:4]
-        
+
+        scales = np.array([scale for scale, _ in params], dtype=np.float32)[:, None, None]
+        pads = np.array([pad for _, pad in params], dtype=np.float32)[:, None, :]
+
+        # Heatmap space -> model input space -> crop space (undo padding and scaling)
+        stride = np.array([self.target_w / heatmap_w, self.target_h / heatmap_h], dtype=np.float32)
+        xy = (coords * stride - pads) / scales
+
+        return np.concatenate([xy, maxvals[..., None]], axis=-1)
+
+    def find_pose_batch(self, imgs: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Run pose estimation on several crops with batched session calls.
+
+        Args:
+            imgs: BGR crops (any sizes)
+
+        Returns:
+            list: (17, 3) keypoint array [x, y, confidence] per crop
+        """
         keypoints = []
-        for i in range(num_keypoints):
-            heatmap = heatmaps[0, i, :, :]
-            
-            # Find max confidence location
-            max_val = np.max(heatmap)
-            max_idx = np.argmax(heatmap)
-            y, x = np.unravel_index(max_idx, heatmap.shape)
-            
-            # Convert heatmap coordinates to original image coordinates
-            # Account for preprocessing padding and scaling
-            target_h, target_w = self.input_shape[2], self.input_shape[3]
-            
-            # Convert from heatmap space to input image space
-            scale_factor = target_w / heatmap_w
-            x_img = x * scale_factor
-            y_img = y * scale_factor
-            
-            # Remove padding offset
-            orig_h, orig_w = orig_shape
-            pad_w = (target_w - int(orig_w * scale)) // 2
-            pad_h = (target_h - int(orig_h * scale)) // 2
-            
-            x_img = (x_img - pad_w) / scale
-            y_img = (y_img - pad_h) / scale
-            
-            keypoints.append([x_img, y_img, float(max_val)])
-        
-        return np.array(keypoints)
-    
+        for start in range(0, len(imgs), self.max_batch):
+            chunk = imgs[start:start + self.max_batch]
+            batch = self._batch[:len(chunk)]
+            params = [self.preprocess(img, batch[i]) for i, img in enumerate(chunk)]
+
+            heatmaps = self.session.run(None, {self.input_name: batch})[0]  # (B, 17, H, W)
+            keypoints.extend(self.postprocess(heatmaps, params))
+        return keypoints
+
+    def detect_batch(self, frame: np.ndarray, rects: List[Tuple[int, int, int, int]]) -> List[List[Dict]]:
+        """
+        Detect poses in several crops of one frame (used by BenchPipeline).
+
+        Args:
+            frame: Full BGR frame
+            rects: (x, y, w, h) pixel crops
+
+        Returns:
+            list: One landmark list per rect, normalized to its crop
+        """
+        crops = [frame[y:y+h, x:x+w] for x, y, w, h in rects]
+        return [self._to_landmarks(keypoints, crop.shape[1], crop.shape[0])
+                for keypoints, crop in zip(self.find_pose_batch(crops), crops)]
+
     def find_pose(self, img: np.ndarray, draw: bool = False) -> np.ndarray:
         """
         Run pose estimation on image.
-        
+
         Args:
             img: Input image BGR format
             draw: Whether to draw keypoints (not implemented for ONNX)
-            
+
         Returns:
             img: Same image (drawing not implemented)
         """
         # Store original shape
         self.orig_shape = img.shape[:2]
-        
-        # Preprocess
-        input_tensor, self.scale, self.center = self.preprocess(img)
-        
-        # Run inference
-        outputs = self.session.run(None, {self.input_name: input_tensor.astype(np.float32)})
-        heatmaps = outputs[0]  # Heatmaps (1, 17, H, W)
-        
-        # Postprocess to get keypoints
-        self.keypoints = self.postprocess(heatmaps, self.scale, self.orig_shape)
-        
+
+        self.keypoints = self.find_pose_batch([img])[0]
+
         # Store results in similar format to MediaPipe
         self.results = {'keypoints': self.keypoints}
-        
+
         return img
-    
+
+    def _to_landmarks(self, keypoints: np.ndarray, w: int, h: int) -> List[Dict]:
+        # A top-down model always outputs 17 points; low mean confidence means nobody is there
+        if keypoints[:, 2].mean() < VITPOSE_PERSON_THRESHOLD:
+            return []
+
+        return [{
+            "id": idx,
+            "x_px": int(x),
+            "y_px": int(y),
+            "x": float(x) / w,
+            "y": float(y) / h,
+            "visibility": float(conf)
+        } for idx, (x, y, conf) in enumerate(keypoints)]
+
     def find_position(self, img: np.ndarray) -> List[Dict]:
         """
         Extract landmarks compatible with MediaPipe format.
-        
+
         Args:
             img: Input image (used for shape reference)
-            
+
         Returns:
             lm_list: List of landmark dicts with same format as MediaPipe
         """
         if self.results is None or 'keypoints' not in self.results:
             return []
-        
-        lm_list = []
+
         h, w = img.shape[:2]
-        
-        for idx, (x, y, conf) in enumerate(self.keypoints):
-            lm_list.append({
-                "id": idx,
-                "x_px": int(x),
-                "y_px": int(y),
-                "x": x / w,
-                "y": y / h,
-                "visibility": conf
-            })
-        
-        return lm_list
-    
+        return self._to_landmarks(self.keypoints, w, h)
+
     def get_barbell_landmarks(self, lm_list: List[Dict]) -> Optional[Dict]:
         """
         Extract barbell position from wrists (COCO format).
-        
+
         Args:
             lm_list: Landmark list from find_position()
-            
+
         Returns:
             Dict with 'left', 'right', 'midpoint' or None
         """
         if not lm_list or len(lm_list) < 17:
             return None
-        
+
         # COCO keypoints: 9=left_wrist, 10=right_wrist
         left_wrist = lm_list[self.LEFT_WRIST_ID]
         right_wrist = lm_list[self.RIGHT_WRIST_ID]
-        
+
         # Check visibility
         if left_wrist['visibility'] < 0.3 or right_wrist['visibility'] < 0.3:
             return None
-        
+
         # Calculate midpoint
         mid_x = (left_wrist['x'] + right_wrist['x']) / 2
         mid_y = (left_wrist['y'] + right_wrist['y']) / 2
-        
+
         return {
             "left": left_wrist,
             "right": right_wrist,
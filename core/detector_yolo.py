@@ -9,6 +9,8 @@ class YOLOPoseDetector:
     Uses Ultralytics YOLO for pose estimation with GPU acceleration.
     """
     
+    DEFAULT_IMGSZ = 640
+    
     def __init__(self, model_size: str = 'm', device: str = 'cuda:0'):
         """
         Initialize YOLO11-Pose detector.
@@ -19,6 +21,7 @@ class YOLOPoseDetector:
         """
         self.model_size = model_size
         self.device = device
+        self.imgsz = self.DEFAULT_IMGSZ  # Lowered by LoadShedder under overload
         
         # Model mapping
         model_name = f'yolo11{model_size}-pose.pt'
@@ -62,7 +65,7 @@ class YOLOPoseDetector:
             img: Image (with keypoints drawn if draw=True)
         """
         # Run inference
-        self.results = self.model(img, device=self.device, verbose=False)[0]
+        self.results = self.model(img, imgsz=self.imgsz, device=self.device, verbose=False)[0]
         
         # Draw if requested
         if draw and self.results.keypoints is not None:
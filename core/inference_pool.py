@@ -0,0 +1,372 @@
+"""
+Multiprocess pose inference pool.
+
+CPU inference inside the processing thread uses one interpreter and competes
+with capture, analysis and the Qt event loop for the GIL. With
+INFERENCE_WORKERS > 0 the pose model runs in separate worker processes
+instead:
+
+    - the processing side copies each frame once into a SharedFrameRing
+      (publish()); every detect_batch() call on that frame - tight crops,
+      the full-ROI retry - reuses the copy
+    - benches needing inference are sharded across the workers; each worker
+      gets (frame seq, bench rects) through its own task queue
+    - workers crop straight from shared memory, run their own detector and
+      send back only float32 (n, 3) keypoint arrays (x, y, visibility)
+
+The pool exposes detect_batch(), so BenchPipeline uses it in place of a
+detector without any other change.
+
+Every shard has a deadline of INFERENCE_TIMEOUT_SEC. A worker that misses
+it - crashed, or alive but stuck inside its detector - is terminated and
+respawned, and its crops come back empty for that frame. Shards only go to
+workers that have finished loading their detector. Each worker answers over
+its own pipe, so killing one mid-write cannot block the others' results. If
+every worker fails to restart, the pool loads the detector in-process and
+keeps serving (or raises if that fails too).
+"""
+import os
+import time
+import importlib
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from config import INFERENCE_WORKERS, INFERENCE_RING_SLOTS, INFERENCE_TIMEOUT_SEC
+from core.shared_frames import SharedFrameRing
+
+DEFAULT_DETECTOR = 'core.detector_yolo:YOLOPoseDetector'
+
+
+def pack_landmarks(lm_list):
+    """Landmark dicts -> float32 (n, 3) array of normalized x, y, visibility (None if empty)"""
+    if not lm_list:
+        return None
+    return np.array([[lm['x'], lm['y'], lm['visibility']] for lm in lm_list], dtype=np.float32)
+
+
+def unpack_landmarks(keypoints, w, h):
+    """
+    Keypoint array -> landmark dicts in the detectors' find_position() format.
+
+    Args:
+        keypoints: (n, 3) array from pack_landmarks() or None
+        w, h: Size of the crop the keypoints are normalized to
+    """
+    if keypoints is None:
+        return []
+    return [{
+        "id": idx,
+        "x_px": int(x * w),
+        "y_px": int(y * h),
+        "x": float(x),
+        "y": float(y),
+        "visibility": float(v)
+    } for idx, (x, y, v) in enumerate(keypoints)]
+
+
+def load_detector_class(path):
+    """Import 'module:ClassName'"""
+    module, _, name = path.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def _worker_main(index, detector_path, detector_kwargs, threads, tasks, results):
+    """Inference worker process: attach to the ring, detect on bench crops"""
+    # Limit intra-op threads before torch/onnxruntime are imported, so N
+    # workers share the cores instead of each spawning one thread per core
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+        detector = load_detector_class(detector_path)(**detector_kwargs)
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    except Exception as e:
+        results.send(('error', index, str(e)))
+        return
+
+    results.send(('ready', index, None))
+
+    ring = None
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        task_id, spec, seq, jobs = task
+        if ring is None or ring.name != spec['name']:
+            if ring is not None:
+                ring.close()
+            ring = SharedFrameRing.attach(spec)
+
+        frame = ring.read(seq)
+        out = []
+        for job_idx, (x, y, w, h) in jobs:
+            keypoints = None
+            if frame is not None:
+                crop = frame[y:y+h, x:x+w]
+                detector.find_pose(crop, draw=False)
+                keypoints = pack_landmarks(detector.find_position(crop))
+            out.append((job_idx, keypoints))
+        results.send(('result', index, (task_id, out)))
+
+    if ring is not None:
+        ring.close()
+
+
+class InferencePool:
+    """Pose inference sharded across worker processes"""
+
+    def __init__(self, workers=INFERENCE_WORKERS, detector=DEFAULT_DETECTOR, detector_kwargs=None,
+                 slots=INFERENCE_RING_SLOTS, timeout=INFERENCE_TIMEOUT_SEC):
+        """
+        Args:
+            workers: Number of worker processes
+            detector: Detector class as 'module:ClassName' (imported in the workers only)
+            detector_kwargs: Constructor arguments for the detector
+            slots: Frames in the shared-memory ring
+            timeout: Deadline (seconds) for a worker to answer its shard
+        """
+        self.workers = max(1, int(workers))
+        self.detector_path = detector
+        self.detector_kwargs = detector_kwargs or {}
+        self.slots = slots
+        self.timeout = timeout
+
+        self.ctx = mp.get_context('spawn')  # No forked CUDA/Qt state in workers
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.tasks = []
+        self.conns = []  # Read end of each worker's result pipe
+        self.processes = []
+        self.ready = set()  # Workers with a loaded detector
+        self.failed = set()  # Workers whose detector failed to load (not respawned)
+        self.ring = None
+        self.local = None  # In-process detector once every worker has failed
+        self.task_id = 0
+
+    def start(self):
+        """
+        Spawn the workers and wait until every detector is loaded.
+
+        Returns:
+            InferencePool: self
+
+        Raises:
+            RuntimeError: If a worker fails to load its detector
+        """
+        print(f"[InferencePool] Starting {self.workers} workers "
+              f"({self.threads} threads each, {self.detector_path})")
+        for index in range(self.workers):
+            self.tasks.append(self.ctx.Queue())
+            self.conns.append(None)
+            self.processes.append(self._spawn(index))
+
+        while len(self.ready) < self.workers:
+            for kind, index, payload in self._receive(1.0):
+                if kind == 'error':
+                    self.close()
+                    raise RuntimeError(f"Inference worker {index} failed: {payload}")
+                if kind == 'exit':
+                    self.close()
+                    raise RuntimeError("Inference worker exited during startup")
+                if kind == 'ready':
+                    self.ready.add(index)
+
+        print("[InferencePool] Workers ready!")
+        return self
+
+    def _spawn(self, index):
+        reader, writer = self.ctx.Pipe(duplex=False)
+        process = self.ctx.Process(
+            target=_worker_main,
+            args=(index, self.detector_path, self.detector_kwargs, self.threads,
+                  self.tasks[index], writer),
+            name=f"InferenceWorker-{index}",
+            daemon=True
+        )
+        process.start()
+        writer.close()  # The worker holds the only write end: EOF once it exits
+        self.conns[index] = reader
+        return process
+
+    def _receive(self, timeout):
+        """
+        Wait up to `timeout` seconds for worker messages.
+
+        Returns:
+            list: (kind, index, payload) tuples; ('exit', index, None) when a
+                  worker's pipe closed (process gone)
+        """
+        conns = {conn: index for index, conn in enumerate(self.conns) if conn is not None}
+        messages = []
+        for conn in wait(list(conns), timeout):
+            index = conns[conn]
+            try:
+                messages.append(conn.recv())
+            except (EOFError, OSError):
+                conn.close()
+                self.conns[index] = None
+                messages.append(('exit', index, None))
+        return messages
+
+    def _restart_dead(self):
+        """Replace crashed workers (they report 'ready' asynchronously)"""
+        for index, process in enumerate(self.processes):
+            if not process.is_alive() and index not in self.failed:
+                print(f"[InferencePool] Worker {index} died (exit code {process.exitcode}), restarting")
+                self.ready.discard(index)
+                if self.conns[index] is not None:
+                    self.conns[index].close()
+                self.tasks[index] = self.ctx.Queue()  # Drop shards queued behind the dead one
+                self.processes[index] = self._spawn(index)
+
+    def _replace(self, indices):
+        """Terminate workers that missed their deadline (hung in the detector) and respawn them"""
+        for index in sorted(indices):
+            process = self.processes[index]
+            if process.is_alive() and self.conns[index] is not None:
+                print(f"[InferencePool] Worker {index} missed its {self.timeout:.1f}s deadline, terminating")
+                process.terminate()
+            process.join(timeout=1.0)
+        self._restart_dead()
+
+    def _note(self, kind, index, payload):
+        """Handle a status message from a (re)started worker"""
+        if kind == 'ready':
+            self.ready.add(index)
+        elif kind == 'error':
+            print(f"[InferencePool] Worker {index} failed to restart: {payload}")
+            self.failed.add(index)
+        elif kind == 'exit':
+            self._replace([index])
+
+    def _poll_status(self):
+        """Pick up status messages and exits from between frames"""
+        for kind, index, payload in self._receive(0):
+            if kind != 'result':
+                self._note(kind, index, payload)
+
+    def _ring_for(self, frame):
+        """(Re)create the ring when the frame shape changes"""
+        if self.ring is None or self.ring.shape != frame.shape:
+            if self.ring is not None:
+                self.ring.close()
+            self.ring = SharedFrameRing(frame.shape, slots=self.slots)
+        return self.ring
+
+    def publish(self, frame, timestamp=0.0):
+        """
+        Copy a frame into the shared ring once per processed frame.
+
+        Args:
+            frame: Full BGR frame (camera frame or multi-camera canvas)
+            timestamp: Frame time in seconds
+
+        Returns:
+            np.ndarray: Zero-copy view of the ring slot; detect_batch() on
+                        this view does not copy the frame again
+        """
+        ring = self._ring_for(frame)
+        return ring.read(ring.write(frame, timestamp))
+
+    def _detect_local(self, frame, rects):
+        """Every worker failed to restart: run the detector in this process"""
+        if self.local is None:
+            print("[InferencePool] No inference worker left, detecting in-process")
+            # Raises if the detector cannot be loaded here either
+            self.local = load_detector_class(self.detector_path)(**self.detector_kwargs)
+        out = []
+        for x, y, w, h in rects:
+            crop = frame[y:y+h, x:x+w]
+            self.local.find_pose(crop, draw=False)
+            out.append(self.local.find_position(crop))
+        return out
+
+    def detect_batch(self, frame, rects):
+        """
+        Detect poses in several crops of one frame in parallel.
+
+        Crops are dealt round-robin across the ready workers, so the
+        benches due on a frame are spread over as many cores as possible.
+
+        Args:
+            frame: Full BGR frame, ideally the view returned by publish()
+                   (any other array is copied into the ring first)
+            rects: List of pixel (x, y, w, h) crops
+
+        Returns:
+            list: One landmark list per rect (normalized to that rect);
+                  empty for crops whose worker missed its deadline
+        """
+        out = [[] for _ in rects]
+        if not rects:
+            return out
+
+        self._poll_status()
+        if len(self.failed) == self.workers:
+            return self._detect_local(frame, rects)
+        workers = sorted(self.ready)
+        if not workers:
+            return out  # Every worker is still (re)loading its detector
+
+        seq = self.ring.seq_of(frame) if self.ring is not None else None
+        if seq is None:
+            seq = self._ring_for(frame).write(frame)
+        spec = self.ring.spec()
+
+        self.task_id += 1
+        shards = {index: [] for index in workers}
+        for job_idx, rect in enumerate(rects):
+            shards[workers[job_idx % len(workers)]].append((job_idx, tuple(int(v) for v in rect)))
+
+        pending = set()
+        for index, shard in shards.items():
+            if shard:
+                self.tasks[index].put((self.task_id, spec, seq, shard))
+                pending.add(index)
+
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._replace(pending)
+                break
+
+            for kind, index, payload in self._receive(remaining):
+                if kind != 'result':
+                    pending.discard(index)  # A crashed worker will not answer
+                    self._note(kind, index, payload)
+                elif payload[0] == self.task_id:  # Else a late result of an earlier frame
+                    for job_idx, keypoints in payload[1]:
+                        _, _, w, h = rects[job_idx]
+                        out[job_idx] = unpack_landmarks(keypoints, w, h)
+                    pending.discard(index)
+
+        return out
+
+    def close(self):
+        """Stop the workers and release the shared-memory ring"""
+        for task_queue, process in zip(self.tasks, self.processes):
+            if process.is_alive():
+                task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.conns:
+            if conn is not None:
+                conn.close()
+        self.processes = []
+        self.tasks = []
+        self.conns = []
+        self.ready.clear()
+
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        print("[InferencePool] Stopped")
@@ -0,0 +1,210 @@
+"""
+Overload load shedding.
+
+When processing falls behind (e.g. a bench added at peak hours) every bench's
+alert latency grows. The LoadShedder watches the measured per-frame latency
+(frame arrival -> results) against MAX_LATENCY_SEC and steps through
+degradation levels, each keeping the ones before it:
+
+    0 full      normal operation
+    1 cadence   NORMAL benches inferred every SHED_NORMAL_INTERVAL; DANGER
+                and near-danger benches keep full rate
+    2 imgsz     YOLO inference at SHED_IMGSZ instead of 640
+    3 model     next smaller YOLO model
+    4 render    cosmetic rendering off (keypoint drawing, smooth scaling); the
+                DANGER flash and pulse overlays are alarms and stay on
+
+It steps down after the smoothed latency stays above SHED_HIGH_RATIO x
+MAX_LATENCY_SEC for SHED_HOLD_SEC, and back up after it stays below
+SHED_LOW_RATIO x MAX_LATENCY_SEC for SHED_HOLD_SEC. Every level change is
+written to the failure log as bench 0 so operators can see when the system
+ran degraded.
+
+The smaller model for 'model' is loaded in a background thread, started as
+soon as 'imgsz' is reached, so the processing thread never waits on a
+weight load. Until it is ready 'model' keeps the current detector;
+update() reports the moment it becomes ready so the caller applies it.
+"""
+import threading
+
+from config import (
+    LOAD_SHEDDING, MAX_LATENCY_SEC, SHED_HIGH_RATIO, SHED_LOW_RATIO, SHED_HOLD_SEC,
+    SHED_SMOOTHING, SHED_NORMAL_INTERVAL, SHED_IMGSZ, CALIBRATION_SIZES
+)
+
+LEVELS = ('full', 'cadence', 'imgsz', 'model', 'render')
+
+LEVEL_DESCRIPTIONS = {
+    'full': 'Full quality',
+    'cadence': 'Reduced cadence for NORMAL benches',
+    'imgsz': 'Reduced inference size',
+    'model': 'Smaller pose model',
+    'render': 'Keypoint drawing and smooth scaling off'
+}
+
+SYSTEM_BENCH_ID = 0  # Failure log rows about the whole system
+
+
+class LoadShedder:
+    """Feedback controller from per-frame latency to a degradation level"""
+
+    def __init__(self, enabled=LOAD_SHEDDING, limit=MAX_LATENCY_SEC, logger=None):
+        """
+        Args:
+            enabled: False keeps the level at 'full'
+            limit: Latency target in seconds
+            logger: FailureLogger for level changes (optional)
+        """
+        self.enabled = enabled
+        self.limit = limit
+        self.logger = logger
+
+        self.level = 0
+        self.latency = None  # Smoothed latency (seconds)
+        self.over_since = None
+        self.under_since = None
+
+        self._full_detector = None
+        self._small_detector = None
+        self._small_loader = None  # Thread loading the smaller model
+        self._small_ready = False  # Loaded since the last update()
+
+    @property
+    def name(self):
+        return LEVELS[self.level]
+
+    @property
+    def description(self):
+        return LEVEL_DESCRIPTIONS[self.name]
+
+    @property
+    def render_enabled(self):
+        """False once cosmetic rendering is shed"""
+        return not self.active('render')
+
+    def active(self, action):
+        """Check whether a degradation step ('cadence', 'imgsz', ...) is in effect"""
+        return 0 < LEVELS.index(action) <= self.level
+
+    def update(self, latency, now):
+        """
+        Feed one frame's latency.
+
+        Args:
+            latency: Seconds from frame arrival to results
+            now: Current time (seconds)
+
+        Returns:
+            bool: True if the level changed, or the smaller model finished
+                  loading while 'model' is active (call apply() again)
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += SHED_SMOOTHING * (latency - self.latency)
+
+        if not self.enabled:
+            return False
+
+        ready, self._small_ready = self._small_ready, False
+        return self._step(now) or (ready and self.active('model'))
+
+    def _step(self, now):
+        if self.latency > SHED_HIGH_RATIO * self.limit and self.level < len(LEVELS) - 1:
+            self.under_since = None
+            if self.over_since is None:
+                self.over_since = now
+            elif now - self.over_since >= SHED_HOLD_SEC:
+                self.over_since = now  # Give the new level a full hold period
+                return self._set_level(self.level + 1)
+        elif self.latency < SHED_LOW_RATIO * self.limit and self.level > 0:
+            self.over_since = None
+            if self.under_since is None:
+                self.under_since = now
+            elif now - self.under_since >= SHED_HOLD_SEC:
+                self.under_since = now
+                return self._set_level(self.level - 1)
+        else:
+            self.over_since = None
+            self.under_since = None
+        return False
+
+    def _set_level(self, level):
+        degrading = level > self.level
+        self.level = level
+
+        state = 'DEGRADED' if level > 0 else 'NORMAL'
+        reason = f"Load level {level}/{len(LEVELS) - 1}: {self.description}"
+        print(f"[LoadShedder] {'Stepped down' if degrading else 'Stepped up'} to '{self.name}' "
+              f"(smoothed latency {self.latency * 1000:.0f} ms, limit {self.limit * 1000:.0f} ms)")
+        if self.logger is not None:
+            self.logger.log(SYSTEM_BENCH_ID, state, reason, self.latency)
+        return True
+
+    def apply(self, pipeline):
+        """
+        Apply the current level to a BenchPipeline and its detector.
+
+        The smaller model is loaded once, in the background, and kept, so
+        oscillating between levels does not reload weights. Detectors
+        without a model_size/imgsz (pools, remote, ONNX) only get the
+        cadence step.
+        """
+        pipeline.scheduler.normal_interval = SHED_NORMAL_INTERVAL if self.active('cadence') else 0.0
+
+        if self._full_detector is None:
+            self._full_detector = pipeline.detector
+
+        detector = self._full_detector
+        if self.active('imgsz'):
+            # One step before 'model': have the smaller model ready by then
+            small = self._smaller_detector()
+            if self.active('model') and small is not None:
+                detector = small
+        pipeline.detector = detector
+
+        if hasattr(detector, 'imgsz'):
+            detector.imgsz = SHED_IMGSZ if self.active('imgsz') else detector.DEFAULT_IMGSZ
+
+    def reset_detector(self):
+        """Forget the detectors after the caller replaced pipeline.detector (call apply() next)"""
+        self._full_detector = None
+        self._small_detector = None
+        self._small_loader = None
+        self._small_ready = False
+
+    def _smaller_detector(self):
+        """The smaller model if loaded; otherwise start loading it and return None"""
+        if self._small_detector is None and self._small_loader is None:
+            full = self._full_detector
+            size = getattr(full, 'model_size', None)
+            if size not in CALIBRATION_SIZES or size == CALIBRATION_SIZES[0]:
+                return None
+            smaller = CALIBRATION_SIZES[CALIBRATION_SIZES.index(size) - 1]
+            print(f"[LoadShedder] Loading smaller model in the background: {size} -> {smaller}")
+            self._small_loader = threading.Thread(target=self._load_smaller, args=(full, smaller),
+                                                  name="LoadShedder-model", daemon=True)
+            self._small_loader.start()
+        return self._small_detector
+
+    def _load_smaller(self, full, size):
+        try:
+            detector = type(full)(model_size=size, device=full.device)
+        except Exception as e:
+            print(f"[LoadShedder] Could not load the smaller model ({e}); 'model' level keeps the current one")
+            return  # _small_loader stays set: not retried
+        if self._full_detector is not full:
+            return  # Detector replaced meanwhile (reset_detector)
+        self._small_detector = detector
+        self._small_ready = True
+        print(f"[LoadShedder] Smaller model ready: {size}")
+
+    def stats(self):
+        """Level info for the GUI / CLI dashboard"""
+        return {
+            'load_level': self.level,
+            'load_name': self.name,
+            'load_description': self.description,
+            'render_enabled': self.render_enabled,
+            'latency_ms': (self.latency or 0.0) * 1000
+        }
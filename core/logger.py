@@ -1,11 +1,12 @@
 import csv
-import time
 import os
-from datetime import datetime
+
+from core.clock import wall_clock
 
 class FailureLogger:
-    def __init__(self, output_file="bench_press_log.csv"):
+    def __init__(self, output_file="bench_press_log.csv", clock=None):
         self.output_file = output_file
+        self.clock = clock or wall_clock  # Log timestamps (media time on a MediaClock)
         
         # Create file with header if not exists
         if not os.path.exists(self.output_file):
@@ -14,7 +15,7 @@ class FailureLogger:
                 writer.writerow(["Timestamp", "BenchID", "State", "Reason", "Latency_ms"])
 
     def log(self, bench_id, state, reason, latency_sec):
-        timestamp = datetime.now().isoformat()
+        timestamp = self.clock.isoformat()
         latency_ms = int(latency_sec * 1000)
         
         # Print to console
@@ -0,0 +1,104 @@
+"""
+Motion gate for skipping pose inference on static ROIs.
+
+Each bench keeps a small grayscale thumbnail of the ROI from its last
+inference. Later frames are compared against that reference (not the previous
+frame, so slow movement still accumulates into a change). If too few pixels
+changed, the bench's previous keypoints are still valid and the detector call
+can be skipped.
+"""
+import cv2
+import numpy as np
+
+from config import (
+    MOTION_GATE, MOTION_THUMB_WIDTH, MOTION_PIXEL_DELTA,
+    MOTION_MIN_CHANGED, MOTION_MAX_REUSE_SEC
+)
+
+
+class MotionGate:
+    """Cheap per-ROI frame differencing (well under 1 ms per ROI)"""
+
+    def __init__(self, enabled=MOTION_GATE):
+        self.enabled = enabled
+        self.inferred = 0
+        self.skipped = 0
+
+    def thumbnail(self, roi_img):
+        """
+        Downscaled grayscale copy of an ROI crop.
+
+        Args:
+            roi_img: BGR ROI crop (may be a view into the frame)
+
+        Returns:
+            np.ndarray: uint8 (h, MOTION_THUMB_WIDTH) image
+        """
+        h, w = roi_img.shape[:2]
+        thumb_w = min(MOTION_THUMB_WIDTH, w)
+        thumb_h = max(1, int(h * thumb_w / w))
+
+        # Strided view of the green channel (closest to luma) keeps the resize
+        # input small; INTER_AREA then averages away sensor noise
+        step = max(1, w // (thumb_w * 2))
+        gray = roi_img[::step, ::step, 1]
+        return cv2.resize(gray, (thumb_w, thumb_h), interpolation=cv2.INTER_AREA)
+
+    def changed_fraction(self, reference, thumb):
+        """Fraction of thumbnail pixels that changed more than MOTION_PIXEL_DELTA"""
+        if reference is None or reference.shape != thumb.shape:
+            return 1.0
+        diff = cv2.absdiff(reference, thumb)
+        return np.count_nonzero(diff > MOTION_PIXEL_DELTA) / diff.size
+
+    def check(self, bench, roi_img):
+        """
+        Compare an ROI crop against the bench's reference thumbnail.
+
+        Args:
+            bench: Bench dict (reference stored under 'motion_ref')
+            roi_img: Current ROI crop
+
+        Returns:
+            bool: True if the ROI moved since the last inference
+        """
+        if not self.enabled:
+            return False
+
+        bench['motion_thumb'] = self.thumbnail(roi_img)
+        bench['motion_score'] = self.changed_fraction(bench.get('motion_ref'), bench['motion_thumb'])
+        return bench['motion_score'] >= MOTION_MIN_CHANGED
+
+    def can_reuse(self, bench, now):
+        """
+        Check whether the previous keypoints may stand in for a new inference.
+
+        Args:
+            bench: Bench dict after check()
+            now: Current timestamp
+
+        Returns:
+            bool: True if the ROI is static and the cached keypoints are fresh enough
+        """
+        if not self.enabled or bench.get('motion_ref') is None:
+            return False
+        if now - bench.get('lm_time', 0.0) > MOTION_MAX_REUSE_SEC:
+            return False
+        return bench.get('motion_score', 1.0) < MOTION_MIN_CHANGED
+
+    def mark_inferred(self, bench):
+        """Use the current thumbnail as the new reference after an inference"""
+        self.inferred += 1
+        bench['motion_ref'] = bench.get('motion_thumb')
+
+    def mark_skipped(self):
+        self.skipped += 1
+
+    def skip_ratio(self):
+        """Fraction of due inferences answered from cached keypoints"""
+        total = self.inferred + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def reset_stats(self):
+        self.inferred = 0
+        self.skipped = 0
@@ -0,0 +1,239 @@
+"""
+Several cameras sharing one pose model and one inference budget.
+
+Larger gyms cover their benches with 3-4 cameras. Each camera keeps its own
+BenchPipeline (ROIs, analyzers, motion gate, tracker), but all of them share
+one detector and one InferenceScheduler:
+
+    - the model is loaded once (or one InferencePool / remote server serves
+      every camera)
+    - the benches due on all cameras are prioritized together against one
+      per-frame budget, so a danger on one camera outranks an idle bench on
+      another
+    - all due crops go to the detector as one batch: their ROIs are copied
+      into a canvas with one band per camera (FrameCanvas) and the crop
+      rects are shifted into that band, so detectors with detect_batch()
+      fill their batches across cameras without knowing about them
+
+Processing rate and latency (frame arrival -> results) are tracked per
+camera, see camera_stats().
+"""
+from contextlib import ExitStack
+
+import numpy as np
+
+from config import TARGET_FPS, TRACKER_MODE
+from core.clock import wall_clock
+from core.pipeline import BenchPipeline
+from core.scheduler import InferenceScheduler
+from core.tracker import KeypointTracker
+
+
+class FrameCanvas:
+    """Camera frames stacked top to bottom in one reused buffer"""
+
+    def __init__(self):
+        self.canvas = None
+        self.offsets = []  # Top row of each camera's band
+
+    def layout(self, shapes):
+        """
+        Size the canvas for the given frame shapes.
+
+        The buffer is kept while the shapes do not change, so an
+        InferencePool does not have to recreate its shared-memory ring.
+
+        Args:
+            shapes: (height, width) per camera, None for a camera without a
+                    frame yet
+
+        Returns:
+            np.ndarray: Canvas (BGR)
+        """
+        offsets, top, width = [], 0, 1
+        for shape in shapes:
+            offsets.append(top)
+            if shape is not None:
+                top += shape[0]
+                width = max(width, shape[1])
+
+        if self.canvas is None or self.canvas.shape[:2] != (max(top, 1), width) or offsets != self.offsets:
+            self.canvas = np.zeros((max(top, 1), width, 3), dtype=np.uint8)
+            self.offsets = offsets
+        return self.canvas
+
+    def paste(self, idx, frame, rect):
+        """
+        Copy one region of a camera frame into that camera's band.
+
+        Args:
+            idx: Camera index
+            frame: Camera frame
+            rect: Pixel (x, y, w, h) in the camera frame
+
+        Returns:
+            tuple: The same region in canvas coordinates
+        """
+        x, y, w, h = rect
+        top = self.offsets[idx] + y
+        self.canvas[top:top+h, x:x+w] = frame[y:y+h, x:x+w]
+        return (x, top, w, h)
+
+
+class MultiCameraPipeline:
+    """One BenchPipeline per camera, batched through a shared detector and scheduler"""
+
+    def __init__(self, detector=None, names=("Camera 0",), fps=TARGET_FPS, scheduler=None,
+                 tracker_mode=TRACKER_MODE, person_detector=None, trace_cat="main", clock=None):
+        """
+        Args:
+            detector: Pose detector shared by all cameras (see BenchPipeline)
+            names: Camera names, one pipeline is created per name
+            fps: Nominal processing rate passed to the analyzers
+            scheduler: Shared InferenceScheduler (default: from config)
+            tracker_mode: KeypointTracker mode for every camera
+            person_detector: Shared PersonDetector for top-down pose models
+            trace_cat: Trace category for spans recorded by the pipelines
+            clock: Time source shared by all pipelines (default: wall clock)
+        """
+        self.names = list(names)
+        self.clock = clock or wall_clock
+        self.scheduler = scheduler or InferenceScheduler(fps=fps)
+        self.pipelines = [
+            BenchPipeline(detector, fps=fps, scheduler=self.scheduler,
+                          tracker=KeypointTracker(tracker_mode), trace_cat=trace_cat, clock=self.clock)
+            for _ in self.names
+        ]
+        # Runs the detections of all cameras; holds no benches itself
+        self.shared = BenchPipeline(detector, fps=fps, scheduler=self.scheduler,
+                                    person_detector=person_detector, trace_cat=trace_cat, clock=self.clock)
+        self.canvas = FrameCanvas()
+        self.shapes = [None] * len(self.names)
+
+        self.frame_times = [None] * len(self.names)
+        self.fps = [0.0] * len(self.names)
+        self.latency = [0.0] * len(self.names)
+
+    @property
+    def detector(self):
+        return self.shared.detector
+
+    @detector.setter
+    def detector(self, detector):
+        # LoadShedder swaps models through this
+        self.shared.detector = detector
+        for pipeline in self.pipelines:
+            pipeline.detector = detector
+
+    def set_rois(self, camera, rois):
+        """Set the bench ROIs of one camera (see BenchPipeline.set_rois)"""
+        self.pipelines[camera].set_rois(rois)
+
+    def process(self, frames, frame_times=None, timestamp=None):
+        """
+        Process the latest frame of every camera.
+
+        A camera is skipped if its frame is None or, when frame_times are
+        given, if it has not delivered a new frame since the last call.
+
+        Args:
+            frames: One BGR frame (or None) per camera
+            frame_times: Arrival time of each frame (on the same clock), for the
+                         per-camera rate and latency
+            timestamp: Processing time in seconds (defaults to the clock)
+
+        Returns:
+            list: Per camera, BenchPipeline.process() results, or None if
+                  the camera was skipped
+        """
+        now = timestamp if timestamp is not None else self.clock.time()
+        frame_times = frame_times or [None] * len(frames)
+        active = [idx for idx, frame in enumerate(frames)
+                  if frame is not None and (frame_times[idx] is None
+                                            or frame_times[idx] != self.frame_times[idx])]
+
+        with ExitStack() as stack:
+            for pipeline in self.pipelines:
+                stack.enter_context(pipeline.lock)
+
+            plans = {}
+            for idx in active:
+                self.shapes[idx] = frames[idx].shape[:2]
+                plans[idx] = self.pipelines[idx]._plan(frames[idx], now)
+            self._detect(frames, plans, now)
+
+            results = [None] * len(frames)
+            for idx in active:
+                results[idx] = self.pipelines[idx]._finish(plans[idx], now)
+
+        done = self.clock.time()
+        for idx in active:
+            self._update_rate(idx, frame_times[idx], done)
+        return results
+
+    def _detect(self, frames, plans, now):
+        """Detect the due benches of all cameras as one prioritized batch"""
+        if len(plans) == 1:
+            idx, entries = next(iter(plans.items()))
+            self.shared._detect_due(frames[idx], entries, now)
+            return
+
+        # ROIs needing a detection are copied into the canvas; crop rects are
+        # shifted into their camera's band for the detection and restored after
+        canvas = self.canvas.layout(self.shapes)
+        entries = []
+        for idx, plan in plans.items():
+            for entry in plan:
+                if entry['inferred']:
+                    entry['frame_rect'] = entry['rect']
+                    entry['rect'] = self.canvas.paste(idx, frames[idx], entry['rect'])
+                entries.append(entry)
+
+        try:
+            self.shared._detect_due(canvas, entries, now)
+        finally:
+            for entry in entries:
+                if 'frame_rect' in entry:
+                    entry['rect'] = entry.pop('frame_rect')
+
+    def _update_rate(self, idx, frame_time, done):
+        """Smoothed per-camera processing rate and arrival -> results latency"""
+        last = self.frame_times[idx]
+        self.frame_times[idx] = frame_time if frame_time is not None else done
+        if frame_time is not None:
+            self.latency[idx] = done - frame_time
+        if last is not None and self.frame_times[idx] > last:
+            fps = 1.0 / (self.frame_times[idx] - last)
+            self.fps[idx] = fps if not self.fps[idx] else 0.9 * self.fps[idx] + 0.1 * fps
+
+    def camera_stats(self):
+        """
+        Per-camera statistics.
+
+        Returns:
+            list: Per camera a dict with 'name', 'fps' (processed frames per
+                  second), 'latency' (seconds from frame arrival to results),
+                  'benches' and 'danger' (benches in DANGER)
+        """
+        return [{
+            'name': name,
+            'fps': self.fps[idx],
+            'latency': self.latency[idx],
+            'benches': len(pipeline.benches),
+            'danger': sum(bench['state'] == 'DANGER' for bench in pipeline.benches)
+        } for idx, (name, pipeline) in enumerate(zip(self.names, self.pipelines))]
+
+    def stats(self):
+        """Inference statistics over all cameras (same keys as BenchPipeline.stats())"""
+        stats = {'inferred': 0, 'skipped': 0, 'tracked': 0}
+        for pipeline in self.pipelines:
+            stats['inferred'] += pipeline.motion_gate.inferred
+            stats['skipped'] += pipeline.motion_gate.skipped
+            stats['tracked'] += pipeline.tracked
+        total = stats['inferred'] + stats['skipped']
+        stats['skip_ratio'] = stats['skipped'] / total if total else 0.0
+        stats['person_detections'] = self.shared.person_detections
+        stats['deferred'] = self.scheduler.deferred
+        stats.update(self.scheduler.activity_counts(
+            [bench for pipeline in self.pipelines for bench in pipeline.benches]))
+        return stats
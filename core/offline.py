@@ -0,0 +1,246 @@
+"""
+Offline analysis of recorded footage, as fast as the pipeline can go.
+
+Incident footage is reviewed daily, so an hour of video must not take an
+hour. analyze_video() reads every frame of a file through VideoFileReader
+(no throttling, no dropped frames) and feeds BenchPipeline with media
+timestamps, so the analyzer windows, stall timers and inference cadence see
+the same time axis as a live run. The result is a per-bench report:
+
+    {"video": ..., "duration_sec": ..., "frames": ..., "speed": 14.2,
+     "benches": [{"id": 1, "roi": {...}, "frames": ..., "inferred": ...,
+                  "state_sec": {"NORMAL": ..., "DANGER": ..., "NO_POSE": ...},
+                  "danger_events": 2, "danger_sec": ...}],
+     "events": [{"bench": 1, "start": 47.2, "end": 49.0, "duration": 1.8,
+                 "reason": "..."}]}
+
+Priority deferral and load shedding are live-only: offline every due bench
+is inferred, however long it takes. With every_frame, cadence, motion reuse
+and keypoint tracking are off too, so each result depends only on the
+frames of the last BUFFER_SIZE_SEC - the mode segment-parallel analysis
+(core.batch.analyze_segments) relies on.
+
+The pipeline runs on a MediaClock ticked with each frame's timestamp, so
+nothing in it reads the wall clock: the same file gives the same report on
+every run and every machine, whether it is analyzed flat out or paced at
+`rate` x real time.
+"""
+import json
+import os
+import time
+
+from config import TARGET_FPS, TRACKER_MODE, OFFLINE_REPORT_DIR, OFFLINE_PROGRESS_SEC
+from core.camera import VideoFileReader
+from core.clock import MediaClock
+from core.motion import MotionGate
+from core.pipeline import BenchPipeline
+from core.scheduler import InferenceScheduler
+from core.tracker import KeypointTracker
+
+
+class SessionReport:
+    """Collects per-frame bench results into state durations and DANGER events"""
+
+    def __init__(self, rois):
+        """
+        Args:
+            rois: Normalized bench ROIs (bench id = index + 1)
+        """
+        self.benches = {
+            idx + 1: {'id': idx + 1, 'roi': roi, 'frames': 0, 'inferred': 0, 'state_sec': {}}
+            for idx, roi in enumerate(rois)
+        }
+        self.events = []
+        self.open_events = {}  # bench id -> DANGER event still running
+        self.last = {}  # bench id -> (timestamp, state) of the previous frame
+
+    def add(self, results, timestamp):
+        """
+        Record one frame.
+
+        Args:
+            results: BenchPipeline.process() results
+            timestamp: Media time of the frame (seconds)
+        """
+        for result in results:
+            bench_id = result['id']
+            bench = self.benches[bench_id]
+            bench['frames'] += 1
+            bench['inferred'] += bool(result['inferred'])
+            self._advance(bench_id, timestamp)
+            self.last[bench_id] = (timestamp, result['state'])
+
+            event = self.open_events.get(bench_id)
+            if result['state'] == 'DANGER' and event is None:
+                self.open_events[bench_id] = {'bench': bench_id, 'start': timestamp,
+                                              'end': timestamp, 'reason': result['reason']}
+            elif result['state'] != 'DANGER' and event is not None:
+                self._close(bench_id, timestamp)
+
+    def _advance(self, bench_id, timestamp):
+        """Credit the time since the previous frame to the state it had"""
+        if bench_id not in self.last:
+            return
+        last_time, state = self.last[bench_id]
+        state_sec = self.benches[bench_id]['state_sec']
+        state_sec[state] = state_sec.get(state, 0.0) + max(0.0, timestamp - last_time)
+
+    def _close(self, bench_id, timestamp):
+        event = self.open_events.pop(bench_id)
+        event['duration'] = round(timestamp - event['start'], 3)
+        event['start'] = round(event['start'], 3)
+        event['end'] = round(timestamp, 3)
+        self.events.append(event)
+
+    def finish(self, end_time):
+        """
+        Close running events at end_time and build the report.
+
+        Returns:
+            dict: 'benches' and 'events' (sorted by start time)
+        """
+        for bench_id in list(self.last):
+            self._advance(bench_id, end_time)
+            self.last[bench_id] = (end_time, self.last[bench_id][1])
+        for bench_id in list(self.open_events):
+            self._close(bench_id, end_time)
+
+        events = sorted(self.events, key=lambda event: (event['start'], event['bench']))
+        benches = []
+        for bench_id, bench in self.benches.items():
+            bench_events = [event for event in events if event['bench'] == bench_id]
+            benches.append(dict(bench,
+                                state_sec={state: round(sec, 3) for state, sec in bench['state_sec'].items()},
+                                danger_events=len(bench_events),
+                                danger_sec=round(sum(event['duration'] for event in bench_events), 3)))
+        return {'benches': benches, 'events': events}
+
+
+def build_pipeline(rois, detector, person_detector=None, tracker_mode=TRACKER_MODE,
+                   fps=TARGET_FPS, every_frame=False, clock=None):
+    """
+    BenchPipeline configured for offline analysis.
+
+    Args:
+        every_frame: Infer every bench on every frame (no cadence, motion
+                     reuse or tracking)
+        clock: Pipeline clock (analyze_video passes its MediaClock)
+    """
+    if every_frame:
+        scheduler = InferenceScheduler(enabled=False, priority=False, fps=fps)
+        motion_gate, tracker = MotionGate(enabled=False), KeypointTracker('off')
+    else:
+        scheduler = InferenceScheduler(fps=fps, priority=False)
+        motion_gate, tracker = None, KeypointTracker(tracker_mode)
+    pipeline = BenchPipeline(detector, fps=fps, scheduler=scheduler, motion_gate=motion_gate,
+                             tracker=tracker, person_detector=person_detector, trace_cat="offline",
+                             clock=clock)
+    pipeline.set_rois(rois)
+    return pipeline
+
+
+def analyze_video(path, rois, detector, person_detector=None, tracker_mode=TRACKER_MODE,
+                  fps=None, progress_sec=OFFLINE_PROGRESS_SEC, every_frame=False, rate=None):
+    """
+    Analyze every frame of a video file on media time.
+
+    Args:
+        path: Video file
+        rois: Normalized bench ROIs
+        detector: Pose detector (anything BenchPipeline accepts)
+        person_detector: PersonDetector for top-down pose models
+        tracker_mode: KeypointTracker mode
+        fps: Nominal processing rate passed to the analyzers (None = the
+             video's frame rate, since every frame is analyzed)
+        progress_sec: Wall-clock seconds between progress lines (0 = quiet)
+        every_frame: Infer every bench on every frame (see build_pipeline)
+        rate: Pace the analysis at this many x real time (None = as fast
+              as possible); results do not depend on it
+
+    Returns:
+        dict: Report (see module docstring)
+    """
+    reader = VideoFileReader(path).start()
+    clock = MediaClock(rate=rate)
+    pipeline = build_pipeline(rois, detector, person_detector, tracker_mode, fps or reader.fps,
+                              every_frame, clock)
+    report = SessionReport(rois)
+
+    start = time.perf_counter()
+    next_progress = start + progress_sec
+    frames, timestamp = 0, 0.0
+    try:
+        while True:
+            item = reader.read()
+            if item is None:
+                break
+            frame, timestamp = item
+            clock.tick(timestamp)
+            report.add(pipeline.process(frame, timestamp), timestamp)
+            frames += 1
+
+            if progress_sec and time.perf_counter() >= next_progress:
+                next_progress += progress_sec
+                _print_progress(path, timestamp, reader.duration, time.perf_counter() - start)
+    finally:
+        reader.stop()
+
+    elapsed = time.perf_counter() - start
+    duration = timestamp + 1.0 / reader.fps if frames else 0.0
+    summary = report.finish(duration)
+    result = {
+        'video': os.path.abspath(path),
+        'duration_sec': round(duration, 3),
+        'frames': frames,
+        'processing_sec': round(elapsed, 3),
+        'speed': round(duration / elapsed, 2) if elapsed > 0 else None
+    }
+    result.update(summary)
+    result['stats'] = pipeline.stats()
+    return result
+
+
+def _print_progress(path, timestamp, duration, elapsed):
+    done = f"{timestamp / 60:.1f}/{duration / 60:.1f} min" if duration else f"{timestamp / 60:.1f} min"
+    speed = timestamp / elapsed if elapsed > 0 else 0.0
+    print(f"[Offline] {os.path.basename(path)}: {done} ({speed:.1f}x real time)")
+
+
+def report_path(video, report_dir=OFFLINE_REPORT_DIR):
+    """Default report file for a video: REPORT_DIR/<video name>.json"""
+    name = os.path.splitext(os.path.basename(video))[0]
+    return os.path.join(report_dir, f"{name}.json")
+
+
+def write_report(report, path):
+    """Write a report as JSON (atomically, like the profiles file)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def print_report(report):
+    """Per-bench summary on stdout"""
+    print(f"[Offline] {os.path.basename(report['video'])}: {report['frames']} frames, "
+          f"{report['duration_sec']:.1f}s of video in {report['processing_sec']:.1f}s "
+          f"({report['speed']}x real time)")
+    for bench in report['benches']:
+        print(f"  Bench {bench['id']}: {bench['danger_events']} DANGER event(s), "
+              f"{bench['danger_sec']:.1f}s in DANGER, {bench['inferred']}/{bench['frames']} frames inferred")
+    for event in report['events']:
+        print(f"    {_clock(event['start'])} Bench {event['bench']} ({event['duration']:.1f}s): {event['reason']}")
+
+
+def parse_clock(text):
+    """Seconds from '47.5', '12:30' or '00:47:12' (the report's event times)"""
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,83 @@
+"""
+Low-rate person boxes for the two-stage top-down pipeline.
+
+A small YOLO model at reduced imgsz finds the lifter box in each bench ROI.
+BenchPipeline only calls it when a bench has no box, its box is older than
+TOPDOWN_REDETECT_SEC, or the pose model lost the lifter; in between, boxes
+follow the lifter through the pose keypoints (TightCropper). The top-down
+pose model (ViTPose) then only ever sees one person box per bench.
+"""
+import numpy as np
+
+from config import TOPDOWN_PERSON_MODEL, TOPDOWN_PERSON_IMGSZ, TOPDOWN_PERSON_CONF, GPU_DEVICE
+
+PERSON_CLASS = 0  # COCO 'person'
+
+
+def box_iou(a, b):
+    """IoU of two (x1, y1, x2, y2) boxes"""
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class PersonDetector:
+    """Person boxes per ROI crop, batched over benches"""
+
+    def __init__(self, model=TOPDOWN_PERSON_MODEL, imgsz=TOPDOWN_PERSON_IMGSZ,
+                 conf=TOPDOWN_PERSON_CONF, device=GPU_DEVICE):
+        """
+        Args:
+            model: Ultralytics detection or pose weights (e.g. 'yolo11n.pt', 'yolo11n-pose.pt')
+            imgsz: Inference size - small, since a lifter fills most of the ROI
+            conf: Minimum person confidence
+            device: 'cuda:0' or 'cpu'
+        """
+        from ultralytics import YOLO
+
+        self.imgsz = imgsz
+        self.conf = conf
+        self.device = device
+
+        print(f"[PersonDetector] Loading {model} (imgsz={imgsz}, device={device})")
+        self.model = YOLO(model)
+
+    def detect_boxes(self, frame, rects, previous=None):
+        """
+        Find the lifter box in several crops of one frame.
+
+        The box overlapping the bench's previous box most is kept; without a
+        previous box the largest person wins (the lifter fills the ROI, a
+        spotter or passer-by is usually cut off at its edge).
+
+        Args:
+            frame: Full BGR frame
+            rects: (x, y, w, h) pixel crops (bench ROIs)
+            previous: Optional previous box per rect (normalized, or None)
+
+        Returns:
+            list: (x1, y1, x2, y2) box normalized to its crop, or None, per rect
+        """
+        if not rects:
+            return []
+        previous = previous or [None] * len(rects)
+
+        crops = [frame[y:y+h, x:x+w] for x, y, w, h in rects]
+        results = self.model(crops, imgsz=self.imgsz, conf=self.conf, classes=[PERSON_CLASS],
+                             device=self.device, verbose=False)
+
+        boxes = []
+        for result, (_, _, w, h), prev in zip(results, rects, previous):
+            xyxy = result.boxes.xyxy.cpu().numpy() if result.boxes is not None else np.zeros((0, 4))
+            if len(xyxy) == 0:
+                boxes.append(None)
+                continue
+
+            candidates = [(x1 / w, y1 / h, x2 / w, y2 / h) for x1, y1, x2, y2 in xyxy]
+            if prev is not None and max(box_iou(prev, box) for box in candidates) > 0:
+                boxes.append(max(candidates, key=lambda box: box_iou(prev, box)))
+            else:
+                boxes.append(max(candidates, key=lambda box: (box[2] - box[0]) * (box[3] - box[1])))
+        return boxes
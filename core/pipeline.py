@@ -0,0 +1,426 @@
+"""
+Per-bench detection and analysis pipeline.
+
+Shared by the GUI processing worker and the CLI so both apply the same
+ROI cropping, inference cadence and analysis to every frame.
+"""
+import threading
+
+from config import (
+    TARGET_FPS, TRACKER_MIN_CONFIDENCE, TOPDOWN_REDETECT_SEC, ROI_MATCH_OVERLAP, ROI_SAME_EPS
+)
+from core.analyzer import BenchPressAnalyzer
+from core.clock import wall_clock
+from core.scheduler import InferenceScheduler
+from core.motion import MotionGate
+from core.tracker import KeypointTracker
+from core.crop import TightCropper
+from core.tracing import tracer
+from utils.geometry import roi_to_pixels, roi_overlap
+
+
+class BenchPipeline:
+    """Runs pose detection + danger analysis for a set of bench ROIs"""
+
+    def __init__(self, detector=None, fps=TARGET_FPS, scheduler=None, motion_gate=None,
+                 tracker=None, cropper=None, person_detector=None, trace_cat="worker", clock=None):
+        """
+        Args:
+            detector: Pose detector with find_pose()/find_position(), or any
+                      object with detect_batch() (e.g. InferencePool)
+            fps: Nominal processing rate passed to the analyzers
+            scheduler: InferenceScheduler (default: adaptive cadence from config)
+            motion_gate: MotionGate (default: enabled from config)
+            tracker: KeypointTracker (default: TRACKER_MODE from config)
+            cropper: TightCropper (default: TIGHT_CROP from config)
+            person_detector: PersonDetector for top-down pose models; when
+                             set, pose runs only on person boxes found at a
+                             low rate (TOPDOWN_REDETECT_SEC), never on whole ROIs
+            trace_cat: Trace category for spans recorded by this pipeline
+            clock: Time source for frames without a timestamp and for the
+                   detection time fed to the scheduler (default: wall clock)
+        """
+        self.detector = detector
+        self.clock = clock or wall_clock
+        self.fps = fps
+        self.scheduler = scheduler or InferenceScheduler(fps=fps)
+        self.motion_gate = motion_gate or MotionGate()
+        self.tracker = tracker or KeypointTracker()
+        self.cropper = cropper or TightCropper()
+        self.person_detector = person_detector
+        self.tracked = 0
+        self.person_detections = 0
+        self.trace_cat = trace_cat
+        self.benches = []
+        self.lock = threading.Lock()  # Held for a whole frame; ROI edits wait for it
+
+    def set_rois(self, rois):
+        """
+        Set ROIs for processing, as a diff against the current benches.
+
+        - unchanged ROI: the bench is kept as is (analyzer, history, keypoints)
+        - moved or resized ROI (best overlap >= ROI_MATCH_OVERLAP with an old
+          one): the analyzer is kept with its history remapped to the new
+          ROI; crop-bound state (keypoints, person box, motion reference,
+          tracker) is dropped and the bench is inferred on the next frame
+        - anything else starts cold
+
+        Bench ids follow the new list order. The new bench list is swapped in
+        between two frames, never while process() runs.
+
+        Args:
+            rois: List of normalized ROI dicts
+        """
+        with self.lock:
+            old = list(self.benches)
+            matched = [None] * len(rois)
+
+            # Identical ROIs first, so an overlapping edit cannot take their bench
+            for idx, roi in enumerate(rois):
+                bench = next((bench for bench in old if self._same_roi(bench['roi'], roi)), None)
+                if bench is not None:
+                    old.remove(bench)
+                    matched[idx] = bench
+
+            # Then moved/resized ROIs by best overlap
+            for idx, roi in enumerate(rois):
+                if matched[idx] is not None or not old:
+                    continue
+                bench = max(old, key=lambda bench: roi_overlap(bench['roi'], roi))
+                if roi_overlap(bench['roi'], roi) >= ROI_MATCH_OVERLAP:
+                    old.remove(bench)
+                    self._move_bench(bench, roi)
+                    matched[idx] = bench
+
+            benches = []
+            for idx, (roi, bench) in enumerate(zip(rois, matched)):
+                if bench is None:
+                    bench = self._create_bench(idx, roi)
+                bench['id'] = idx + 1
+                benches.append(bench)
+            self.benches = benches
+
+    @staticmethod
+    def _same_roi(a, b):
+        return all(abs(a[key] - b[key]) < ROI_SAME_EPS for key in ('x', 'y', 'w', 'h'))
+
+    def _move_bench(self, bench, roi):
+        """Keep a bench's analysis history across an ROI edit, reset crop-bound state"""
+        bench['analyzer'].remap(bench['roi'], roi)
+        bench['roi'] = roi
+        bench['lm_list'] = []
+        bench['lm_time'] = 0.0
+        for key in ('person_box', 'box_time', 'motion_ref', 'motion_thumb', 'motion_score',
+                    'track', 'due_since'):
+            bench.pop(key, None)
+        self.scheduler.init_bench(bench)
+
+    def get_bench(self, bench_id):
+        """Return the bench dict with the given id (or None)"""
+        for bench in self.benches:
+            if bench['id'] == bench_id:
+                return bench
+        return None
+
+    def _create_bench(self, idx, roi):
+        bench = {
+            'id': idx + 1,
+            'roi': roi,
+            'analyzer': BenchPressAnalyzer(fps=self.fps, clock=self.clock),
+            'state': 'NORMAL',
+            'reason': '',
+            'lm_list': [],
+            'lm_time': 0.0
+        }
+        self.scheduler.init_bench(bench)
+        return bench
+
+    def detect(self, roi_img):
+        """Run the detector on one ROI crop and return its landmark list"""
+        self.detector.find_pose(roi_img, draw=False)
+        return self.detector.find_position(roi_img)
+
+    def detect_rects(self, frame, jobs):
+        """
+        Detect poses in several crops of one frame.
+
+        Detectors that provide detect_batch(frame, rects) (e.g. InferencePool)
+        get the whole batch at once; others are called crop by crop.
+
+        Args:
+            frame: Full BGR frame
+            jobs: List of (bench_id, (x, y, w, h)) pixel crops
+
+        Returns:
+            list: One landmark list per job, normalized to its crop
+        """
+        if not jobs:
+            return []
+
+        if hasattr(self.detector, 'detect_batch'):
+            with tracer.span("infer", self.trace_cat, benches=len(jobs)):
+                return self.detector.detect_batch(frame, [rect for _, rect in jobs])
+
+        lm_lists = []
+        for bench_id, (x, y, w, h) in jobs:
+            with tracer.span("infer", self.trace_cat, bench=bench_id):
+                lm_lists.append(self.detect(frame[y:y+h, x:x+w]))
+        return lm_lists
+
+    def process(self, frame, timestamp=None):
+        """
+        Process one frame for every bench.
+
+        Benches are handled in three passes: decide per bench whether cached,
+        tracked or detected keypoints are used; run all detections of the
+        frame as one batch, urgent benches first and over-budget benches
+        deferred to a later frame (InferenceScheduler.prioritize); then
+        analyze.
+
+        Args:
+            frame: Full BGR frame
+            timestamp: Frame time in seconds (defaults to the pipeline clock)
+
+        Returns:
+            list: One result dict per bench with 'id', 'state', 'reason',
+                  'roi', 'rect' (pixel x, y, w, h), 'keypoints' (latest
+                  landmarks, may be from an earlier frame), 'keypoints_time'
+                  (when they were detected), 'inferred', 'tracked',
+                  'analyzed' (the analyzer was fed on this frame) and
+                  'activity'
+        """
+        with self.lock:
+            return self._process(frame, timestamp if timestamp is not None else self.clock.time())
+
+    def _process(self, frame, now):
+        entries = self._plan(frame, now)
+        self._detect_due(frame, entries, now)
+        return self._finish(entries, now)
+
+    def _plan(self, frame, now):
+        """
+        First pass: crop, motion check and cadence decision for every bench.
+
+        Returns:
+            list: One entry dict per bench; entries with 'inferred' set still
+                  need a pose detection
+        """
+        h, w = frame.shape[:2]
+        cat = self.trace_cat
+
+        entries = []
+        for bench in self.benches:
+            rect = roi_to_pixels(bench['roi'], w, h)
+            if rect is None:
+                continue
+            r_x, r_y, r_w, r_h = rect
+
+            with tracer.span("crop", cat, bench=bench['id']):
+                roi_img = frame[r_y:r_y+r_h, r_x:r_x+r_w]
+
+            # Motion since the last inference promotes low-rate benches immediately
+            with tracer.span("motion", cat, bench=bench['id']):
+                moving = self.motion_gate.check(bench, roi_img)
+            if moving:
+                self.scheduler.promote(bench)
+
+            entry = {'bench': bench, 'rect': rect, 'roi_img': roi_img,
+                     'due': self.scheduler.is_due(bench, now), 'reuse': False,
+                     'lm_list': None, 'tracked': False, 'inferred': False}
+            if entry['due']:
+                if self.motion_gate.can_reuse(bench, now):
+                    entry['reuse'] = True
+                else:
+                    entry['lm_list'], entry['tracked'] = self._track(bench, roi_img, now)
+                    entry['inferred'] = not entry['tracked']
+            entries.append(entry)
+        return entries
+
+    def _detect_due(self, frame, entries, now):
+        """
+        Second pass: detect every entry that needs it as one batch.
+
+        Danger and near-danger benches go first; the rest are deferred to a
+        later frame if over budget. frame is what the entry rects index into
+        (a camera frame, or the shared canvas of a MultiCameraPipeline).
+        """
+        pending = {id(e['bench']): e for e in entries if e['inferred']}
+        serve, defer = self.scheduler.prioritize([e['bench'] for e in pending.values()], now)
+        for bench in defer:
+            entry = pending[id(bench)]
+            entry['due'] = entry['inferred'] = False
+
+        if serve and hasattr(self.detector, 'publish'):
+            # Shared-memory detectors: one copy of the frame serves every batch below
+            frame = self.detector.publish(frame, now)
+
+        detect_start = self.clock.time()
+        self._detect_entries(frame, [pending[id(bench)] for bench in serve], now)
+        self.scheduler.record_inference(self.clock.time() - detect_start, len(serve))
+
+    def _finish(self, entries, now):
+        """Third pass: analyze, reschedule and build the result dicts"""
+        results = []
+        for entry in entries:
+            bench = entry['bench']
+            if entry['due']:
+                if entry['reuse']:
+                    # Static ROI: previous keypoints still hold. Feed them again so
+                    # the analyzer keeps collecting (stagnant) samples for stall checks
+                    self.motion_gate.mark_skipped()
+                    self._analyze(bench, bench['lm_list'], now)
+                else:
+                    if entry['inferred']:
+                        self.motion_gate.mark_inferred(bench)
+                        self.tracker.reset(bench, entry['lm_list'], entry['roi_img'], now)
+                    bench['lm_time'] = now
+                    self._analyze(bench, entry['lm_list'], now)
+
+                self.scheduler.update(bench, now, bench['lm_list'])
+
+            results.append({
+                'id': bench['id'],
+                'state': bench['state'],
+                'reason': bench['reason'],
+                'roi': bench['roi'],
+                'rect': entry['rect'],
+                'keypoints': bench['lm_list'],
+                'keypoints_time': bench['lm_time'],
+                'inferred': entry['inferred'],
+                'tracked': entry['tracked'],
+                'analyzed': entry['due'],
+                'activity': bench['activity']
+            })
+
+        return results
+
+    def _detect_entries(self, frame, entries, now):
+        """
+        Detect on a tight crop around each lifter, falling back to the full ROI.
+
+        With a person detector (top-down mode), expired or missing boxes are
+        refreshed first and a lost lifter is looked for with the person
+        detector instead of running pose on the full ROI.
+
+        Sets entry['lm_list'] (ROI-normalized) for every entry.
+        """
+        for entry in entries:
+            entry['lm_list'] = []
+
+        if self.person_detector is None:
+            self._detect_tight(frame, entries)
+
+            # Person lost in the tight crop (or no box yet): use the whole ROI
+            retry = [entry for entry in entries if not entry['lm_list']]
+            jobs = [(entry['bench']['id'], entry['rect']) for entry in retry]
+            for entry, lm_list in zip(retry, self.detect_rects(frame, jobs)):
+                entry['lm_list'] = lm_list
+        else:
+            stale = [entry for entry in entries
+                     if now - entry['bench'].get('box_time', float('-inf')) >= TOPDOWN_REDETECT_SEC]
+            self._find_people(frame, stale, now)
+            self._detect_tight(frame, entries)
+
+            # Lifter lost inside a propagated box: look for the person again
+            refreshed = {id(entry) for entry in stale}
+            retry = [entry for entry in entries if not entry['lm_list'] and id(entry) not in refreshed
+                     and entry['bench'].get('person_box') is not None]
+            self._find_people(frame, retry, now)
+            self._detect_tight(frame, retry)
+
+        for entry in entries:
+            bench = entry['bench']
+            had_box = bench.get('person_box') is not None
+            self.cropper.update(bench, entry['lm_list'])
+            if self.person_detector is not None and had_box and bench['person_box'] is None:
+                # Pose lost the lifter: without a box nothing is posed until the
+                # box goes stale, so look for the person on the next due frame
+                bench.pop('box_time', None)
+
+    def _detect_tight(self, frame, entries):
+        """Pose on each bench's person box + margin (the full ROI in top-down mode if the box fills it)"""
+        topdown = self.person_detector is not None
+        tight = []
+        for entry in entries:
+            r_x, r_y, r_w, r_h = entry['rect']
+            crop = self.cropper.crop_rect(entry['bench'], r_w, r_h, force=topdown)
+            if crop is None and topdown and entry['bench'].get('person_box') is not None:
+                crop = (0, 0, r_w, r_h)
+            if crop is not None:
+                x, y, c_w, c_h = crop
+                tight.append((entry, crop, (r_x + x, r_y + y, c_w, c_h)))
+
+        jobs = [(entry['bench']['id'], frame_rect) for entry, _, frame_rect in tight]
+        for (entry, crop, _), lm_list in zip(tight, self.detect_rects(frame, jobs)):
+            if lm_list:
+                _, _, r_w, r_h = entry['rect']
+                entry['lm_list'] = self.cropper.to_roi(lm_list, crop, r_w, r_h)
+
+    def _find_people(self, frame, entries, now):
+        """Refresh the person box of each entry's bench with the person detector"""
+        if not entries:
+            return
+
+        with tracer.span("person", self.trace_cat, benches=len(entries)):
+            boxes = self.person_detector.detect_boxes(
+                frame, [entry['rect'] for entry in entries],
+                previous=[entry['bench'].get('person_box') for entry in entries])
+
+        self.person_detections += len(entries)
+        for entry, box in zip(entries, boxes):
+            entry['bench']['person_box'] = box
+            entry['bench']['box_time'] = now
+
+    def _track(self, bench, roi_img, now):
+        """
+        Propagate keypoints instead of detecting, if the tracker allows it.
+
+        Returns:
+            (lm_list, tracked): tracked is False if a detection is needed
+        """
+        if self.tracker.needs_detection(bench):
+            return None, False
+
+        with tracer.span("track", self.trace_cat, bench=bench['id']):
+            lm_list, confidence = self.tracker.track(bench, roi_img, now)
+
+        if confidence < TRACKER_MIN_CONFIDENCE:
+            return None, False
+
+        self.tracked += 1
+        return lm_list, True
+
+    def stats(self):
+        """
+        Inference statistics since the last reset.
+
+        Returns:
+            dict: 'inferred', 'skipped' (motion gate), 'skip_ratio',
+                  'tracked' (frames bridged by the keypoint tracker),
+                  'person_detections' (top-down box refreshes), 'deferred'
+                  (detections postponed by the priority scheduler) and bench
+                  counts per activity class
+        """
+        stats = {
+            'inferred': self.motion_gate.inferred,
+            'skipped': self.motion_gate.skipped,
+            'skip_ratio': self.motion_gate.skip_ratio(),
+            'tracked': self.tracked,
+            'person_detections': self.person_detections,
+            'deferred': self.scheduler.deferred
+        }
+        stats.update(self.scheduler.activity_counts(self.benches))
+        return stats
+
+    def _analyze(self, bench, lm_list, now):
+        """Feed fresh landmarks to the bench analyzer"""
+        bench['lm_list'] = lm_list
+
+        if lm_list:
+            with tracer.span("analyze", self.trace_cat, bench=bench['id']):
+                state, reason = bench['analyzer'].analyze(lm_list, timestamp=now)
+            bench['state'] = state
+            bench['reason'] = reason
+        else:
+            bench['state'] = 'NO_POSE'
+            bench['reason'] = 'No person detected'
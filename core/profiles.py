@@ -0,0 +1,152 @@
+"""
+Named camera profiles for instant resume.
+
+A profile holds everything needed to start monitoring without dialogs: the
+video source, the bench ROIs and colors, and the detector settings. All
+profiles live in one JSON file (PROFILES_PATH):
+
+    {"last": "Camera 0",
+     "profiles": {"Camera 0": {"source": 0, "rois": [...], "colors": [...],
+                               "detector": "yolo", "device": "cuda:0",
+                               "model_size": "auto", "saved": "..."}}}
+
+The GUI saves the active profile whenever bench areas are configured and,
+with PROFILE_AUTOLOAD, resumes the last one at startup. main.py uses
+--profile NAME.
+"""
+import json
+import os
+import time
+
+from config import (
+    PROFILES_PATH, BENCH_COLORS, DETECTOR_TYPE, GPU_DEVICE, YOLO_MODEL_SIZE
+)
+
+ROI_KEYS = ('x', 'y', 'w', 'h')
+DETECTOR_KEYS = ('detector', 'device', 'model_size')
+
+
+def make_profile(source, rois, colors=BENCH_COLORS, detector=DETECTOR_TYPE,
+                 device=GPU_DEVICE, model_size=YOLO_MODEL_SIZE):
+    """
+    Args:
+        source: Camera index or video file path
+        rois: Normalized bench ROI dicts
+        colors: Bench colors (RGB tuples), one per bench or a shared palette
+        detector: Detector backend name
+        device: 'cuda:0' or 'cpu'
+        model_size: YOLO size ('auto' allowed)
+
+    Returns:
+        dict: Profile ready for save_profile()
+    """
+    return {
+        'source': source,
+        'rois': [{key: float(roi[key]) for key in ROI_KEYS} for roi in rois],
+        'colors': [list(color) for color in colors],
+        'detector': detector,
+        'device': device,
+        'model_size': model_size
+    }
+
+
+def detector_settings(profile):
+    """The profile's detector settings, as make_profile() keyword arguments"""
+    return {key: profile[key] for key in DETECTOR_KEYS}
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {'last': None, 'profiles': {}}
+    data.setdefault('last', None)
+    data.setdefault('profiles', {})
+    return data
+
+
+def _save(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)  # A power cut mid-write keeps the previous file
+
+
+def _valid_roi(roi):
+    try:
+        x, y, w, h = (float(roi[key]) for key in ROI_KEYS)
+    except (KeyError, TypeError, ValueError):
+        return False
+    return 0.0 <= x < 1.0 and 0.0 <= y < 1.0 and 0.0 < w <= 1.0 and 0.0 < h <= 1.0
+
+
+def profile_names(path=PROFILES_PATH):
+    """Saved profile names, sorted"""
+    return sorted(_load(path)['profiles'])
+
+
+def get_profile(name=None, path=PROFILES_PATH):
+    """
+    Load a profile.
+
+    Args:
+        name: Profile name (None = the last saved or loaded one)
+        path: Profiles JSON file
+
+    Returns:
+        dict or None: Profile with its 'name', or None if missing or it has
+                      no usable ROIs
+    """
+    data = _load(path)
+    name = name if name is not None else data['last']
+    profile = data['profiles'].get(name) if name is not None else None
+    if profile is None:
+        return None
+
+    rois = [roi for roi in profile.get('rois', []) if _valid_roi(roi)]
+    if len(rois) < len(profile.get('rois', [])):
+        print(f"[Profile] '{name}': skipped {len(profile['rois']) - len(rois)} invalid ROI(s)")
+    if not rois or profile.get('source') is None:
+        print(f"[Profile] '{name}' has no source or ROIs - ignored")
+        return None
+
+    profile = dict(profile, name=name, rois=rois)
+    profile['colors'] = [tuple(color) for color in profile.get('colors') or BENCH_COLORS]
+    profile.setdefault('detector', DETECTOR_TYPE)
+    profile.setdefault('device', GPU_DEVICE)
+    profile.setdefault('model_size', YOLO_MODEL_SIZE)
+    return profile
+
+
+def save_profile(name, profile, path=PROFILES_PATH):
+    """
+    Save (or overwrite) a profile and make it the one resumed at startup.
+
+    Args:
+        name: Profile name
+        profile: Dict from make_profile()
+        path: Profiles JSON file
+    """
+    data = _load(path)
+    data['profiles'][name] = dict(profile, saved=time.strftime('%Y-%m-%d %H:%M:%S'))
+    data['profiles'][name].pop('name', None)
+    data['last'] = name
+    _save(path, data)
+    print(f"[Profile] Saved '{name}' ({len(profile['rois'])} bench(es), source {profile['source']})")
+
+
+def set_last(name, path=PROFILES_PATH):
+    """Make an existing profile the one resumed at startup"""
+    data = _load(path)
+    if name in data['profiles'] and data['last'] != name:
+        data['last'] = name
+        _save(path, data)
+
+
+def default_name(source):
+    """Profile name for a source: 'Camera N' or the video file name"""
+    if isinstance(source, int):
+        return f"Camera {source}"
+    return os.path.basename(str(source))
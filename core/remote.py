@@ -0,0 +1,521 @@
+"""
+Remote pose inference over TCP.
+
+Lets the gym PCs send ROI crops to one inference box on the LAN:
+
+    PoseServer          wraps a detector (DETECTOR_TYPE by default) and
+                        answers requests in arrival order
+    RemotePoseDetector  client with the find_pose()/find_position() interface
+                        (plus detect_batch()), usable anywhere a local
+                        detector is
+
+Requests are pipelined over a few persistent connections. Each connection
+allows REMOTE_MAX_INFLIGHT unanswered requests; the server's request queue
+is bounded and its readers stop reading when it is full, so TCP flow control
+pushes back to the clients. Every request carries a deadline: the server
+skips requests that waited too long, and the client falls back to local
+inference for any crop not answered in time.
+
+Each connection starts with a handshake: the client names its detector
+backend, the server answers with its own and closes the connection if the
+keypoint layouts differ (17 COCO vs 33 MediaPipe keypoints), so the layout
+never changes when a client falls back to its local model.
+
+Wire format (header integers big-endian):
+
+    header   !4sBBIHHHI  magic b'BPG2', kind, flags, request_id,
+                         a, b, deadline_ms, payload_len
+    HELLO    flags = STATUS_* (server reply), a = keypoints in the layout,
+             payload = ASCII backend name
+    REQUEST  flags = ENCODING_*, a = width, b = height,
+             payload = JPEG bytes or raw BGR uint8 pixels
+    RESPONSE flags = STATUS_*, a = keypoints, b = values per keypoint (3),
+             payload = little-endian float32 (x, y, visibility), normalized
+             to the crop
+
+Run a server:  python -m core.remote --port 7860 --detector yolo
+"""
+import argparse
+import itertools
+import queue
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config import (
+    REMOTE_PORT, REMOTE_DEADLINE_SEC, REMOTE_CONNECTIONS, REMOTE_MAX_INFLIGHT,
+    REMOTE_ENCODING, REMOTE_JPEG_QUALITY, REMOTE_RECONNECT_SEC, REMOTE_SERVER_QUEUE,
+    DETECTOR_TYPE, GPU_DEVICE, YOLO_MODEL_SIZE
+)
+from core.detector_factory import DETECTORS, keypoint_count
+from core.inference_pool import pack_landmarks, unpack_landmarks
+
+MAGIC = b'BPG2'
+HEADER = struct.Struct('!4sBBIHHHI')
+
+REQUEST = 1
+RESPONSE = 2
+HELLO = 3
+
+ENCODING_RAW = 0
+ENCODING_JPEG = 1
+ENCODINGS = {'raw': ENCODING_RAW, 'jpeg': ENCODING_JPEG}
+
+STATUS_OK = 0
+STATUS_EXPIRED = 1
+STATUS_ERROR = 2
+
+CONNECT_TIMEOUT_SEC = 1.0
+
+
+class LayoutMismatch(ConnectionError):
+    """The server's detector outputs a different keypoint layout than the client's"""
+
+
+# --- Wire format -----------------------------------------------------------
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            raise ConnectionError("Connection closed")
+        got += n
+    return bytes(buf)
+
+
+def read_message(sock):
+    """
+    Read one message.
+
+    Returns:
+        tuple: (kind, flags, request_id, a, b, deadline_ms, payload)
+
+    Raises:
+        ConnectionError: On EOF or a bad magic
+    """
+    magic, kind, flags, request_id, a, b, deadline_ms, length = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC:
+        raise ConnectionError(f"Bad magic {magic!r}")
+    payload = _recv_exact(sock, length) if length else b''
+    return kind, flags, request_id, a, b, deadline_ms, payload
+
+
+def write_message(sock, kind, flags, request_id, a, b, deadline_ms, payload):
+    sock.sendall(HEADER.pack(MAGIC, kind, flags, request_id, a, b, deadline_ms, len(payload)) + payload)
+
+
+def encode_crop(img, encoding, quality=REMOTE_JPEG_QUALITY):
+    if encoding == ENCODING_JPEG:
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+    return np.ascontiguousarray(img).tobytes()
+
+
+def decode_crop(payload, encoding, w, h):
+    if encoding == ENCODING_JPEG:
+        return cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return np.frombuffer(payload, dtype=np.uint8).reshape(h, w, 3)
+
+
+def _keypoint_bytes(keypoints):
+    if keypoints is None:
+        return 0, b''
+    return len(keypoints), keypoints.astype('<f4').tobytes()
+
+
+def _keypoints_from(payload, count, cols):
+    if count == 0:
+        return None
+    return np.frombuffer(payload, dtype='<f4').reshape(count, cols)
+
+
+# --- Server ------------------------------------------------------------------
+
+class PoseServer:
+    """Serves a pose detector to RemotePoseDetector clients"""
+
+    def __init__(self, detector=None, host='0.0.0.0', port=REMOTE_PORT, queue_size=REMOTE_SERVER_QUEUE,
+                 kind=DETECTOR_TYPE, device=GPU_DEVICE, model_size=YOLO_MODEL_SIZE):
+        """
+        Args:
+            detector: Detector with find_pose()/find_position()
+                      (default: built from kind/device/model_size)
+            host: Interface to listen on
+            port: TCP port (0 = pick a free port, see self.port)
+            queue_size: Requests queued before readers stop reading
+            kind: Backend name, one of DETECTORS; sent in the handshake
+                  (also describes a given detector's keypoint layout)
+            device: 'cuda:0' or 'cpu'
+            model_size: YOLO size
+        """
+        self.detector = detector
+        self.kind = kind
+        self.device = device
+        self.model_size = model_size
+        self.host = host
+        self.port = port
+        self.requests = queue.Queue(maxsize=queue_size)
+        self.running = False
+        self.sock = None
+        self.connections = []
+        self.served = 0
+        self.expired = 0
+
+    def start(self):
+        """Load the detector, bind and serve in background threads"""
+        if self.detector is None:
+            from core.detector_factory import create_detector
+            self.detector = create_detector(self.kind, self.device, self.model_size)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+
+        threading.Thread(target=self._accept_loop, name="PoseServer-accept", daemon=True).start()
+        threading.Thread(target=self._infer_loop, name="PoseServer-infer", daemon=True).start()
+        print(f"[PoseServer] Listening on {self.host}:{self.port} ({self.kind.upper()})")
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while self.running:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.append(conn)
+            print(f"[PoseServer] Client connected: {addr[0]}:{addr[1]}")
+            threading.Thread(target=self._read_loop, args=(conn, threading.Lock()),
+                             name=f"PoseServer-{addr[1]}", daemon=True).start()
+
+    def _handshake(self, conn):
+        """Answer the client's HELLO; False if its keypoint layout differs"""
+        kind, _, _, keypoints, _, _, payload = read_message(conn)
+        if kind != HELLO:
+            return False
+        ok = keypoints == keypoint_count(self.kind)
+        if not ok:
+            print(f"[PoseServer] Rejected client: expects {payload.decode('ascii', 'replace')} "
+                  f"({keypoints} keypoints), serving {self.kind} ({keypoint_count(self.kind)})")
+        write_message(conn, HELLO, STATUS_OK if ok else STATUS_ERROR, 0,
+                      keypoint_count(self.kind), 0, 0, self.kind.encode('ascii'))
+        return ok
+
+    def _read_loop(self, conn, send_lock):
+        try:
+            if not self._handshake(conn):
+                return
+            while self.running:
+                kind, flags, request_id, w, h, deadline_ms, payload = read_message(conn)
+                if kind != REQUEST:
+                    continue
+                expires = time.monotonic() + deadline_ms / 1000.0
+                # Blocks when the queue is full -> we stop reading -> TCP backpressure
+                self.requests.put((conn, send_lock, request_id, flags, w, h, payload, expires))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+            if conn in self.connections:
+                self.connections.remove(conn)
+
+    def _infer_loop(self):
+        while self.running:
+            try:
+                item = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+
+            conn, send_lock, request_id, encoding, w, h, payload, expires = item
+            keypoints = None
+            if time.monotonic() > expires:
+                # The client has already fallen back - don't spend inference on it
+                status = STATUS_EXPIRED
+                self.expired += 1
+            else:
+                try:
+                    crop = decode_crop(payload, encoding, w, h)
+                    self.detector.find_pose(crop, draw=False)
+                    keypoints = pack_landmarks(self.detector.find_position(crop))
+                    status = STATUS_OK
+                    self.served += 1
+                except Exception as e:
+                    print(f"[PoseServer] Inference failed: {e}")
+                    status = STATUS_ERROR
+
+            count, body = _keypoint_bytes(keypoints)
+            try:
+                with send_lock:
+                    write_message(conn, RESPONSE, status, request_id, count, 3, 0, body)
+            except OSError:
+                pass  # Client went away; its reader thread cleans up
+
+    def stop(self):
+        self.running = False
+        if self.sock is not None:
+            self.sock.close()
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+        try:
+            self.requests.put_nowait(None)
+        except queue.Full:
+            pass
+        print(f"[PoseServer] Stopped ({self.served} served, {self.expired} expired)")
+
+
+# --- Client ------------------------------------------------------------------
+
+class _Reply:
+    """One pending request; set by the connection's reader thread"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.status = STATUS_ERROR
+        self.keypoints = None
+
+    def set(self, status, keypoints=None):
+        self.status = status
+        self.keypoints = keypoints
+        self.event.set()
+
+
+class _Connection:
+    """Persistent connection with a window of pipelined requests"""
+
+    def __init__(self, host, port, max_inflight, kind):
+        self.sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT_SEC)
+        try:
+            self._handshake(kind)
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.window = threading.BoundedSemaphore(max_inflight)
+        self.send_lock = threading.Lock()
+        self.pending = {}
+        self.alive = True
+        threading.Thread(target=self._read_loop, name="RemotePose-reader", daemon=True).start()
+
+    def _handshake(self, kind):
+        """
+        Raises:
+            LayoutMismatch: The server runs a backend with another keypoint layout
+        """
+        write_message(self.sock, HELLO, 0, 0, keypoint_count(kind), 0, 0, kind.encode('ascii'))
+        reply, status, _, keypoints, _, _, payload = read_message(self.sock)
+        if reply != HELLO or status != STATUS_OK:
+            raise LayoutMismatch(f"server runs {payload.decode('ascii', 'replace')} ({keypoints} keypoints), "
+                                 f"client expects {kind} ({keypoint_count(kind)})")
+
+    def send(self, request_id, reply, encoding, w, h, deadline_ms, payload):
+        self.pending[request_id] = reply
+        try:
+            with self.send_lock:
+                write_message(self.sock, REQUEST, encoding, request_id, w, h, deadline_ms, payload)
+        except OSError:
+            self.close()
+
+    def _read_loop(self):
+        try:
+            while self.alive:
+                kind, status, request_id, count, cols, _, payload = read_message(self.sock)
+                reply = self.pending.pop(request_id, None)
+                self.window.release()
+                if reply is not None:
+                    reply.set(status, _keypoints_from(payload, count, cols))
+        except (ConnectionError, OSError, ValueError):
+            pass
+        self.close()
+
+    def close(self):
+        if not self.alive:
+            return
+        self.alive = False
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        # Fail everything still waiting on this connection
+        for reply in list(self.pending.values()):
+            reply.set(STATUS_ERROR)
+        self.pending.clear()
+
+
+class RemotePoseDetector:
+    """Detector interface backed by a PoseServer, with local fallback"""
+
+    def __init__(self, host, port=REMOTE_PORT, deadline=REMOTE_DEADLINE_SEC, fallback=None,
+                 connections=REMOTE_CONNECTIONS, max_inflight=REMOTE_MAX_INFLIGHT,
+                 encoding=REMOTE_ENCODING, kind=DETECTOR_TYPE):
+        """
+        Args:
+            host: Server address
+            port: Server port
+            deadline: Seconds a request may take before local inference is used
+            fallback: Local detector, or a zero-argument factory called on the
+                      first miss (None = report no person on a miss)
+            connections: Persistent connections to keep open
+            max_inflight: Unanswered requests allowed per connection
+            encoding: 'jpeg' or 'raw' crops
+            kind: Backend of the fallback; a server whose keypoint layout
+                  differs is rejected and every crop is inferred locally
+        """
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.fallback = fallback
+        self.connections = [None] * max(1, connections)
+        self.max_inflight = max_inflight
+        self.encoding = ENCODINGS[encoding]
+        self.kind = kind
+        self.rejected = False
+        self.request_ids = itertools.count(1)
+        self.next_conn = 0
+        self.last_connect = {}
+        self.lm_list = []
+
+        self.remote = 0
+        self.fallbacks = 0
+
+    # --- Detector interface ---------------------------------------------------
+
+    def find_pose(self, img, draw=False):
+        h, w = img.shape[:2]
+        self.lm_list = self.detect_batch(img, [(0, 0, w, h)])[0]
+        return img
+
+    def find_position(self, img):
+        return self.lm_list
+
+    def detect_batch(self, frame, rects):
+        """
+        Send all crops at once, then collect the answers.
+
+        Args:
+            frame: Full BGR frame
+            rects: List of pixel (x, y, w, h) crops
+
+        Returns:
+            list: One landmark list per rect (normalized to that rect)
+        """
+        deadline = time.monotonic() + self.deadline
+        crops = [frame[y:y+h, x:x+w] for x, y, w, h in rects]
+        replies = [self._submit(crop, deadline) for crop in crops]
+
+        out = []
+        for crop, reply in zip(crops, replies):
+            h, w = crop.shape[:2]
+            if reply is not None and reply.event.wait(max(0.0, deadline - time.monotonic())) \
+                    and reply.status == STATUS_OK:
+                self.remote += 1
+                out.append(unpack_landmarks(reply.keypoints, w, h))
+            else:
+                self.fallbacks += 1
+                out.append(self._local(crop))
+        return out
+
+    # --- Internals --------------------------------------------------------------
+
+    def _connection(self):
+        """Next live connection (round-robin), reconnecting dead slots with a backoff"""
+        if self.rejected:
+            return None
+        for _ in range(len(self.connections)):
+            idx = self.next_conn
+            self.next_conn = (self.next_conn + 1) % len(self.connections)
+
+            conn = self.connections[idx]
+            if conn is not None and conn.alive:
+                return conn
+
+            now = time.monotonic()
+            if now - self.last_connect.get(idx, -REMOTE_RECONNECT_SEC) < REMOTE_RECONNECT_SEC:
+                continue
+            self.last_connect[idx] = now
+            try:
+                self.connections[idx] = _Connection(self.host, self.port, self.max_inflight, self.kind)
+                return self.connections[idx]
+            except LayoutMismatch as e:
+                print(f"[RemotePose] Not using {self.host}:{self.port}: {e}")
+                self.rejected = True
+                return None
+            except OSError as e:
+                print(f"[RemotePose] Cannot connect to {self.host}:{self.port}: {e}")
+        return None
+
+    def _submit(self, crop, deadline):
+        conn = self._connection()
+        if conn is None:
+            return None
+
+        # Backpressure: wait for a free slot in the window, but never past the deadline
+        if not conn.window.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return None
+
+        h, w = crop.shape[:2]
+        deadline_ms = int(max(0.0, deadline - time.monotonic()) * 1000)
+        reply = _Reply()
+        conn.send(next(self.request_ids) & 0xFFFFFFFF, reply, self.encoding, w, h,
+                  min(deadline_ms, 0xFFFF), encode_crop(crop, self.encoding))
+        return reply
+
+    def _local(self, crop):
+        if self.fallback is None:
+            return []
+        if not hasattr(self.fallback, 'find_pose'):
+            print("[RemotePose] Loading local fallback detector...")
+            self.fallback = self.fallback()
+        self.fallback.find_pose(crop, draw=False)
+        return self.fallback.find_position(crop)
+
+    def close(self):
+        for conn in self.connections:
+            if conn is not None:
+                conn.close()
+        self.connections = [None] * len(self.connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bench Press Guard remote pose server')
+    parser.add_argument('--host', type=str, default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=REMOTE_PORT)
+    parser.add_argument('--detector', type=str, default=DETECTOR_TYPE, choices=list(DETECTORS),
+                        help='Pose detector to serve (clients must use one with the same keypoint layout)')
+    parser.add_argument('--device', type=str, default=GPU_DEVICE,
+                        help='Device for inference: cuda:0 or cpu')
+    parser.add_argument('--model-size', type=str, default=YOLO_MODEL_SIZE,
+                        choices=['n', 's', 'm', 'l', 'x', 'auto'],
+                        help="YOLO model size ('auto' = largest that fits the frame budget on this machine)")
+    args = parser.parse_args()
+
+    PoseServer(host=args.host, port=args.port, kind=args.detector, device=args.device,
+               model_size=args.model_size).serve_forever()
@@ -0,0 +1,222 @@
+"""
+Per-bench inference cadence.
+
+Benches nobody is using do not need pose inference on every frame. Each bench
+is classified from its latest detection and analyzer history, and gets an
+inference interval from that class:
+
+    EMPTY   no person detected for
+            CADENCE_EMPTY_MISSES inferences  -> CADENCE_EMPTY_INTERVAL (~1 Hz)
+    IDLE    bar racked and still            -> CADENCE_IDLE_INTERVAL
+    ACTIVE  lifting, bar in the stall zone,
+            or DANGER                       -> every processed frame
+
+A bench is promoted back to ACTIVE by the first inference that sees a person
+or bar motion. Motion in the ROI (see core.motion) makes a bench due at once.
+
+Under overload (core.load_shedder) normal_interval is set: benches in the
+NORMAL state that are not near a danger threshold are then inferred at most
+once per normal_interval, motion included.
+
+When more benches are due than fit in PRIORITY_BUDGET of the frame period,
+prioritize() decides who is inferred on this frame: urgent benches (DANGER,
+near a danger threshold, or bar tilt rising) always go first; the others are
+served longest-waiting first in the remaining slots, and any bench deferred
+for PRIORITY_STARVATION_SEC is served regardless of the budget.
+"""
+from config import (
+    ADAPTIVE_CADENCE, CADENCE_EMPTY_INTERVAL, CADENCE_EMPTY_MISSES, CADENCE_IDLE_INTERVAL,
+    CADENCE_IDLE_WINDOW, CADENCE_IDLE_THRESHOLD, CADENCE_RACKED_MAX_Y,
+    TARGET_FPS, PRIORITY_SCHEDULING, PRIORITY_BUDGET, PRIORITY_STARVATION_SEC
+)
+
+EMPTY = 'EMPTY'
+IDLE = 'IDLE'
+ACTIVE = 'ACTIVE'
+
+
+class InferenceScheduler:
+    """Decides which benches get pose inference on the current frame"""
+
+    def __init__(self, enabled=ADAPTIVE_CADENCE, priority=PRIORITY_SCHEDULING, fps=TARGET_FPS,
+                 budget=PRIORITY_BUDGET, starvation_sec=PRIORITY_STARVATION_SEC):
+        """
+        Args:
+            enabled: Adaptive per-bench cadence (False = every bench every frame)
+            priority: Limit inference per frame and serve urgent benches first
+            fps: Processing rate the per-frame budget is taken from
+            budget: Fraction of the frame period available for pose inference
+            starvation_sec: Longest a non-urgent bench may be deferred
+        """
+        self.enabled = enabled
+        self.intervals = {
+            EMPTY: CADENCE_EMPTY_INTERVAL,
+            IDLE: CADENCE_IDLE_INTERVAL,
+            ACTIVE: 0.0
+        }
+        self.normal_interval = 0.0  # Set by LoadShedder under overload
+
+        self.priority = priority
+        self.frame_budget = budget / fps  # Seconds of inference per frame
+        self.starvation_sec = starvation_sec
+        self.crop_cost = None  # Smoothed seconds per inferred crop
+        self.deferred = 0
+
+    def init_bench(self, bench):
+        """New benches start at full rate until the first detection classifies them"""
+        bench['activity'] = ACTIVE
+        bench['next_infer'] = 0.0
+        bench['misses'] = 0
+
+    def is_due(self, bench, now):
+        """
+        Check whether a bench should be inferred on this frame.
+
+        Args:
+            bench: Bench dict
+            now: Current timestamp (seconds)
+
+        Returns:
+            bool: True if inference should run
+        """
+        if not self.enabled:
+            return True
+        return now >= bench.get('next_infer', 0.0)
+
+    def promote(self, bench):
+        """Make a bench due immediately (e.g. motion seen in its ROI)"""
+        if self._shed(bench):
+            bench['next_infer'] = min(bench.get('next_infer', 0.0),
+                                      bench.get('last_infer', 0.0) + self.normal_interval)
+        else:
+            bench['next_infer'] = 0.0
+
+    def update(self, bench, now, lm_list):
+        """
+        Reclassify a bench after an inference and schedule the next one.
+
+        Args:
+            bench: Bench dict (analyzer already updated with lm_list)
+            now: Timestamp of the inference
+            lm_list: Landmarks just detected (empty if no person)
+        """
+        activity = self.classify(bench, lm_list)
+        bench['activity'] = activity
+        bench['last_infer'] = now
+        bench.pop('due_since', None)
+
+        interval = self.intervals[activity]
+        if self._shed(bench):
+            interval = max(interval, self.normal_interval)
+        bench['next_infer'] = now + interval
+
+    def _shed(self, bench):
+        """True if the bench's cadence may be lowered under overload"""
+        if not self.normal_interval or bench.get('state') != 'NORMAL':
+            return False
+        return not bench['analyzer'].near_danger()
+
+    def is_urgent(self, bench):
+        """DANGER, near a danger threshold, or bar starting to tip"""
+        if bench.get('state') == 'DANGER':
+            return True
+        analyzer = bench['analyzer']
+        return analyzer.near_danger() or analyzer.tilt_rising()
+
+    def record_inference(self, seconds, crops):
+        """
+        Feed the measured detection time of one frame.
+
+        Args:
+            seconds: Time of the frame's detections on the pipeline clock
+                     (0 on a media or manual clock: nothing is deferred)
+            crops: Number of crops detected
+        """
+        if crops <= 0:
+            return
+        cost = seconds / crops
+        self.crop_cost = cost if self.crop_cost is None else 0.8 * self.crop_cost + 0.2 * cost
+
+    def slots(self):
+        """Crops that fit in the per-frame inference budget (None = unknown / unlimited)"""
+        if self.crop_cost is None or self.crop_cost <= 0:
+            return None
+        return max(1, int(self.frame_budget / self.crop_cost))
+
+    def prioritize(self, benches, now):
+        """
+        Order the benches that need inference and defer the ones over budget.
+
+        Args:
+            benches: Bench dicts due for a pose detection on this frame
+            now: Current timestamp (seconds)
+
+        Returns:
+            (serve, defer): Benches to infer now, urgent first; benches left
+                            due for a later frame
+        """
+        for bench in benches:
+            bench.setdefault('due_since', now)
+
+        if not self.priority:
+            return list(benches), []
+
+        urgent, rest = [], []
+        for bench in benches:
+            (urgent if self.is_urgent(bench) else rest).append(bench)
+        rest.sort(key=lambda bench: bench['due_since'])
+
+        slots = self.slots()
+        free = len(rest) if slots is None else max(0, slots - len(urgent))
+        serve, defer = list(urgent), []
+        for bench in rest:
+            if free > 0 or now - bench['due_since'] >= self.starvation_sec:
+                serve.append(bench)
+                free -= 1
+            else:
+                defer.append(bench)
+
+        self.deferred += len(defer)
+        return serve, defer
+
+    def classify(self, bench, lm_list):
+        """Map bench state to EMPTY / IDLE / ACTIVE"""
+        if not lm_list:
+            # A single missed detection is not an empty bench (a lifter pinned
+            # under the bar can drop out of a frame), and a bench in DANGER
+            # stays at full rate until a detection clears it
+            bench['misses'] = bench.get('misses', 0) + 1
+            if bench['misses'] < CADENCE_EMPTY_MISSES or bench['analyzer'].state == 'DANGER':
+                return ACTIVE
+            return EMPTY
+        bench['misses'] = 0
+
+        if bench.get('state') == 'DANGER':
+            return ACTIVE
+
+        analyzer = bench['analyzer']
+        barbell = analyzer.barbell
+        if not barbell.exists:
+            return ACTIVE
+
+        # Bar low in the ROI can be a stall - keep full rate there
+        if barbell.get_center_y() > CADENCE_RACKED_MAX_Y:
+            return ACTIVE
+
+        if analyzer.history.is_stagnant(CADENCE_IDLE_WINDOW, analyzer.fps,
+                                        threshold=CADENCE_IDLE_THRESHOLD):
+            return IDLE
+
+        return ACTIVE
+
+    def activity_counts(self, benches):
+        """
+        Count benches per activity class.
+
+        Returns:
+            dict: {activity: count}
+        """
+        counts = {EMPTY: 0, IDLE: 0, ACTIVE: 0}
+        for bench in benches:
+            counts[bench.get('activity', ACTIVE)] += 1
+        return counts
@@ -0,0 +1,216 @@
+"""
+Keyframe / timestamp index of a recorded video, cached next to the file.
+
+Seeking a capture by CAP_PROP_POS_FRAMES makes the backend guess where
+frame N is from the frame rate, and on many files (variable frame rate,
+B-frames, odd start times) it lands on the wrong frame or decodes a long
+way from an earlier keyframe. The index is built once by reading the
+container's packets without decoding them (CAP_PROP_FORMAT = -1), which
+takes a second or two for an hour of H.264:
+
+    timestamps  presentation time of every frame, in display order
+    keyframes   display index of every keyframe
+
+A seek then goes to the keyframe at or before the target, checks where the
+backend actually landed against the recorded timestamps and grab()s forward
+to the exact frame, so the same target always gives the same frame and
+media time. Jumping to an event an hour into a file decodes at most one
+GOP.
+
+The index is stored as <video>SEEK_INDEX_SUFFIX (or in SEEK_INDEX_DIR when
+the video's directory is read-only) together with the file's size and
+mtime, and is rebuilt when either changes.
+"""
+import bisect
+import hashlib
+import os
+import time
+import zipfile
+
+import cv2
+import numpy as np
+
+from config import SEEK_INDEX_SUFFIX, SEEK_INDEX_DIR
+
+INDEX_VERSION = 1
+
+
+class SeekIndex:
+    """Frame timestamps and keyframe positions of one video file"""
+
+    def __init__(self, timestamps, keyframes, fps):
+        """
+        Args:
+            timestamps: Media time (seconds) of each frame in display order
+            keyframes: Sorted display indices of the keyframes (includes 0)
+            fps: Nominal frame rate of the file
+        """
+        self.timestamps = [float(t) for t in timestamps]
+        self.keyframes = sorted(set(int(k) for k in keyframes) | {0})
+        self.fps = fps
+
+    @property
+    def frame_count(self):
+        return len(self.timestamps)
+
+    @property
+    def duration(self):
+        """Media time just past the last frame"""
+        if not self.timestamps:
+            return 0.0
+        return self.timestamps[-1] + 1.0 / self.fps
+
+    def timestamp(self, index):
+        """Media time of frame `index`"""
+        return self.timestamps[index]
+
+    def frame_at(self, seconds):
+        """Index of the frame on screen at a media time (last frame at or before it)"""
+        index = bisect.bisect_right(self.timestamps, seconds + 1e-6) - 1
+        return min(max(index, 0), max(self.frame_count - 1, 0))
+
+    def keyframe_before(self, index):
+        """Last keyframe at or before frame `index`"""
+        return self.keyframes[bisect.bisect_right(self.keyframes, index) - 1]
+
+    def seek(self, stream, index, position=None):
+        """
+        Position a capture so its next read() returns frame `index`.
+
+        Args:
+            stream: cv2.VideoCapture of the indexed file
+            index: Target frame (display order)
+            position: Frame the capture would return next, if the caller
+                      knows it - a target later in the same GOP is then
+                      reached by decoding forward, without a seek
+
+        Returns:
+            bool: False if the file ended before the target
+        """
+        index = min(max(index, 0), max(self.frame_count - 1, 0))
+        key = self.keyframe_before(index)
+        if position is None or not key <= position <= index:
+            position = self._landed(stream, key)
+            if position > index:
+                # Backend overshot the keyframe: decode from the start instead
+                stream.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                position = 0
+        for _ in range(index - position):
+            if not stream.grab():
+                return False
+        return True
+
+    def _landed(self, stream, key):
+        """Seek to a keyframe and return the frame the next read() will actually give"""
+        stream.set(cv2.CAP_PROP_POS_FRAMES, key)
+        if key < 2:
+            # Nothing decoded yet to check against; the first frames are reliable
+            return key
+        # After a seek the backend has decoded up to the frame before the
+        # target, and POS_MSEC reports that frame's time
+        seconds = stream.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        before = bisect.bisect_left(self.timestamps, seconds - 0.5 / self.fps)
+        return before + 1 if before < self.frame_count else key
+
+    @classmethod
+    def build(cls, path):
+        """
+        Index a video by demuxing its packets (no decoding).
+
+        Returns:
+            SeekIndex, or None if the backend cannot read raw packets
+        """
+        stream = cv2.VideoCapture(path)
+        try:
+            if not stream.isOpened() or not stream.set(cv2.CAP_PROP_FORMAT, -1):
+                return None
+            fps = stream.get(cv2.CAP_PROP_FPS)
+            fps = fps if 0 < fps <= 240 else 30.0
+
+            packets = []  # (presentation time, keyframe) in decode order
+            while stream.grab():
+                packets.append((stream.get(cv2.CAP_PROP_POS_MSEC) / 1000.0,
+                                bool(stream.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))))
+        finally:
+            stream.release()
+        if not packets:
+            return None
+
+        timestamps = sorted(seconds for seconds, _ in packets)
+        if len(timestamps) > 1 and timestamps[-1] <= 0:
+            # Container without timestamps: constant frame rate
+            timestamps = [idx / fps for idx in range(len(timestamps))]
+            keyframes = [idx for idx, (_, key) in enumerate(packets) if key]
+        else:
+            keyframes = [bisect.bisect_left(timestamps, seconds) for seconds, key in packets if key]
+        return cls(timestamps, keyframes, fps)
+
+    def save(self, path, source):
+        """Write the index with the size and mtime of the source video (atomically)"""
+        info = os.stat(source)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, version=INDEX_VERSION, size=info.st_size, mtime=info.st_mtime_ns,
+                                fps=self.fps, timestamps=np.asarray(self.timestamps, dtype=np.float64),
+                                keyframes=np.asarray(self.keyframes, dtype=np.int64))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, source):
+        """
+        Read a cached index.
+
+        Returns:
+            SeekIndex, or None if missing, unreadable or stale for `source`
+        """
+        try:
+            info = os.stat(source)
+            with np.load(path) as data:
+                if (int(data['version']) != INDEX_VERSION or int(data['size']) != info.st_size
+                        or int(data['mtime']) != info.st_mtime_ns):
+                    return None
+                return cls(data['timestamps'].tolist(), data['keyframes'].tolist(), float(data['fps']))
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+
+def index_paths(video):
+    """Sidecar next to the video, then the fallback under SEEK_INDEX_DIR"""
+    name = hashlib.sha1(os.path.abspath(video).encode()).hexdigest()[:16]
+    return [f"{video}{SEEK_INDEX_SUFFIX}", os.path.join(SEEK_INDEX_DIR, f"{name}{SEEK_INDEX_SUFFIX}")]
+
+
+def load_index(video, build=True):
+    """
+    Seek index of a video file, from the cache or built (and cached) now.
+
+    Args:
+        video: Video file
+        build: Index the file if no valid cache exists
+
+    Returns:
+        SeekIndex, or None (not cached and build=False, or not indexable)
+    """
+    paths = index_paths(video)
+    for path in paths:
+        index = SeekIndex.load(path, video)
+        if index is not None:
+            return index
+    if not build:
+        return None
+
+    start = time.perf_counter()
+    index = SeekIndex.build(video)
+    if index is None:
+        print(f"[SeekIndex] {os.path.basename(video)}: backend cannot read packets - seeking by frame number")
+        return None
+    print(f"[SeekIndex] Indexed {os.path.basename(video)}: {index.frame_count} frames, "
+          f"{len(index.keyframes)} keyframes in {time.perf_counter() - start:.2f}s")
+    for path in paths:
+        try:
+            index.save(path, video)
+            break
+        except OSError:
+            continue
+    return index
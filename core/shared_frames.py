@@ -0,0 +1,175 @@
+"""
+Shared-memory frame ring.
+
+Frames written by one process can be read by others without pickling or
+copying them through a pipe. The ring holds a fixed number of slots for one
+frame shape; a small header stores a write counter plus the sequence number
+and timestamp of each slot, so a reader can tell whether the slot it is
+looking at was overwritten while it read it.
+
+Layout of the segment:
+
+    int64    counter          frames written so far
+    int64    seq[slots]       sequence number held by each slot (-1 = empty)
+    float64  time[slots]      timestamp of each slot
+    uint8    frames[slots, h, w, c]
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import INFERENCE_RING_SLOTS
+
+
+class SharedFrameRing:
+    """Fixed-shape ring of uint8 frames in a multiprocessing.shared_memory segment"""
+
+    def __init__(self, shape, slots=INFERENCE_RING_SLOTS, name=None, create=True):
+        """
+        Args:
+            shape: Frame shape, e.g. (h, w, 3)
+            slots: Number of frames kept in the ring
+            name: Segment name to attach to (create=False)
+            create: Create a new segment instead of attaching
+        """
+        self.shape = tuple(int(s) for s in shape)
+        self.slots = int(slots)
+        self.owner = create
+
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (1 + 2 * self.slots)
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + self.slots * frame_bytes)
+        else:
+            self.shm = self._attach(name)
+
+        buf = self.shm.buf
+        self._counter = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._seq = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=8)
+        self._time = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=8 + 8 * self.slots)
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=header_bytes)
+
+        if create:
+            self._counter[0] = 0
+            self._seq[:] = -1
+            self._time[:] = 0.0
+
+    @staticmethod
+    def _attach(name):
+        """Attach without letting this process's exit unlink the segment"""
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: processes started by multiprocessing share the
+            # creator's resource tracker, which only unlinks on its own exit
+            return shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Picklable description used to attach from another process"""
+        return {'name': self.name, 'shape': self.shape, 'slots': self.slots}
+
+    @classmethod
+    def attach(cls, spec):
+        """Attach to a ring created by another process (see spec())"""
+        return cls(spec['shape'], slots=spec['slots'], name=spec['name'], create=False)
+
+    @property
+    def counter(self):
+        """Number of frames written so far"""
+        return int(self._counter[0])
+
+    def write(self, frame, timestamp=0.0):
+        """
+        Copy a frame into the next slot.
+
+        Args:
+            frame: uint8 array with the ring's shape
+            timestamp: Frame time in seconds
+
+        Returns:
+            int: Sequence number of the written frame
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match ring shape {self.shape}")
+
+        seq = int(self._counter[0])
+        slot = seq % self.slots
+
+        # Invalidate the slot first so readers never pair old data with the new seq
+        self._seq[slot] = -1
+        self.frames[slot] = frame
+        self._time[slot] = timestamp
+        self._seq[slot] = seq
+        self._counter[0] = seq + 1
+        return seq
+
+    def read(self, seq):
+        """
+        Zero-copy view of frame `seq`.
+
+        Returns:
+            np.ndarray or None: None if the frame has already been overwritten
+        """
+        slot = seq % self.slots
+        if self._seq[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def seq_of(self, frame):
+        """
+        Sequence number held by the slot `frame` is a view of.
+
+        Returns:
+            int or None: None if `frame` is not a whole slot of this ring (or
+                         the slot is being written)
+        """
+        if self.frames is None or frame.shape != self.shape or frame.strides != self.frames.strides[1:]:
+            return None
+        slot_bytes = self.frames[0].nbytes
+        offset = frame.__array_interface__['data'][0] - self.frames.__array_interface__['data'][0]
+        if offset < 0 or offset % slot_bytes or offset // slot_bytes >= self.slots:
+            return None
+        seq = int(self._seq[offset // slot_bytes])
+        return seq if seq >= 0 else None
+
+    def is_valid(self, seq):
+        """True while frame `seq` is still held by its slot"""
+        return self._seq[seq % self.slots] == seq
+
+    def latest(self):
+        """
+        Copy of the most recently written frame.
+
+        Returns:
+            (seq, timestamp, frame): (None, None, None) if nothing was written
+                                     or the writer lapped the reader
+        """
+        seq = self.counter - 1
+        if seq < 0:
+            return None, None, None
+
+        slot = seq % self.slots
+        frame = self.frames[slot].copy()
+        timestamp = float(self._time[slot])
+        if self._seq[slot] != seq:
+            return None, None, None
+        return seq, timestamp, frame
+
+    def close(self):
+        """Detach from the segment; the creating side also unlinks it"""
+        # Drop the numpy views before closing the buffer they point into
+        self._counter = self._seq = self._time = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A published view is still referenced; the mapping goes with it
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,244 @@
+"""
+Pipeline stages for the split-process deployment (gui_app.py --split).
+
+Each function is the entry point of one process started by
+core.supervisor.Supervisor:
+
+    capture_stage    CameraStream -> shared-memory frame ring
+    inference_stage  latest ring frame -> BenchPipeline (cadence, motion
+                     gate, tracker, tight crop, priority, load shedding)
+                     -> keypoint arrays on the keypoints queue
+    analysis_stage   keypoints -> BenchPressAnalyzer per bench -> states
+                     queue (for the GUI) + FailureLogger
+
+The inference stage runs the same BenchPipeline as in-process mode, so it
+makes the same scheduling decisions; its analyzers only drive those
+decisions. For every bench it sends the keypoints and whether the analyzer
+was fed on this frame, and the analysis stage feeds its own analyzers the
+same samples with the same timestamps - the states it publishes and logs
+are the ones in-process mode would produce.
+
+Stages only talk through the ring and bounded queues. Producers never block:
+when a consumer falls behind (or hangs) its messages are dropped, so a stuck
+GUI cannot hold up analysis. Configuration (ring spec, ROIs) arrives as
+messages on each stage's control queue, so a restarted stage picks up where
+the old one stopped.
+"""
+import queue
+import threading
+import time
+
+import cv2
+
+from config import (
+    CAMERA_WIDTH, CAMERA_HEIGHT, TARGET_FPS, GPU_DEVICE, INFERENCE_WORKERS
+)
+from core.shared_frames import SharedFrameRing
+from core.inference_pool import pack_landmarks, unpack_landmarks
+from utils.geometry import roi_to_pixels
+
+
+# Per-bench pipeline result fields sent along with the keypoints
+INFO_KEYS = ('analyzed', 'inferred', 'tracked', 'activity', 'keypoints_time')
+
+
+def put_latest(q, item):
+    """Non-blocking put; the item is dropped if the consumer is behind"""
+    try:
+        q.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def drain(control):
+    """Return all pending control messages"""
+    messages = []
+    while True:
+        try:
+            messages.append(control.get_nowait())
+        except queue.Empty:
+            return messages
+
+
+def capture_stage(control, source, ring_spec):
+    """
+    Read frames from a camera/video and publish them to the frame ring.
+
+    Video files are looped, like the GUI preview does.
+
+    Args:
+        control: Control queue ('stop',)
+        source: Camera index or video path
+        ring_spec: SharedFrameRing.spec() of the ring to write
+    """
+    from core.camera import CameraStream
+
+    ring = SharedFrameRing.attach(ring_spec)
+    ring_h, ring_w = ring.shape[:2]
+    camera = CameraStream(src=source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT).start()
+    last_count = -1
+
+    while True:
+        if any(msg[0] == 'stop' for msg in drain(control)):
+            break
+
+        if camera.stopped:
+            if not camera.is_file:
+                print(f"[Capture] Source {source} ended")
+                break
+            camera = CameraStream(src=source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT).start()
+            last_count = -1
+            continue
+
+        frame = camera.read()
+        if frame is None or camera.frame_count == last_count:
+            time.sleep(0.002)
+            continue
+        last_count = camera.frame_count
+
+        if frame.shape[:2] != (ring_h, ring_w):
+            frame = cv2.resize(frame, (ring_w, ring_h))
+        ring.write(frame, camera.last_frame_time or time.time())
+
+    camera.stop()
+    ring.close()
+
+
+def _create_detector():
+    from core.detector_factory import GUI_DETECTOR, detector_spec, create_detector
+
+    if INFERENCE_WORKERS > 0:
+        from core.inference_pool import InferencePool
+        pool_detector, pool_kwargs = detector_spec(GUI_DETECTOR, GPU_DEVICE)
+        return InferencePool(INFERENCE_WORKERS, detector=pool_detector, detector_kwargs=pool_kwargs).start()
+    return create_detector(GUI_DETECTOR, GPU_DEVICE)
+
+
+def inference_stage(control, keypoints_out):
+    """
+    Run the bench pipeline on the newest ring frame.
+
+    Publishes ('keypoints', rois_version, timestamp, [(bench_id, rect, array,
+    info)]) for every bench, where array is a pack_landmarks() keypoint array
+    normalized to the ROI and info holds 'analyzed', 'inferred', 'tracked',
+    'activity' and 'keypoints_time' from the pipeline result.
+
+    Args:
+        control: Control queue ('ring', spec) / ('rois', version, rois) / ('stop',)
+        keypoints_out: Queue to the analysis stage
+    """
+    from core.pipeline import BenchPipeline
+    from core.load_shedder import LoadShedder
+
+    pipeline = BenchPipeline(_create_detector(), trace_cat="inference")
+    shedder = LoadShedder()
+    print("[Inference] Detector ready")
+
+    ring = None
+    rois, rois_version = [], 0
+    last_seq = None
+
+    while True:
+        for msg in drain(control):
+            if msg[0] == 'stop':
+                if ring is not None:
+                    ring.close()
+                return
+            if msg[0] == 'ring':
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing.attach(msg[1])
+                last_seq = None
+            elif msg[0] == 'rois':
+                rois_version, rois = msg[1], msg[2]
+                pipeline.set_rois(rois)
+
+        seq, timestamp, frame = ring.latest() if ring is not None else (None, None, None)
+        if seq is None or seq == last_seq or not rois:
+            time.sleep(0.005)
+            continue
+        last_seq = seq
+
+        results = pipeline.process(frame, timestamp)
+        if shedder.update(time.time() - timestamp, time.time()):
+            shedder.apply(pipeline)
+
+        benches = [(result['id'], result['rect'], pack_landmarks(result['keypoints']),
+                    {key: result[key] for key in INFO_KEYS})
+                   for result in results if result['rect'] is not None]
+        put_latest(keypoints_out, ('keypoints', rois_version, timestamp, benches))
+
+
+def _log_writer(entries):
+    """Write DANGER log rows off the analysis loop, so slow disks cannot delay it"""
+    from core.logger import FailureLogger
+
+    logger = FailureLogger()
+    while True:
+        entry = entries.get()
+        if entry is None:
+            return
+        logger.log(*entry)
+
+
+def analysis_stage(control, keypoints_in, states_out):
+    """
+    Run one BenchPressAnalyzer per bench on incoming keypoints.
+
+    Benches are kept in a detector-less BenchPipeline, so an ROI edit keeps
+    the history of unchanged and moved benches exactly as in-process mode
+    does. Publishes ('results', timestamp, results) with the same result
+    dicts BenchPipeline.process() returns ('keypoints' included).
+
+    Args:
+        control: Control queue ('rois', version, rois) / ('stop',)
+        keypoints_in: Queue from the inference stage
+        states_out: Queue to the GUI
+    """
+    from core.pipeline import BenchPipeline
+
+    pipeline = BenchPipeline(trace_cat="analysis")  # Bench bookkeeping and analyzers only
+    log_entries = queue.Queue()
+    threading.Thread(target=_log_writer, args=(log_entries,), name="LogWriter", daemon=True).start()
+
+    rois_version = 0
+
+    while True:
+        for msg in drain(control):
+            if msg[0] == 'stop':
+                log_entries.put(None)
+                return
+            if msg[0] == 'rois':
+                rois_version = msg[1]
+                pipeline.set_rois(msg[2])
+
+        try:
+            _, version, timestamp, benches = keypoints_in.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if version != rois_version:
+            continue  # Detected with ROIs that have since changed
+
+        results = []
+        for bench_id, rect, keypoints, info in benches:
+            bench = pipeline.get_bench(bench_id)
+            lm_list = unpack_landmarks(keypoints, rect[2], rect[3])
+            if info['analyzed']:
+                pipeline._analyze(bench, lm_list, timestamp)
+            result = {
+                'id': bench_id,
+                'state': bench['state'],
+                'reason': bench['reason'],
+                'roi': bench['roi'],
+                'rect': rect,
+                'keypoints': lm_list
+            }
+            result.update(info)
+            results.append(result)
+
+        # Publish first, log after: the GUI sees DANGER before any disk I/O
+        put_latest(states_out, ('results', timestamp, results))
+        for result in results:
+            if result['state'] == 'DANGER' and result['inferred']:
+                log_entries.put((result['id'], result['state'], result['reason'], time.time() - timestamp))
@@ -0,0 +1,241 @@
+"""
+Supervisor for the split-process deployment (gui_app.py --split).
+
+Starts capture, inference, analysis and the PyQt GUI as separate processes,
+each with its own interpreter and GIL, connected by a shared-memory frame
+ring and bounded queues:
+
+    capture --ring--> inference --keypoints--> analysis --states--> GUI
+       ^                                                             |
+       +------------------ supervisor <--------commands--------------+
+
+The supervisor owns the ring, forwards GUI commands (source, ROIs) to the
+stages and restarts any stage that exits unexpectedly. Every stage gets fresh
+queues when it (re)starts and the supervisor relays messages between them: a
+process killed inside Queue.get()/put() leaves that queue's lock held, so a
+queue is never reused across a restart. A restarted stage gets the current
+ring and ROIs again through its control queue; the other stages keep
+running. Closing the GUI shuts everything down.
+"""
+import importlib
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import cv2
+
+from config import (
+    CAMERA_WIDTH, CAMERA_HEIGHT, STAGE_QUEUE_SIZE, STAGE_RING_SLOTS,
+    SUPERVISOR_POLL_SEC, SUPERVISOR_RESTART_DELAY
+)
+from core.shared_frames import SharedFrameRing
+from core.stages import put_latest
+
+STAGES = {
+    'capture': 'core.stages:capture_stage',
+    'inference': 'core.stages:inference_stage',
+    'analysis': 'core.stages:analysis_stage',
+    'ui': 'gui.stage_client:ui_stage'
+}
+
+# Producer stage -> consumer stage of each relayed queue
+LINKS = {'inference': 'analysis', 'analysis': 'ui'}
+
+
+def run_stage(name, target, args):
+    """Process entry point: import the stage function and run it"""
+    module, _, func = target.partition(':')
+    print(f"[{name.capitalize()}] Stage started")
+    getattr(importlib.import_module(module), func)(*args)
+
+
+class Supervisor:
+    """Starts, wires and restarts the pipeline stage processes"""
+
+    def __init__(self, ui_args=()):
+        """
+        Args:
+            ui_args: Extra arguments for the GUI stage (e.g. Qt flags)
+        """
+        self.ctx = mp.get_context('spawn')
+        self.ui_args = list(ui_args)
+
+        self.commands = self.ctx.Queue()
+        self.controls = {}
+        self.inputs = {}
+        self.outputs = {}
+        self.processes = {}
+        self.restart_at = {}
+
+        self.ring = None
+        self.source = None
+        self.rois = []
+        self.rois_version = 0
+        self.running = False
+
+    # --- Stage lifecycle ------------------------------------------------
+
+    def _stage_args(self, name):
+        control = self.controls[name]
+        if name == 'capture':
+            return (control, self.source, self.ring.spec())
+        if name == 'inference':
+            return (control, self.outputs[name])
+        if name == 'analysis':
+            return (control, self.inputs[name], self.outputs[name])
+        return (control, self.inputs[name], self.commands, self.ui_args)
+
+    def _start(self, name):
+        self.controls[name] = self.ctx.Queue()
+        if name in LINKS.values():
+            self.inputs[name] = self.ctx.Queue(maxsize=STAGE_QUEUE_SIZE)
+        if name in LINKS:
+            self.outputs[name] = self.ctx.Queue(maxsize=STAGE_QUEUE_SIZE)
+            threading.Thread(target=self._relay, args=(name, self.outputs[name]),
+                             name=f"Relay-{name}", daemon=True).start()
+        if name == 'ui':
+            self.commands = self.ctx.Queue()
+
+        process = self.ctx.Process(target=run_stage, args=(name, STAGES[name], self._stage_args(name)),
+                                   name=f"Stage-{name}", daemon=True)
+        process.start()
+        self.processes[name] = process
+
+        # Replay the current configuration
+        if name in ('inference', 'ui') and self.ring is not None:
+            self.controls[name].put(('ring', self.ring.spec()))
+        if name in ('inference', 'analysis'):
+            self.controls[name].put(('rois', self.rois_version, self.rois))
+
+    def _relay(self, producer, source):
+        """Forward one producer queue to the consumer's current input queue"""
+        consumer = LINKS[producer]
+        while self.outputs.get(producer) is source:
+            try:
+                item = source.get(timeout=SUPERVISOR_POLL_SEC)
+            except queue.Empty:
+                continue
+            put_latest(self.inputs[consumer], item)
+
+    def _stop(self, name, timeout=2.0):
+        process = self.processes.pop(name, None)
+        if process is None:
+            return
+        if process.is_alive():
+            self.controls[name].put(('stop',))
+            process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout)
+
+    def _check_stages(self, now):
+        """Restart stages that died; returns False once the GUI has closed normally"""
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+
+            if name == 'ui' and process.exitcode == 0:
+                return False
+            if name == 'capture' and process.exitcode == 0:
+                # Live source ended on its own - nothing to restart
+                del self.processes[name]
+                continue
+
+            if name not in self.restart_at:
+                print(f"[Supervisor] Stage '{name}' exited (code {process.exitcode}), "
+                      f"restarting in {SUPERVISOR_RESTART_DELAY:.0f}s")
+                self.restart_at[name] = now + SUPERVISOR_RESTART_DELAY
+            elif now >= self.restart_at[name]:
+                del self.restart_at[name]
+                self._start(name)
+        return True
+
+    # --- Commands from the GUI --------------------------------------------
+
+    def _open_source(self, source):
+        """Probe the source size, create a ring for it and (re)start capture"""
+        if source == self.source and 'capture' in self.processes:
+            self.controls['ui'].put(('ring', self.ring.spec()))
+            return
+
+        self._stop('capture')
+
+        cap = cv2.VideoCapture(source)
+        if isinstance(source, int):
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+        ret, frame = cap.read()
+        cap.release()
+        if not ret:
+            print(f"[Supervisor] Could not open source: {source}")
+            self.controls['ui'].put(('ring', None))
+            return
+
+        old_ring = self.ring
+        self.ring = SharedFrameRing(frame.shape, slots=STAGE_RING_SLOTS)
+        self.ring.write(frame, time.time())
+        self.source = source
+
+        self._start('capture')
+        for name in ('inference', 'ui'):
+            self.controls[name].put(('ring', self.ring.spec()))
+        if old_ring is not None:
+            old_ring.close()  # Attached stages keep their mapping until they switch
+        print(f"[Supervisor] Source {source} -> ring {self.ring.name} {self.ring.shape}")
+
+    def _set_rois(self, rois):
+        self.rois = rois
+        self.rois_version += 1
+        for name in ('inference', 'analysis'):
+            self.controls[name].put(('rois', self.rois_version, self.rois))
+
+    def _handle(self, command):
+        kind = command[0]
+        if kind == 'source':
+            self._open_source(command[1])
+        elif kind == 'stop_source':
+            self._stop('capture')
+            self.source = None
+        elif kind == 'rois':
+            self._set_rois(command[1])
+        elif kind == 'quit':
+            self.running = False
+
+    # --- Main loop --------------------------------------------------------
+
+    def run(self):
+        """
+        Start all stages and supervise them until the GUI closes.
+
+        Returns:
+            int: Exit code
+        """
+        print("[Supervisor] Starting split-process pipeline")
+        for name in ('inference', 'analysis', 'ui'):
+            self._start(name)
+
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    self._handle(self.commands.get(timeout=SUPERVISOR_POLL_SEC))
+                except queue.Empty:
+                    pass
+                if not self._check_stages(time.time()):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+        return 0
+
+    def shutdown(self):
+        """Stop every stage and release the frame ring"""
+        for name in ('capture', 'ui', 'inference', 'analysis'):
+            self._stop(name)
+        self.outputs.clear()  # Ends the relay threads
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        print("[Supervisor] Stopped")
@@ -9,7 +9,18 @@ class TemporalBuffer:
         self.buffer.append(value)
 
     def get_last(self, seconds, fps):
-        """Get the last N items covering X seconds."""
+        """
+        Get the items covering the last X seconds.
+        Items with a 'time' key are selected by timestamp, so windows stay
+        correct when samples arrive slower than fps (skipped inferences).
+        """
+        if not self.buffer:
+            return []
+
+        if 'time' in self.buffer[-1]:
+            cutoff = self.buffer[-1]['time'] - seconds
+            return [d for d in self.buffer if d['time'] > cutoff]
+
         count = int(seconds * fps)
         if count > len(self.buffer):
             count = len(self.buffer)
@@ -19,10 +30,16 @@ class TemporalBuffer:
         # Convert to list effectively
         return list(self.buffer)[-count:]
 
+    def _covers(self, data, seconds, fps):
+        """Checks if data spans at least X seconds (one frame period tolerance)."""
+        if 'time' in data[-1]:
+            return data[-1]['time'] - data[0]['time'] >= seconds - 1.0 / fps
+        return len(data) >= seconds * fps
+
     def is_stagnant(self, seconds, fps, threshold=0.01):
         """Checks if values have barely changed over the last X seconds."""
         data = self.get_last(seconds, fps)
-        if not data or len(data) < fps: # Need at least 1 second of data
+        if not data or not self._covers(data, 1.0, fps): # Need at least 1 second of data
             return False
         
         # Calculate amplitude/std dev
@@ -42,7 +59,12 @@ class TemporalBuffer:
         start_y = data[0]['y']
         end_y = data[-1]['y']
         
+        # Use the real span when timestamps are known (samples may be sparse)
+        duration = seconds
+        if 'time' in data[-1] and data[-1]['time'] > data[0]['time']:
+            duration = data[-1]['time'] - data[0]['time']
+        
         # Y is inverted (0 is top), so positive motion (up) is decreasing Y
         # We want strict velocity: dy/dt
         # Let's say: negative result = moving UP, positive result = moving DOWN
-        return (end_y - start_y) / seconds
+        return (end_y - start_y) / duration
@@ -0,0 +1,147 @@
+"""
+Chrome Trace Event recorder for pipeline timelines.
+
+Records a bounded window of per-frame spans from the capture thread, the
+processing worker and the GUI thread. The saved JSON can be opened in
+chrome://tracing or https://ui.perfetto.dev to see where frames stall.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import TRACE_ENABLED, TRACE_MAX_EVENTS, TRACE_OUTPUT
+
+
+class TraceRecorder:
+    """Thread-safe ring buffer of Chrome Trace Events"""
+
+    def __init__(self, max_events=TRACE_MAX_EVENTS, enabled=TRACE_ENABLED):
+        """
+        Args:
+            max_events: Size of the event window (oldest events are dropped)
+            enabled: Start recording immediately
+        """
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)
+        self.pid = os.getpid()
+        self.thread_names = {}  # {thread ident: display name}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        """Start/stop recording"""
+        self.enabled = enabled
+
+    def clear(self):
+        """Drop all recorded events"""
+        with self._lock:
+            self.events.clear()
+
+    def set_thread_name(self, name):
+        """Label the calling thread in the timeline (QThreads show up as 'Dummy-N' otherwise)"""
+        self.thread_names[threading.get_ident()] = name
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _tid(self):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def _append(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat="pipeline", **args):
+        """
+        Record a complete ('X') event around a block.
+
+        Args:
+            name: Span name, e.g. 'infer'
+            cat: Category, e.g. 'capture', 'worker', 'gui'
+            **args: Extra values shown in the trace viewer (bench id, ...)
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._append({
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now_us() - start,
+                "pid": self.pid,
+                "tid": self._tid(),
+                "args": args
+            })
+
+    def instant(self, name, cat="pipeline", **args):
+        """Record an instant ('i') event, e.g. a dropped frame"""
+        if not self.enabled:
+            return
+        self._append({
+            "name": name,
+            "cat": cat,
+            "ph": "i",
+            "s": "t",
+            "ts": self._now_us(),
+            "pid": self.pid,
+            "tid": self._tid(),
+            "args": args
+        })
+
+    def counter(self, name, **values):
+        """Record a counter ('C') event, e.g. queue depth or FPS"""
+        if not self.enabled:
+            return
+        self._append({
+            "name": name,
+            "ph": "C",
+            "ts": self._now_us(),
+            "pid": self.pid,
+            "tid": self._tid(),
+            "args": values
+        })
+
+    def save(self, path=None):
+        """
+        Write the recorded window as Chrome Trace Event JSON.
+
+        Args:
+            path: Output file (defaults to TRACE_OUTPUT)
+
+        Returns:
+            str: Path written
+        """
+        path = path or TRACE_OUTPUT
+        with self._lock:
+            events = list(self.events)
+
+        metadata = [{
+            "name": "thread_name",
+            "ph": "M",
+            "pid": self.pid,
+            "tid": tid,
+            "args": {"name": name}
+        } for tid, name in self.thread_names.items()]
+
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+        print(f"[Trace] Saved {len(events)} events to {path}")
+        return path
+
+
+# Shared recorder for the whole process
+tracer = TraceRecorder()
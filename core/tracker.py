@@ -0,0 +1,239 @@
+"""
+Keypoint tracking between sparse pose detections.
+
+With TRACKER_MODE enabled the pose model only runs every
+TRACKER_DETECT_INTERVAL analyzed frames per bench. In between, the last
+detected keypoints are propagated so the analyzer still gets a full-rate
+barbell trajectory:
+
+    'lk'      sparse pyramidal Lucas-Kanade optical flow on the ROI, with a
+              forward-backward check per point
+    'kalman'  constant-velocity Kalman prediction (no image processing at all)
+
+Each propagated frame reports a confidence; the pipeline falls back to a full
+detection when it drops below TRACKER_MIN_CONFIDENCE.
+"""
+import cv2
+import numpy as np
+
+from config import (
+    TRACKER_MODE, TRACKER_DETECT_INTERVAL, TRACKER_LK_SCALE, TRACKER_MAX_FB_ERROR,
+    TRACKER_KALMAN_ACCEL, TRACKER_KALMAN_MEAS_STD, TRACKER_KALMAN_MAX_STD,
+    MEDIAPIPE_LEFT_SHOULDER, MEDIAPIPE_RIGHT_SHOULDER,
+    MEDIAPIPE_LEFT_WRIST, MEDIAPIPE_RIGHT_WRIST
+)
+
+# Landmark indices read by Barbell / BenchPressAnalyzer (shoulders + wrists).
+# Confidence is measured on these; every other visible point is propagated too.
+ANALYZER_KEYPOINTS = (
+    MEDIAPIPE_LEFT_SHOULDER, MEDIAPIPE_RIGHT_SHOULDER,
+    MEDIAPIPE_LEFT_WRIST, MEDIAPIPE_RIGHT_WRIST
+)
+
+MIN_VISIBILITY = 0.3
+
+LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+)
+
+
+class KeypointTracker:
+    """Propagates a bench's keypoints between detections"""
+
+    def __init__(self, mode=TRACKER_MODE, detect_interval=TRACKER_DETECT_INTERVAL):
+        """
+        Args:
+            mode: 'off', 'lk' or 'kalman'
+            detect_interval: Detect every N analyzed frames per bench
+        """
+        if mode not in ('off', 'lk', 'kalman'):
+            raise ValueError(f"Unknown tracker mode: {mode}")
+        self.mode = mode
+        self.detect_interval = detect_interval
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def needs_detection(self, bench):
+        """
+        Check whether the next frame of a bench has to go through the pose model.
+
+        Args:
+            bench: Bench dict
+
+        Returns:
+            bool: True for a full detection, False if tracking may be used
+        """
+        if not self.enabled:
+            return True
+        track = bench.get('track')
+        if track is None or not bench['lm_list']:
+            return True
+        if track['since_detect'] + 1 >= self.detect_interval:
+            return True
+        # Keep real detections while a lift is close to any danger threshold
+        return bench['analyzer'].near_danger()
+
+    def reset(self, bench, lm_list, roi_img, now):
+        """
+        Re-anchor tracking on a fresh detection.
+
+        Args:
+            bench: Bench dict (state stored under 'track')
+            lm_list: Detected landmarks (ROI-normalized)
+            roi_img: ROI crop the landmarks were detected on
+            now: Timestamp of the detection
+        """
+        if not self.enabled:
+            return
+        if not lm_list:
+            bench['track'] = None
+            return
+
+        track = bench.get('track') or {}
+        track['since_detect'] = 0
+
+        if self.mode == 'lk':
+            track['gray'] = self._gray(roi_img)
+        else:
+            self._kalman_update(track, lm_list, now)
+
+        track['time'] = now
+        bench['track'] = track
+
+    def track(self, bench, roi_img, now):
+        """
+        Propagate the bench's last landmarks to the current frame.
+
+        Args:
+            bench: Bench dict with 'lm_list' and 'track'
+            roi_img: Current ROI crop
+            now: Current timestamp
+
+        Returns:
+            (lm_list, confidence): Propagated landmarks and a 0-1 confidence
+        """
+        track = bench['track']
+        lm_list = bench['lm_list']
+
+        if self.mode == 'lk':
+            new_list, confidence = self._track_lk(track, lm_list, roi_img)
+        else:
+            new_list, confidence = self._predict_kalman(track, lm_list, roi_img, now)
+
+        track['since_detect'] += 1
+        track['time'] = now
+        return new_list, confidence
+
+    # --- Lucas-Kanade -----------------------------------------------------
+
+    def _gray(self, roi_img):
+        gray = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
+        if TRACKER_LK_SCALE != 1.0:
+            gray = cv2.resize(gray, None, fx=TRACKER_LK_SCALE, fy=TRACKER_LK_SCALE,
+                              interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _track_lk(self, track, lm_list, roi_img):
+        gray = self._gray(roi_img)
+        prev_gray = track['gray']
+        if prev_gray.shape != gray.shape:
+            return lm_list, 0.0
+
+        h, w = gray.shape
+        ids = [i for i, lm in enumerate(lm_list) if lm['visibility'] > MIN_VISIBILITY]
+        if not ids:
+            return lm_list, 0.0
+
+        p0 = np.array([[lm_list[i]['x'] * w, lm_list[i]['y'] * h] for i in ids],
+                      dtype=np.float32).reshape(-1, 1, 2)
+
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, p0, None, **LK_PARAMS)
+        p0_back, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, p1, None, **LK_PARAMS)
+
+        fb_error = np.linalg.norm(p0 - p0_back, axis=2).ravel()
+        good = (st.ravel() == 1) & (st_back.ravel() == 1) & (fb_error < TRACKER_MAX_FB_ERROR)
+
+        roi_h, roi_w = roi_img.shape[:2]
+        new_list = [dict(lm) for lm in lm_list]
+        for k, idx in enumerate(ids):
+            if good[k]:
+                x, y = p1[k, 0]
+                self._move(new_list[idx], x / w, y / h, roi_w, roi_h)
+
+        track['gray'] = gray
+        return new_list, self._confidence(ids, good)
+
+    def _confidence(self, ids, good):
+        """Fraction of analyzer keypoints that were tracked reliably"""
+        required = [k for k, idx in enumerate(ids) if idx in ANALYZER_KEYPOINTS]
+        if not required:
+            return float(np.mean(good))
+        return float(np.mean(good[required]))
+
+    # --- Constant-velocity Kalman -----------------------------------------
+    # All keypoints share dt and measurement timing, so they share one 4x4
+    # covariance; only the state (x, y, vx, vy) differs per point.
+
+    def _kalman_update(self, track, lm_list, now):
+        z = np.array([[lm['x'], lm['y']] for lm in lm_list], dtype=np.float64)
+        r = TRACKER_KALMAN_MEAS_STD ** 2
+
+        state = track.get('state')
+        if state is None or state.shape[0] != len(z):
+            # First detection: position known, velocity unknown
+            track['state'] = np.hstack([z, np.zeros_like(z)])
+            track['P'] = np.diag([r, r, 1.0, 1.0])
+            return
+
+        self._kalman_predict(track, now - track['time'])
+
+        P = track['P']
+        H = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float64)
+        S = H @ P @ H.T + np.eye(2) * r
+        K = P @ H.T @ np.linalg.inv(S)
+
+        innovation = z - track['state'][:, :2]
+        track['state'] = track['state'] + innovation @ K.T
+        track['P'] = (np.eye(4) - K @ H) @ P
+
+    def _kalman_predict(self, track, dt):
+        dt = max(dt, 0.0)
+        F = np.array([[1, 0, dt, 0],
+                      [0, 1, 0, dt],
+                      [0, 0, 1, 0],
+                      [0, 0, 0, 1]], dtype=np.float64)
+        q = TRACKER_KALMAN_ACCEL ** 2
+        Q = q * np.array([[dt**4 / 4, 0, dt**3 / 2, 0],
+                          [0, dt**4 / 4, 0, dt**3 / 2],
+                          [dt**3 / 2, 0, dt**2, 0],
+                          [0, dt**3 / 2, 0, dt**2]], dtype=np.float64)
+
+        track['state'] = track['state'] @ F.T
+        track['P'] = F @ track['P'] @ F.T + Q
+
+    def _predict_kalman(self, track, lm_list, roi_img, now):
+        self._kalman_predict(track, now - track['time'])
+
+        # Shared covariance -> one position uncertainty for all points
+        std = float(np.sqrt(max(track['P'][0, 0], track['P'][1, 1])))
+        confidence = max(0.0, 1.0 - std / TRACKER_KALMAN_MAX_STD)
+
+        roi_h, roi_w = roi_img.shape[:2]
+        new_list = [dict(lm) for lm in lm_list]
+        for idx, lm in enumerate(new_list):
+            x, y = track['state'][idx, :2]
+            self._move(lm, x, y, roi_w, roi_h)
+
+        return new_list, confidence
+
+    @staticmethod
+    def _move(lm, x, y, roi_w, roi_h):
+        """Update a landmark dict in place (normalized + pixel coordinates)"""
+        lm['x'] = float(x)
+        lm['y'] = float(y)
+        lm['x_px'] = int(x * roi_w)
+        lm['y_px'] = int(y * roi_h)
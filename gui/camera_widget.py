@@ -7,17 +7,33 @@ from PyQt6.QtGui import QImage, QPixmap
 import cv2
 import numpy as np
 
+from core.camera import PlaybackStepper, media_time
+from core.clock import wall_clock
+from core.seek_index import load_index
+from core.tracing import tracer
+
 class CameraWidget(QWidget):
     """Widget to display camera/video feed"""
     
-    frame_ready = pyqtSignal(np.ndarray)  # Signal when new frame is available
+    frame_ready = pyqtSignal(np.ndarray, float)  # New frame and its timestamp (media time for files)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.camera = None
+        self.capture_factory = cv2.VideoCapture  # Replaced by RingCapture in split mode
+        self.clock = wall_clock  # Live frame times, PIP cycling and flash (any core.clock clock)
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         
+        # Recorded video playback: speed, and media time kept increasing across loops
+        self.is_file = False
+        self.playback_speed = 1.0
+        self.stepper = PlaybackStepper()
+        self.video_fps = 30.0
+        self.media_time = 0.0
+        self.media_offset = 0.0
+        self.seek_index = None  # Keyframe index of the file (loop restarts)
+        
         # ROI overlay
         self.rois = []  # List of normalized ROI dicts
         self.roi_colors = []  # List of colors
@@ -35,6 +51,9 @@ class CameraWidget(QWidget):
         self.show_keypoints = False
         self.current_keypoints = {}  # {roi_index: keypoints_list}
         
+        # Off under heavy load: no keypoints, flash overlay or smooth scaling
+        self.cosmetic_rendering = True
+        
         self.init_ui()
         
     def init_ui(self):
@@ -82,7 +101,7 @@ class CameraWidget(QWidget):
                 self.stop_camera()
             
             # Open camera/video
-            self.camera = cv2.VideoCapture(source)
+            self.camera = self.capture_factory(source)
             
             if not self.camera.isOpened():
                 return False
@@ -92,6 +111,17 @@ class CameraWidget(QWidget):
                 self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
                 self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
             
+            # Local video file (not a stream, not the split-mode frame ring)
+            self.is_file = (isinstance(self.camera, cv2.VideoCapture) and isinstance(source, str)
+                            and not source.lower().startswith(("rtsp", "http")))
+            self.stepper = PlaybackStepper()
+            self.media_time = self.media_offset = 0.0
+            self.seek_index = None
+            if self.is_file:
+                fps = self.camera.get(cv2.CAP_PROP_FPS)
+                self.video_fps = fps if 0 < fps <= 240 else 30.0
+                self.seek_index = load_index(source)
+            
             # Start timer (30 FPS)
             self.timer.start(33)
             
@@ -122,19 +152,37 @@ class CameraWidget(QWidget):
         if self.camera is None or not self.camera.isOpened():
             return
             
-        ret, frame = self.camera.read()
+        with tracer.span("gui.read", "gui"):
+            if self.is_file:
+                ret, frame = self.stepper.read(self.camera, self.playback_speed)
+                if ret and frame is None:
+                    return  # Slow motion: no frame due on this tick
+            else:
+                ret, frame = self.camera.read()
         
         if ret:
+            if self.is_file:
+                self.media_time = self.media_offset + media_time(self.camera, self.video_fps)
+                timestamp = self.media_time
+            else:
+                timestamp = self.clock.time()
+            
             # Emit signal for processing
-            self.frame_ready.emit(frame.copy())
+            with tracer.span("gui.emit", "gui"):
+                self.frame_ready.emit(frame.copy(), timestamp)
             
             # Display frame
-            self.display_frame(frame)
+            with tracer.span("gui.render", "gui"):
+                self.display_frame(frame)
         else:
             # Video ended - loop or show placeholder
             if isinstance(self.camera, cv2.VideoCapture):
-                # Try to loop video
-                self.camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                # Try to loop video (media time keeps counting up for the analyzers)
+                if self.seek_index is not None:
+                    self.seek_index.seek(self.camera, 0)
+                else:
+                    self.camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.media_offset = self.media_time + 1.0 / self.video_fps
                 
                 
     def display_frame(self, frame):
@@ -149,10 +197,8 @@ class CameraWidget(QWidget):
         
         # PIP Mode: Zoom to danger ROI
         if self.pip_mode and self.danger_rois:
-            import time
-            
             # Auto-cycle through danger ROIs
-            current_time = time.time()
+            current_time = self.clock.time()
             if current_time - self.last_pip_switch > self.pip_switch_interval:
                 self.current_danger_index = (self.current_danger_index + 1) % len(self.danger_rois)
                 self.last_pip_switch = current_time
@@ -258,15 +304,14 @@ class CameraWidget(QWidget):
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
                 # Draw keypoints if enabled
-                if self.show_keypoints and idx in self.current_keypoints:
+                if self.show_keypoints and self.cosmetic_rendering and idx in self.current_keypoints:
                     self._draw_keypoints_in_roi(frame, self.current_keypoints[idx], roi)
         
         # Danger flash overlay
         if self.danger_mode:
             import math
-            import time
             # Pulsing effect
-            self.flash_alpha = (math.sin(time.time() * 5) + 1) / 2  # 0 to 1
+            self.flash_alpha = (math.sin(self.clock.time() * 5) + 1) / 2  # 0 to 1
             overlay = frame.copy()
             cv2.rectangle(overlay, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 255), -1)
             cv2.addWeighted(frame, 1, overlay, self.flash_alpha * 0.2, 0, frame)
@@ -285,7 +330,8 @@ class CameraWidget(QWidget):
         scaled_pixmap = pixmap.scaled(
             self.video_label.size(), 
             Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
+            Qt.TransformationMode.SmoothTransformation if self.cosmetic_rendering
+            else Qt.TransformationMode.FastTransformation
         )
         
         self.video_label.setPixmap(scaled_pixmap)
@@ -298,6 +344,10 @@ class CameraWidget(QWidget):
             # Trigger frame update to rescale
             pass
     
+    def set_playback_speed(self, speed):
+        """Video file playback speed (frames advanced per display tick)"""
+        self.playback_speed = speed
+        
     def set_rois(self, rois, colors):
         """
         Set ROIs to display on video
@@ -313,6 +363,10 @@ class CameraWidget(QWidget):
         """Enable/disable danger flash overlay"""
         self.danger_mode = enabled
     
+    def set_cosmetic_rendering(self, enabled):
+        """Enable/disable keypoints and smooth scaling (turned off by load shedding; DANGER flash stays)"""
+        self.cosmetic_rendering = enabled
+    
     def set_pip_mode(self, enabled, danger_rois=None):
         """
         Enable/disable PIP mode with danger ROIs
@@ -321,12 +375,11 @@ class CameraWidget(QWidget):
             enabled: bool
             danger_rois: List of dicts with 'index' and 'roi' keys
         """
-        import time
         self.pip_mode = enabled
         if enabled and danger_rois:
             self.danger_rois = danger_rois
             self.current_danger_index = 0
-            self.last_pip_switch = time.time()
+            self.last_pip_switch = self.clock.time()
         else:
             self.danger_rois = []
     
@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QMenuBar, QMenu, QStatusBar,
     QFileDialog, QMessageBox, QGroupBox, QRadioButton,
-    QComboBox, QLineEdit, QSplitter, QDialog
+    QComboBox, QLineEdit, QSplitter, QDialog, QInputDialog
 )
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QPixmap
@@ -13,8 +13,14 @@ import os
 from pathlib import Path
 
 from gui.camera_widget import CameraWidget
+from core.profiles import (
+    get_profile, save_profile, make_profile, profile_names, set_last, default_name, detector_settings
+)
+from config import PROFILE_AUTOLOAD, PLAYBACK_SPEEDS
 
 class MainWindow(QMainWindow):
+    first_painted = pyqtSignal()  # Window painted once (gui_app attaches the worker then)
+    
     def __init__(self):
         super().__init__()
         self.camera_active = False
@@ -29,17 +35,67 @@ class MainWindow(QMainWindow):
             (128, 0, 255)     # Purple
         ]
         
+        # Last camera profile, resumed without dialogs once the worker is attached
+        self.profile = get_profile() if PROFILE_AUTOLOAD else None
+        self.profile_name = self.profile['name'] if self.profile else None
+        # Detector settings of the active profile, kept when it is saved again
+        # (the worker only picks them up at the next start)
+        self.profile_detector = detector_settings(self.profile) if self.profile else None
+        
         self.init_ui()
         self.load_stylesheet()
         
-        # Initialize processing worker
-        from gui.processing_worker import ProcessingWorker
-        self.worker = ProcessingWorker()
-        self.worker.results_ready.connect(self.update_bench_results)
-        self.worker.fps_updated.connect(self.update_fps)
+        # Processing backend, attached after the first paint (attach_worker)
+        self.worker = None
+        self._painted = False
         
         # Processing state
         self.processing_paused = False
+        self.load_level = 0
+        
+    def attach_worker(self, worker=None):
+        """
+        Connect and start the processing backend.
+        
+        Called once the window is on screen, so the worker modules (and the
+        detector's torch/ultralytics imports) do not delay the first paint.
+        
+        Args:
+            worker: Processing backend (default: in-process ProcessingWorker;
+                    StageClient in split-process mode)
+        """
+        if worker is None:
+            from gui.processing_worker import ProcessingWorker
+            if self.profile:
+                worker = ProcessingWorker(self.profile['detector'], self.profile['device'],
+                                          self.profile['model_size'])
+            else:
+                worker = ProcessingWorker()
+        self.worker = worker
+        if hasattr(worker, 'open_capture'):
+            # Split mode: show frames from the capture stage's shared ring
+            self.camera_widget.capture_factory = worker.open_capture
+        self.worker.results_ready.connect(self.update_bench_results)
+        self.worker.fps_updated.connect(self.update_fps)
+        self.worker.stats_updated.connect(self.update_stats)
+        if hasattr(worker, 'detector_failed'):
+            self.worker.detector_failed.connect(self.on_detector_failed)
+        
+        # Load and warm up the detector now, in the background, while the
+        # user picks a source; the worker then runs until the window closes.
+        # A resumed profile's ROIs are set first so 'auto' model size fits them
+        if self.profile:
+            self.worker.set_rois(self.profile['rois'])
+        self.worker.start()
+        
+        if self.profile:
+            self.resume_profile(self.profile)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
         
     def init_ui(self):
         """Initialize the user interface"""
@@ -91,6 +147,16 @@ class MainWindow(QMainWindow):
         
         file_menu.addSeparator()
         
+        load_profile_action = QAction("Load Profile...", self)
+        load_profile_action.triggered.connect(self.load_profile)
+        file_menu.addAction(load_profile_action)
+        
+        save_profile_action = QAction("Save Profile As...", self)
+        save_profile_action.triggered.connect(self.save_profile_as)
+        file_menu.addAction(save_profile_action)
+        
+        file_menu.addSeparator()
+        
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -159,6 +225,16 @@ class MainWindow(QMainWindow):
         camera_layout.addWidget(self.video_path_label)
         camera_layout.addWidget(self.browse_btn)
         
+        # Playback speed (above 1x skipped frames are not decoded)
+        self.speed_label = QLabel("Playback Speed:")
+        self.speed_combo = QComboBox()
+        self.speed_combo.addItems([f"{speed:g}x" for speed in PLAYBACK_SPEEDS])
+        self.speed_combo.setCurrentIndex(PLAYBACK_SPEEDS.index(1.0))
+        self.speed_combo.currentIndexChanged.connect(
+            lambda idx: self.camera_widget.set_playback_speed(PLAYBACK_SPEEDS[idx]))
+        camera_layout.addWidget(self.speed_label)
+        camera_layout.addWidget(self.speed_combo)
+        
         camera_group.setLayout(camera_layout)
         layout.addWidget(camera_group)
         
@@ -193,9 +269,13 @@ class MainWindow(QMainWindow):
         
         self.status_label = QLabel("Status: Idle")
         self.fps_label = QLabel("FPS: --")
+        self.inference_label = QLabel("Inference: --")
+        self.load_label = QLabel("Load: --")
         
         info_layout.addWidget(self.status_label)
         info_layout.addWidget(self.fps_label)
+        info_layout.addWidget(self.inference_label)
+        info_layout.addWidget(self.load_label)
         
         info_group.setLayout(info_layout)
         layout.addWidget(info_group)
@@ -262,8 +342,12 @@ class MainWindow(QMainWindow):
         self.video_file_label.setVisible(not is_live)
         self.video_path_label.setVisible(not is_live)
         self.browse_btn.setVisible(not is_live)
+        self.speed_label.setVisible(not is_live)
+        self.speed_combo.setVisible(not is_live)
         
-        # Clear ROIs when changing source
+        # Clear ROIs (and the active profile) when changing source
+        self.profile_name = None
+        self.profile_detector = None
         self.clear_rois()
         
     def browse_video_file(self):
@@ -280,7 +364,9 @@ class MainWindow(QMainWindow):
             self.video_path_label.setText(file_path)
             self.statusbar.showMessage(f"Video loaded: {Path(file_path).name}")
             
-            # Clear ROIs when changing video
+            # Clear ROIs (and the active profile) when changing video
+            self.profile_name = None
+            self.profile_detector = None
             self.clear_rois()
             
     def toggle_monitoring(self):
@@ -290,25 +376,34 @@ class MainWindow(QMainWindow):
         else:
             self.stop_monitoring()
             
-    def start_monitoring(self):
-        """Start camera monitoring"""
+    def start_monitoring(self, show_errors=True):
+        """
+        Start camera monitoring
+        
+        Args:
+            show_errors: Report problems in message boxes (False = status bar
+                         only, for unattended profile resume)
+        
+        Returns:
+            bool: True if the source was opened
+        """
         # Validate source
         if self.radio_video.isChecked() and not self.video_path:
-            QMessageBox.warning(
-                self,
-                "No Video Selected",
-                "Please select a video file first."
-            )
-            return
-            
-        # Get source
-        if self.radio_live.isChecked():
-            source = self.camera_id_combo.currentIndex()
-        else:
-            source = self.video_path
+            if show_errors:
+                QMessageBox.warning(
+                    self,
+                    "No Video Selected",
+                    "Please select a video file first."
+                )
+            return False
             
+        # The detector failed to load earlier: retry it with this session
+        if not self.worker.isRunning():
+            print("[MainWindow] Restarting the processing worker")
+            self.worker.start()
+        
         # Start camera
-        success = self.camera_widget.start_camera(source)
+        success = self.camera_widget.start_camera(self.current_source())
         
         if success:
             self.camera_active = True
@@ -324,24 +419,41 @@ class MainWindow(QMainWindow):
             
             # Connect camera frames to worker
             self.camera_widget.frame_ready.connect(self.worker.set_frame)
-        else:
+        elif show_errors:
             QMessageBox.critical(
                 self,
                 "Connection Failed",
                 "Failed to connect to camera/video source."
             )
+        else:
+            self.statusbar.showMessage("Failed to connect to camera/video source")
+        return success
+    
+    def on_detector_failed(self, error):
+        """The worker could not load its detector: say so instead of monitoring silently"""
+        self.status_label.setText("Status: Detector failed")
+        self.statusbar.showMessage("Detector failed to load - Start Monitoring again to retry")
+        QMessageBox.critical(
+            self,
+            "Detector Failed",
+            f"The pose detector could not be loaded:\n\n{error}\n\n"
+            "Bench areas are not analyzed. Fix the problem, then start monitoring again to retry."
+        )
+    
+    def current_source(self):
+        """Selected camera index or video file path"""
+        if self.radio_live.isChecked():
+            return self.camera_id_combo.currentIndex()
+        return self.video_path
             
     def stop_monitoring(self):
-        """Stop camera monitoring"""
-        # Stop worker
-        if self.worker.isRunning():
-            self.worker.stop()
-        
+        """Stop camera monitoring (the worker keeps its detector and idles)"""
         # Disconnect signals
         try:
             self.camera_widget.frame_ready.disconnect(self.worker.set_frame)
         except:
             pass
+        self.worker.set_frame(None)
         
         # Stop camera and reset display
         self.camera_widget.stop_camera()
@@ -444,21 +556,10 @@ class MainWindow(QMainWindow):
         if wizard.exec() == QDialog.DialogCode.Accepted:
             rois = wizard.get_rois()
             if rois:
-                self.selected_rois = rois  # Save ROIs
-                self.statusbar.showMessage(f"Configured {len(rois)} bench area(s)")
-                
-                # Enable ROI overlay on camera widget
-                self.camera_widget.set_rois(self.selected_rois, self.bench_colors)
+                self.apply_rois(rois)
                 
-                # Start processing worker
-                self.worker.set_rois(self.selected_rois)
-                if not self.worker.isRunning():
-                    self.worker.start()
-                
-                # Create bench status cards
-                self.create_bench_cards(len(rois))
-                
-                self.statusbar.showMessage(f"Processing {len(rois)} bench area(s) with YOLO...")
+                # Resume these benches automatically next time
+                self.save_profile(self.profile_name or default_name(self.current_source()))
                 
                 QMessageBox.information(
                     self,
@@ -474,6 +575,107 @@ class MainWindow(QMainWindow):
                     "No bench areas were selected."
                 )
         
+    def apply_rois(self, rois):
+        """Show the bench areas and hand them to the running worker"""
+        self.selected_rois = rois  # Save ROIs
+        
+        # Enable ROI overlay on camera widget
+        self.camera_widget.set_rois(self.selected_rois, self.bench_colors)
+        
+        # Hand the ROIs to the running worker
+        self.worker.set_rois(self.selected_rois)
+        
+        # Create bench status cards
+        self.create_bench_cards(len(rois))
+        
+        self.statusbar.showMessage(f"Processing {len(rois)} bench area(s) with YOLO...")
+    
+    def resume_profile(self, profile):
+        """
+        Start monitoring a saved profile's source with its bench areas, no dialogs.
+        
+        Args:
+            profile: Dict from core.profiles.get_profile()
+        """
+        if self.camera_active:
+            self.stop_monitoring()
+        
+        source = profile['source']
+        if isinstance(source, int):
+            self.radio_live.setChecked(True)
+            self.camera_id_combo.setCurrentIndex(min(source, self.camera_id_combo.count() - 1))
+        else:
+            if not os.path.exists(source):
+                self.statusbar.showMessage(f"Profile '{profile['name']}': video not found: {source}")
+                return
+            self.radio_video.setChecked(True)
+            self.video_path = source
+            self.video_path_label.setText(source)
+        
+        self.profile_name = profile['name']
+        self.profile_detector = detector_settings(profile)
+        self.bench_colors = list(profile['colors'])
+        
+        if self.start_monitoring(show_errors=False):
+            self.apply_rois(profile['rois'])
+            self.statusbar.showMessage(
+                f"Resumed profile '{profile['name']}': {len(profile['rois'])} bench area(s)")
+    
+    def save_profile(self, name):
+        """Save the current source and bench areas as a named profile"""
+        worker = self.worker
+        profile = make_profile(self.current_source(), self.selected_rois, self.bench_colors)
+        if self.profile_detector is not None:
+            profile.update(self.profile_detector)
+        elif hasattr(worker, 'kind'):
+            profile.update(detector=worker.kind, device=worker.device, model_size=worker.model_size)
+        try:
+            save_profile(name, profile)
+            self.profile_name = name
+        except OSError as e:
+            self.statusbar.showMessage(f"Could not save profile '{name}': {e}")
+    
+    def save_profile_as(self):
+        """Ask for a name and save the current setup"""
+        if not self.selected_rois:
+            QMessageBox.warning(self, "No Bench Areas", "Set up bench areas before saving a profile.")
+            return
+        default = self.profile_name or default_name(self.current_source())
+        name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:", text=default)
+        if ok and name.strip():
+            self.save_profile(name.strip())
+            self.statusbar.showMessage(f"Profile '{name.strip()}' saved")
+    
+    def load_profile(self):
+        """Pick a saved profile and resume it"""
+        names = profile_names()
+        if not names:
+            QMessageBox.information(self, "No Profiles", "No saved profiles yet.")
+            return
+        current = names.index(self.profile_name) if self.profile_name in names else 0
+        name, ok = QInputDialog.getItem(self, "Load Profile", "Profile:", names, current, False)
+        if not ok:
+            return
+        profile = get_profile(name)
+        if profile is None:
+            return
+        set_last(name)
+        self.resume_profile(profile)
+        
+        # The running worker keeps its detector; the profile's own settings
+        # stay saved with it and apply when the app next starts with it
+        worker = self.worker
+        wanted = (profile['detector'], profile['device'], profile['model_size'])
+        if hasattr(worker, 'kind') and (worker.kind, worker.device, worker.model_size) != wanted:
+            QMessageBox.information(
+                self,
+                "Restart Required",
+                f"Profile '{name}' uses detector {profile['detector']} on {profile['device']} "
+                f"(model size {profile['model_size']}).\n\n"
+                f"This session keeps running {worker.kind} on {worker.device} "
+                f"(model size {worker.model_size}). Restart the app to use the profile's detector."
+            )
+        
     def show_about(self):
         """Show about dialog"""
         QMessageBox.about(
@@ -495,8 +697,14 @@ class MainWindow(QMainWindow):
         self.bench_cards.clear()
         
         self.camera_widget.set_rois([], [])
-        if self.worker.isRunning():
+        self.worker.set_rois([])
+    
+    def closeEvent(self, event):
+        """Stop the worker and release the detector on exit"""
+        self.camera_widget.stop_camera()
+        if self.worker is not None:
             self.worker.stop()
+        super().closeEvent(event)
     
     def create_bench_cards(self, count):
         """Create status cards for each bench"""
@@ -560,7 +768,10 @@ class MainWindow(QMainWindow):
                             "border-radius: 6px; border: 2px solid #ff1744; }"
                         )
                     else:
-                        status_label.setText(f"<span style='color: #00e676;'>✓ OK</span>")
+                        # Benches on a reduced inference cadence are marked as such
+                        activity = result.get('activity', 'ACTIVE')
+                        suffix = f" <small style='color: #808080;'>({activity.lower()})</small>" if activity != 'ACTIVE' else ""
+                        status_label.setText(f"<span style='color: #00e676;'>✓ OK</span>{suffix}")
                         self.bench_cards[idx].setStyleSheet(
                             "QWidget { background-color: #3a3a3a; border-radius: 6px; "
                             "border: 2px solid #4a4a4a; }"
@@ -584,3 +795,24 @@ class MainWindow(QMainWindow):
     def update_fps(self, fps):
         """Update FPS display"""
         self.fps_label.setText(f"FPS: {int(fps)}")
+    
+    def update_stats(self, stats):
+        """Update inference statistics display"""
+        self.inference_label.setText(
+            f"Inference: {stats['skip_ratio']:.0%} skipped (static) | "
+            f"{stats['ACTIVE']} active / {stats['IDLE']} idle / {stats['EMPTY']} empty | "
+            f"{stats.get('deferred', 0)} deferred"
+        )
+        
+        # Load shedding level
+        level = stats.get('load_level', 0)
+        if 'load_description' in stats:
+            color = '#00e676' if level == 0 else '#ffab00'
+            self.load_label.setText(
+                f"Load: <span style='color: {color};'>{stats['load_description']}</span> "
+                f"(level {level}, {stats['latency_ms']:.0f} ms)"
+            )
+        if level != self.load_level:
+            self.statusbar.showMessage(f"Load level {level}: {stats.get('load_description', '')}")
+            self.camera_widget.set_cosmetic_rendering(stats.get('render_enabled', True))
+            self.load_level = level
@@ -1,14 +1,29 @@
 """
 Processing worker for running YOLO detection and analysis in background thread
+
+One worker (and one loaded detector) serves the whole application lifetime:
+ROI and source changes are applied to the running thread.
 """
 from PyQt6.QtCore import QThread, pyqtSignal
 import numpy as np
+import threading
 import time
 
-from core.detector_yolo import YOLOPoseDetector
-from core.analyzer import BenchPressAnalyzer
+from core.inference_pool import InferencePool
+from core.detector_factory import (
+    GUI_DETECTOR, COCO_DETECTORS, detector_spec, create_detector, create_person_detector
+)
+from core.remote import RemotePoseDetector
+from core.pipeline import BenchPipeline
 from core.logger import FailureLogger
-from config import TARGET_FPS, GPU_DEVICE, YOLO_MODEL_SIZE
+from core.load_shedder import LoadShedder
+from core.tracing import tracer
+from core.calibration import resolve_model_size
+from utils.geometry import roi_to_pixels
+from config import (
+    TARGET_FPS, GPU_DEVICE, YOLO_MODEL_SIZE, CAMERA_WIDTH, CAMERA_HEIGHT, DEFAULT_ROI,
+    INFERENCE_WORKERS, REMOTE_INFERENCE_HOST, REMOTE_PORT
+)
 
 class ProcessingWorker(QThread):
     """Background thread for pose detection and analysis"""
@@ -16,21 +31,45 @@ class ProcessingWorker(QThread):
     # Signals
     results_ready = pyqtSignal(list)  # List of bench results
     fps_updated = pyqtSignal(float)  # FPS value
+    stats_updated = pyqtSignal(dict)  # Inference statistics (skip ratio, bench activity)
+    detector_failed = pyqtSignal(str)  # Detector could not be loaded (error message); run() has ended
     
-    def __init__(self, parent=None):
+    def __init__(self, kind=GUI_DETECTOR, device=GPU_DEVICE, model_size=YOLO_MODEL_SIZE, parent=None):
+        """
+        Args:
+            kind: Detector backend (a COCO one - the GUI draws COCO skeletons)
+            device: 'cuda:0' or 'cpu'
+            model_size: YOLO size; 'auto' is calibrated for the ROIs set
+                        before start() (one DEFAULT_ROI bench if none) and
+                        again when the number of benches changes
+        """
         super().__init__(parent)
         
+        self.kind = kind if kind in COCO_DETECTORS else GUI_DETECTOR
+        self.device = device
+        self.model_size = model_size
+        
         self.running = False
         self.current_frame = None
+        self.frame_time = 0.0  # Arrival time of current_frame
+        self.frame_timestamp = None  # Media time of current_frame (video files)
+        self.frame_seq = 0
+        self.processed_seq = 0
         self.rois = []
         
         # Initialize detector
         self.detector = None
-        self.benches = []
+        self.active_model_size = None  # Resolved size of the loaded YOLO model
+        self.calibrated_benches = None  # Bench count 'auto' was resolved for
+        self.calibrator = None  # Thread re-resolving 'auto' after a bench count change
+        self.pending_detector = None  # (detector, model_size) ready to replace the current one
+        self.pipeline = BenchPipeline(fps=TARGET_FPS)
         self.logger = FailureLogger()
+        self.shedder = LoadShedder(logger=self.logger)
         
         # FPS calculation
         self.prev_time = 0
+        self.last_stats_time = 0
         
         # Debug/visualization mode
         self.show_keypoints = False
@@ -47,110 +86,64 @@ class ProcessingWorker(QThread):
             rois: List of normalized ROI dicts
         """
         self.rois = rois
+        self.pipeline.set_rois(rois)
         
-        # Recreate benches
-        self.benches = []
-        for idx, roi in enumerate(rois):
-            self.benches.append({
-                'id': idx + 1,
-                'roi': roi,
-                'analyzer': BenchPressAnalyzer(fps=TARGET_FPS),
-                'state': 'NORMAL',
-                'reason': '',
-                'fps': 0
-            })
+        if self.calibrated_benches is not None and len(rois or [DEFAULT_ROI]) != self.calibrated_benches:
+            self.start_recalibration()
             
-    def set_frame(self, frame):
-        """Update current frame to process"""
+    def set_frame(self, frame, timestamp=None):
+        """
+        Update current frame to process
+        
+        Args:
+            frame: BGR frame (None = stop processing)
+            timestamp: Frame time for the analyzers (media time of a video
+                       file); None = wall clock at processing
+        """
         self.current_frame = frame.copy() if frame is not None else None
+        self.frame_time = time.time()
+        self.frame_timestamp = timestamp
+        self.frame_seq += 1
         
     def run(self):
-        """Main processing loop"""
+        """
+        Main processing loop.
+        
+        Started once at application start and kept running across monitoring
+        sessions: the detector is loaded and warmed up here while the user is
+        still picking a source, and idles (no frame or no ROIs) in between.
+        If the detector cannot be loaded, detector_failed is emitted and the
+        thread ends; starting it again retries the load.
+        """
         self.running = True
+        tracer.set_thread_name("ProcessingWorker")
         
-        # Initialize YOLO detector
-        try:
-            print("[ProcessingWorker] Initializing YOLO detector...")
-            self.detector = YOLOPoseDetector(model_size=YOLO_MODEL_SIZE, device=GPU_DEVICE)
-            print("[ProcessingWorker] YOLO detector ready!")
-        except Exception as e:
-            print(f"[ProcessingWorker] Failed to initialize detector: {e}")
-            return
+        if self.detector is None:
+            error = self.load_detector()
+            if error is not None:
+                self.running = False
+                self.detector_failed.emit(error)
+                return
         
         while self.running:
-            if self.current_frame is None or len(self.benches) == 0:
+            if self.pending_detector is not None:
+                self.swap_detector()
+            
+            if self.current_frame is None or len(self.pipeline.benches) == 0:
+                self.prev_time = 0
                 time.sleep(0.01)
                 continue
+            if self.frame_timestamp is not None and self.frame_seq == self.processed_seq:
+                time.sleep(0.005)  # Same video frame: never analyzed twice at one media time
+                continue
             
             try:
-                # Calculate FPS
-                curr_time = time.time()
-                if self.prev_time > 0:
-                    fps = 1.0 / (curr_time - self.prev_time)
-                    self.fps_updated.emit(fps)
-                self.prev_time = curr_time
-                
-                # Process each bench
-                frame = self.current_frame.copy()
-                h, w = frame.shape[:2]
-                
-                results = []
-                
-                for bench in self.benches:
-                    roi = bench['roi']
-                    
-                    # Extract ROI
-                    r_x = int(roi['x'] * w)
-                    r_y = int(roi['y'] * h)
-                    r_w = int(roi['w'] * w)
-                    r_h = int(roi['h'] * h)
-                    
-                    # Clamp
-                    r_x = max(0, r_x)
-                    r_y = max(0, r_y)
-                    r_w = min(w - r_x, r_w)
-                    r_h = min(h - r_y, r_h)
-                    
-                    if r_w <= 0 or r_h <= 0:
-                        continue
-                    
-                    roi_img = frame[r_y:r_y+r_h, r_x:r_x+r_w]
-                    
-                    # Detect pose
-                    self.detector.find_pose(roi_img, draw=False)
-                    lm_list = self.detector.find_position(roi_img)
-                    
-                    # Analyze
-                    if lm_list:
-                        state, reason = bench['analyzer'].analyze(lm_list)
-                        bench['state'] = state
-                        bench['reason'] = reason
-                        
-                        # Log danger events
-                        if state == "DANGER":
-                            self.logger.log(bench['id'], state, reason, 0)
-                    else:
-                        bench['state'] = 'NO_POSE'
-                        bench['reason'] = 'No person detected'
-                    
-                    # Collect result with keypoints if visualization enabled
-                    result = {
-                        'id': bench['id'],
-                        'state': bench['state'],
-                        'reason': bench['reason'],
-                        'roi': roi
-                    }
-                    
-                    if self.show_keypoints and lm_list:
-                        result['keypoints'] = lm_list
-                    
-                    results.append(result)
-                
-                # Emit results
-                self.results_ready.emit(results)
+                with tracer.span("frame", "worker", benches=len(self.pipeline.benches)):
+                    self.process_frame()
                 
                 # Throttle to target FPS
-                time.sleep(1.0 / TARGET_FPS)
+                with tracer.span("throttle", "worker"):
+                    time.sleep(1.0 / TARGET_FPS)
                 
             except Exception as e:
                 print(f"[ProcessingWorker] Error in processing loop: {e}")
@@ -160,7 +153,174 @@ class ProcessingWorker(QThread):
         
         print("[ProcessingWorker] Stopped")
         
+    def load_detector(self):
+        """
+        Build the detector (remote server, worker processes if a pool is
+        configured so inference does not hold the GIL the GUI thread needs,
+        or in this thread) and warm it up with a dummy inference.
+        
+        Returns:
+            str: Error message if the detector could not be created, else None
+        """
+        try:
+            kind, device = self.kind, self.device
+            print(f"[ProcessingWorker] Initializing {kind.upper()} detector...")
+            start = time.time()
+            
+            # The detector is kept for every later session: 'auto' is calibrated
+            # for the ROIs known now (a resumed profile), else one DEFAULT_ROI bench,
+            # and re-resolved in the background when the bench count changes
+            model_size = self.model_size
+            if kind == 'yolo':
+                rois = self.rois or [DEFAULT_ROI]
+                model_size = resolve_model_size(rois, CAMERA_WIDTH, CAMERA_HEIGHT, device, model_size)
+                if self.model_size == 'auto' and not REMOTE_INFERENCE_HOST:
+                    self.calibrated_benches = len(rois)
+            self.active_model_size = model_size
+            
+            self.detector = self.build_detector(model_size)
+            self.pipeline.detector = self.detector
+            # Top-down models pose person boxes, found at a low rate, instead of whole ROIs
+            self.pipeline.person_detector = create_person_detector(kind, device)
+            
+            self.warm_up()
+            print(f"[ProcessingWorker] {kind.upper()} detector ready! ({time.time() - start:.1f}s)")
+            return None
+        except Exception as e:
+            print(f"[ProcessingWorker] Failed to initialize detector: {e}")
+            self.close_detector(self.detector)
+            self.detector = self.pipeline.detector = None
+            return f"{type(e).__name__}: {e}"
+        
+    def build_detector(self, model_size):
+        """Remote client, worker pool or in-thread detector for the worker's backend"""
+        kind, device = self.kind, self.device
+        if REMOTE_INFERENCE_HOST:
+            return RemotePoseDetector(
+                REMOTE_INFERENCE_HOST, REMOTE_PORT,
+                fallback=lambda: create_detector(kind, device, model_size), kind=kind
+            )
+        if INFERENCE_WORKERS > 0:
+            pool_detector, pool_kwargs = detector_spec(kind, device, model_size)
+            return InferencePool(
+                INFERENCE_WORKERS, detector=pool_detector, detector_kwargs=pool_kwargs
+            ).start()
+        return create_detector(kind, device, model_size)
+        
+    def warm_up(self, pipeline=None):
+        """One dummy inference so the first real frame does not pay for CUDA/cuDNN setup"""
+        pipeline = pipeline or self.pipeline
+        frame = np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+        rect = roi_to_pixels(DEFAULT_ROI, CAMERA_WIDTH, CAMERA_HEIGHT)
+        
+        with tracer.span("warmup", "worker"):
+            if pipeline.person_detector is not None:
+                pipeline.person_detector.detect_boxes(frame, [rect])
+            pipeline.detect_rects(frame, [(0, rect)])
+        
+    def start_recalibration(self):
+        """Re-resolve 'auto' for the current benches in the background"""
+        if self.calibrator is not None and self.calibrator.is_alive():
+            return  # The running pass re-checks the bench count when it ends
+        self.calibrator = threading.Thread(target=self.recalibrate, name="Calibration", daemon=True)
+        self.calibrator.start()
+        
+    def recalibrate(self):
+        """
+        Calibration thread: look up (or time) the model size for the current
+        bench count and load the new model while the current one keeps
+        serving; the processing loop swaps it in between frames.
+        """
+        while len(self.rois or [DEFAULT_ROI]) != self.calibrated_benches:
+            rois = self.rois or [DEFAULT_ROI]
+            try:
+                model_size = resolve_model_size(rois, CAMERA_WIDTH, CAMERA_HEIGHT, self.device, 'auto')
+                pending = self.pending_detector[1] if self.pending_detector else self.active_model_size
+                if model_size != pending:
+                    replacement = None
+                    if model_size != self.active_model_size:
+                        print(f"[ProcessingWorker] {len(rois)} bench(es): loading yolo11{model_size}-pose "
+                              f"(running {self.active_model_size})")
+                        detector = self.build_detector(model_size)
+                        self.warm_up(BenchPipeline(detector))
+                        replacement = (detector, model_size)
+                    # A model loaded for an earlier bench count is no longer wanted
+                    replaced, self.pending_detector = self.pending_detector, replacement
+                    if replaced is not None:
+                        self.close_detector(replaced[0])
+            except Exception as e:
+                print(f"[ProcessingWorker] Recalibration failed, keeping the current model: {e}")
+            self.calibrated_benches = len(rois)
+        
+    def swap_detector(self):
+        """Replace the detector with the recalibrated one (processing thread, between frames)"""
+        (detector, model_size), self.pending_detector = self.pending_detector, None
+        old = self.detector
+        self.detector = self.pipeline.detector = detector
+        self.active_model_size = model_size
+        
+        # Shedding levels now step down from the new model
+        self.shedder.reset_detector()
+        self.shedder.apply(self.pipeline)
+        
+        self.close_detector(old)
+        print(f"[ProcessingWorker] Now running yolo11{model_size}-pose")
+        
+    def close_detector(self, detector):
+        """Release worker processes / connections of a detector that is no longer used"""
+        if isinstance(detector, (InferencePool, RemotePoseDetector)):
+            detector.close()
+        
+    def process_frame(self):
+        """Run detection and analysis on the current frame for every bench"""
+        # Calculate FPS
+        curr_time = time.time()
+        if self.prev_time > 0:
+            fps = 1.0 / (curr_time - self.prev_time)
+            self.fps_updated.emit(fps)
+        self.prev_time = curr_time
+        
+        # Process each bench
+        with tracer.span("copy", "worker"):
+            frame = self.current_frame.copy()
+            frame_time = self.frame_time
+            timestamp = self.frame_timestamp
+            self.processed_seq = self.frame_seq
+        
+        results = self.pipeline.process(frame, timestamp if timestamp is not None else curr_time)
+        
+        # Step the degradation level on frame arrival -> results latency
+        level_changed = self.shedder.update(time.time() - frame_time, curr_time)
+        if level_changed:
+            self.shedder.apply(self.pipeline)
+        show_keypoints = self.show_keypoints and self.shedder.render_enabled
+        
+        for result in results:
+            # Log danger events (fresh detections only, as in main.py)
+            if result['state'] == "DANGER" and result['inferred']:
+                self.logger.log(result['id'], result['state'], result['reason'], 0)
+            
+            # Only ship keypoints to the GUI if visualization enabled
+            if not (show_keypoints and result['keypoints']):
+                del result['keypoints']
+        
+        # Emit results
+        self.results_ready.emit(results)
+        
+        # Inference statistics once per second (at once on a load level change)
+        if level_changed or curr_time - self.last_stats_time >= 1.0:
+            stats = self.pipeline.stats()
+            stats.update(self.shedder.stats())
+            self.stats_updated.emit(stats)
+            self.last_stats_time = curr_time
+        
     def stop(self):
-        """Stop processing"""
+        """Stop processing and release the detector (application exit)"""
         self.running = False
         self.wait()  # Wait for thread to finish
+        
+        self.close_detector(self.detector)
+        if self.pending_detector is not None:
+            self.close_detector(self.pending_detector[0])
+            self.pending_detector = None
+        self.detector = None
@@ -0,0 +1,181 @@
+"""
+GUI side of the split-process deployment (gui_app.py --split).
+
+In split mode the GUI process does no capture or inference of its own:
+
+    - RingCapture stands in for cv2.VideoCapture and shows the newest frame
+      from the shared-memory ring written by the capture stage
+    - StageClient stands in for ProcessingWorker: it forwards ROIs and the
+      selected source to the supervisor and emits the analysis stage's
+      results with the same signals MainWindow already listens to
+"""
+import queue
+import sys
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from config import STAGE_OPEN_TIMEOUT_SEC
+from core.shared_frames import SharedFrameRing
+from core.stages import drain
+
+
+class RingCapture:
+    """cv2.VideoCapture stand-in reading the newest frame of a SharedFrameRing"""
+
+    def __init__(self, spec, on_release=None):
+        """
+        Args:
+            spec: SharedFrameRing.spec() (None = source failed to open)
+            on_release: Called from release()
+        """
+        self.ring = SharedFrameRing.attach(spec) if spec else None
+        self.on_release = on_release
+        self.frame = None
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def read(self):
+        """Newest frame (the previous one again if capture has not written a new one)"""
+        if self.ring is None:
+            return False, None
+        _, _, frame = self.ring.latest()
+        if frame is not None:
+            self.frame = frame
+        return self.frame is not None, self.frame
+
+    def set(self, prop, value):
+        return False  # Capture properties belong to the capture stage
+
+    def release(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if self.on_release:
+            self.on_release()
+
+
+class StageClient(QObject):
+    """ProcessingWorker stand-in backed by the analysis stage"""
+
+    # Same signals as ProcessingWorker
+    results_ready = pyqtSignal(list)
+    fps_updated = pyqtSignal(float)
+    stats_updated = pyqtSignal(dict)
+
+    POLL_MS = 20
+
+    def __init__(self, control, states, commands, parent=None):
+        """
+        Args:
+            control: Control queue from the supervisor ('ring', spec)
+            states: Results queue from the analysis stage
+            commands: Command queue to the supervisor
+        """
+        super().__init__(parent)
+        self.control = control
+        self.states = states
+        self.commands = commands
+
+        self.running = False
+        self.show_keypoints = False
+        self.ring_spec = None
+        self.prev_time = 0
+        self.last_stats_time = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start(self.POLL_MS)
+
+    # --- ProcessingWorker interface ----------------------------------------
+
+    def isRunning(self):
+        return self.running
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        self.commands.put(('rois', []))
+
+    def set_rois(self, rois):
+        self.commands.put(('rois', rois))
+
+    def set_frame(self, frame, timestamp=None):
+        pass  # Frames reach the pipeline through the shared ring
+
+    def set_show_keypoints(self, enabled):
+        self.show_keypoints = enabled
+
+    # --- Source handling ----------------------------------------------------
+
+    def open_capture(self, source):
+        """
+        CameraWidget capture factory: ask the supervisor to start capturing
+        `source` and attach to the ring it creates.
+
+        Returns:
+            RingCapture: isOpened() is False if the source could not be opened
+        """
+        self.commands.put(('source', source))
+
+        deadline = time.time() + STAGE_OPEN_TIMEOUT_SEC
+        spec = None
+        while time.time() < deadline:
+            try:
+                msg = self.control.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if msg[0] == 'ring':
+                spec = msg[1]
+                break
+
+        self.ring_spec = spec
+        return RingCapture(spec, on_release=lambda: self.commands.put(('stop_source',)))
+
+    # --- Results --------------------------------------------------------------
+
+    def poll(self):
+        """Forward the newest analysis results to the GUI (older ones are skipped)"""
+        for msg in drain(self.control):
+            if msg[0] == 'ring':
+                self.ring_spec = msg[1]
+
+        latest = None
+        for msg in drain(self.states):
+            latest = msg
+        if latest is None or not self.running:
+            return
+
+        _, _, results = latest
+
+        curr_time = time.time()
+        if self.prev_time > 0 and curr_time > self.prev_time:
+            self.fps_updated.emit(1.0 / (curr_time - self.prev_time))
+        self.prev_time = curr_time
+
+        for result in results:
+            if not (self.show_keypoints and result['keypoints']):
+                del result['keypoints']
+        self.results_ready.emit(results)
+
+        if curr_time - self.last_stats_time >= 1.0:
+            empty = sum(1 for r in results if r['state'] == 'NO_POSE')
+            self.stats_updated.emit({
+                'skip_ratio': 0.0,
+                'ACTIVE': len(results) - empty,
+                'IDLE': 0,
+                'EMPTY': empty
+            })
+            self.last_stats_time = curr_time
+
+
+def ui_stage(control, states, commands, qt_args):
+    """GUI process entry point (started by core.supervisor.Supervisor)"""
+    import gui_app
+
+    exit_code = gui_app.run_app(qt_args, worker_factory=lambda: StageClient(control, states, commands))
+    commands.put(('quit',))
+    sys.exit(exit_code)
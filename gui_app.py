@@ -1,27 +1,88 @@
 """
 BenchGuard Pro - Professional Bench Press Safety Monitoring System
 Main GUI Application Entry Point
+
+Only Qt and the window modules are imported before the first paint; the
+processing worker (pipeline, detector, torch/ultralytics) is attached right
+after it, and the model loads in the worker thread.
 """
+import time
+START_TIME = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 import sys
+import argparse
 from gui.main_window import MainWindow
+from core.tracing import tracer
 
-def main():
+def run_app(qt_args, worker_factory=None, startup_check=False):
+    """
+    Create the Qt application and main window and run the event loop.
+
+    Args:
+        qt_args: Command line arguments for Qt
+        worker_factory: Builds the processing backend once QApplication exists
+                        (None = in-process ProcessingWorker)
+        startup_check: Quit at the first paint, without loading the worker
+                       (test_startup.py)
+
+    Returns:
+        int: Application exit code
+    """
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
     
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + list(qt_args))
     app.setApplicationName("BenchGuard Pro")
     app.setOrganizationName("GymerGuard")
     
     # Create and show main window
     window = MainWindow()
+    if startup_check:
+        window.first_painted.connect(lambda: report_first_paint(app))
+    else:
+        # Let the first paint finish, then attach the worker
+        window.first_painted.connect(lambda: QTimer.singleShot(
+            0, lambda: window.attach_worker(worker_factory() if worker_factory else None)))
     window.show()
     
-    sys.exit(app.exec())
+    return app.exec()
+
+def report_first_paint(app):
+    """Print the time to first paint and the heavy modules already imported, then quit"""
+    heavy = [name for name in ('torch', 'ultralytics', 'onnxruntime', 'mediapipe') if name in sys.modules]
+    print(f"[Startup] First paint after {time.perf_counter() - START_TIME:.2f}s "
+          f"(heavy modules loaded: {', '.join(heavy) or 'none'})", flush=True)
+    app.quit()
+
+def main():
+    # App-specific flags; everything else is passed through to Qt
+    parser = argparse.ArgumentParser(description='BenchGuard Pro')
+    parser.add_argument('--trace', type=str, nargs='?', const='', default=None,
+                        help='Record a Chrome trace of the pipeline (optional output path)')
+    parser.add_argument('--split', action='store_true',
+                        help='Run capture, inference, analysis and GUI as separate supervised processes')
+    parser.add_argument('--startup-check', action='store_true',
+                        help='Quit at the first window paint and report the time (test_startup.py)')
+    args, qt_args = parser.parse_known_args()
+    
+    if args.split:
+        from core.supervisor import Supervisor
+        sys.exit(Supervisor(ui_args=qt_args).run())
+    
+    if args.trace is not None:
+        tracer.enable()
+    tracer.set_thread_name("GUI")
+    
+    exit_code = run_app(qt_args, startup_check=args.startup_check)
+    
+    if tracer.enabled:
+        tracer.save(args.trace or None)
+    
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
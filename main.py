@@ -3,63 +3,79 @@ import time
 import signal
 import sys
 import argparse
+import os
 from config import *
 from config import BENCH_COLORS  # Explicit import for multi-ROI
-from core.camera import CameraStream
-from core.detector import PoseDetector
-from core.analyzer import BenchPressAnalyzer
+from core.camera import CameraStream, step_speed
+from core.pipeline import BenchPipeline
+from core.multi_camera import MultiCameraPipeline
+from core.inference_pool import InferencePool
+from core.detector_factory import (
+    DETECTORS, COCO_DETECTORS, detector_spec, create_detector, create_person_detector
+)
+from core.remote import RemotePoseDetector
+from core.tracker import KeypointTracker
+from core.calibration import resolve_model_size
 from core.logger import FailureLogger
+from core.load_shedder import LoadShedder
+from core.offline import analyze_video, write_report, print_report, report_path, parse_clock
+from core.batch import analyze_segments
+from core.profiles import get_profile, save_profile, make_profile, default_name
+from core.tracing import tracer
 from utils.visualization import draw_roi, draw_info
 from utils.animation_utils import DangerAnimator
 
+# Skeleton connections (COCO format) for YOLO debug drawing
+COCO_CONNECTIONS = [
+    (5, 6), (5, 7), (7, 9), (6, 8), (8, 10),  # Arms
+    (5, 11), (6, 12), (11, 12),  # Torso
+    (11, 13), (13, 15), (12, 14), (14, 16)  # Legs
+]
+
+def draw_debug_pose(roi_display, lm_list, connections, barbell):
+    """Draw skeleton, keypoints and barbell line inside an ROI view (ROI pixel coords)."""
+    # Draw connections
+    for conn in connections:
+        if conn[0] < len(lm_list) and conn[1] < len(lm_list):
+            p1 = lm_list[conn[0]]
+            p2 = lm_list[conn[1]]
+            if p1['visibility'] > 0.3 and p2['visibility'] > 0.3:
+                cv2.line(roi_display, 
+                        (p1['x_px'], p1['y_px']),
+                        (p2['x_px'], p2['y_px']),
+                        (0, 255, 255), 2)
+    
+    # Draw keypoints
+    for landmark in lm_list:
+        if landmark['visibility'] > 0.3:
+            cv2.circle(roi_display, 
+                      (landmark['x_px'], landmark['y_px']),
+                      4, (0, 255, 0), -1)
+            cv2.circle(roi_display,
+                      (landmark['x_px'], landmark['y_px']),
+                      6, (255, 255, 255), 1)
+    
+    # Draw Barbell Line
+    if barbell:
+        p1 = (barbell['left']['x_px'], barbell['left']['y_px'])
+        p2 = (barbell['right']['x_px'], barbell['right']['y_px'])
+        cv2.line(roi_display, p1, p2, (255, 0, 255), 4)
+        cv2.circle(roi_display, p1, 8, (255, 0, 255), -1)
+        cv2.circle(roi_display, p2, 8, (255, 0, 255), -1)
+
 def signal_handler(sig, frame):
     print('You pressed Ctrl+C! Exiting...')
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
 
-def main():
-    # Parse Arguments
-    parser = argparse.ArgumentParser(description='Bench Press Guard')
-    parser.add_argument('--video', type=str, help='Path to video file for demo mode')
-    parser.add_argument('--detector', type=str, default=DETECTOR_TYPE, 
-                        choices=['mediapipe', 'yolo'], 
-                        help='Pose detector to use')
-    parser.add_argument('--device', type=str, default=GPU_DEVICE,
-                        help='Device for inference: cuda:0 or cpu')
-    args = parser.parse_args()
-
-    # 1. Initialize System
-    print("="*60)
-    print("Initializing Bench Press Guard")
-    print("="*60)
-    print(f"Detector: {args.detector.upper()}")
-    print(f"Device: {args.device}")
-    
-    # Determine source
-    # Check if args.video is a digit (camera index) or path
-    source = 0
-    if args.video:
-        if args.video.isdigit():
-            source = int(args.video)
-        else:
-            source = args.video
-            print(f"Running in Video Demo Mode: {source}")
+def select_rois(camera):
+    """
+    Interactive multi-ROI selection on live frames (cv2.selectROI).
 
-    # Initialize components
-    camera = CameraStream(src=source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT).start()
-    
-    # Initialize detector based on selection
-    if args.detector == 'yolo':
-        from core.detector_yolo import YOLOPoseDetector
-        detector = YOLOPoseDetector(model_size=YOLO_MODEL_SIZE, device=args.device)
-    else:  # mediapipe
-        detector = PoseDetector(detection_con=0.7, track_con=0.7)
-    
-    # Wait for camera to warm up
-    time.sleep(2.0)
-    
-    # --- Multi-ROI Selection ---
+    Returns:
+        list: Normalized ROI dicts, or None if no frame could be read
+    """
     print("="*60)
     print("Select bench press areas (one at a time)")
     print("Press ESC after selecting all benches to continue")
@@ -79,7 +95,7 @@ def main():
         
         if first_frame is None:
             print("Error: Could not read frame from camera/video.")
-            return
+            return None
         
         # Draw existing ROIs on frame for reference
         display_frame = first_frame.copy()
@@ -130,32 +146,355 @@ def main():
         if bench_count >= 6:
             print("Maximum 6 benches reached.")
             break
+
+    return rois
+
+
+def render_result(display_frame, result, bench, danger_animator, connections, show_debug, cosmetic):
+    """
+    Draw one bench result (debug skeleton, danger pulse, ROI box and reason).
+    Without cosmetic rendering only the debug skeleton is dropped; the
+    danger pulse is the operator alarm and is always drawn.
+
+    Returns:
+        np.ndarray: The frame to keep drawing on (the danger pulse may replace it)
+    """
+    roi_def = result['roi']
+    state, reason = result['state'], result['reason']
+    r_x, r_y, r_w, r_h = result['rect']
     
-    # CRITICAL FIX: Restart video stream to reset from beginning
-    print(f"[DEBUG] camera.is_file = {camera.is_file}")
-    if camera.is_file:
-        print("[INFO] Restarting video stream...")
+    # Draw Debug if enabled
+    if show_debug and cosmetic and result['keypoints']:
+        roi_display = display_frame[r_y:r_y+r_h, r_x:r_x+r_w]
+        draw_debug_pose(roi_display, result['keypoints'], connections,
+                        bench['analyzer']._extract_barbell(result['keypoints']))
+    
+    with tracer.span("render", "main", bench=result['id']):
+        # 6. Animate danger if needed
+        if state == "DANGER":
+            display_frame = danger_animator.animate_danger_pulse(display_frame, roi_def, intensity=0.4)
+        else:
+            danger_animator.reset()
+        
+        # 7. Visualize
+        # Pass usage info or reason
+        draw_roi(display_frame, roi_def, state, reason if state == "DANGER" else "")
+    return display_frame
+
+
+def monitor_cameras(cameras, camera_rois, detector, connections, args):
+    """
+    Monitor several cameras with one shared detector and inference scheduler.
+
+    Each camera gets its own window and dashboard. FPS and latency are
+    reported per camera; inference counters and the load level are shared.
+
+    Args:
+        cameras: Started CameraStreams
+        camera_rois: Normalized bench ROIs per camera
+        detector: Pose detector shared by all cameras
+        connections: Skeleton connections for debug drawing
+        args: Parsed command line
+    """
+    from utils.visualization import create_dashboard_panel
+    
+    pipeline = MultiCameraPipeline(detector, names=[camera.name for camera in cameras],
+                                   fps=TARGET_FPS, tracker_mode=args.tracker,
+                                   person_detector=create_person_detector(args.detector, args.device))
+    for idx, rois in enumerate(camera_rois):
+        pipeline.set_rois(idx, rois)
+    
+    print(f"Monitoring {sum(len(rois) for rois in camera_rois)} bench(es) on {len(cameras)} cameras")
+    
+    logger = FailureLogger()
+    shedder = LoadShedder(logger=logger)
+    danger_animators = [DangerAnimator() for _ in cameras]
+    show_debug = False
+    
+    print("System Active. Press 'q' to quit.")
+    
+    while True:
+        if all(camera.stopped for camera in cameras):
+            print("Video sources ended.")
+            break
+        
+        frames = [None if camera.stopped else camera.read() for camera in cameras]
+        frame_times = [camera.last_frame_time for camera in cameras]
+        results = pipeline.process(frames, frame_times)
+        
+        updated = [idx for idx, camera_results in enumerate(results) if camera_results is not None]
+        if updated:
+            # Degrade / recover on the slowest camera's arrival -> results latency
+            if shedder.update(max(pipeline.latency[idx] for idx in updated), time.time()):
+                shedder.apply(pipeline)
+            cosmetic = shedder.render_enabled
+            inference_stats = pipeline.stats()
+            camera_stats = pipeline.camera_stats()
+        
+        for idx in updated:
+            camera = cameras[idx]
+            display_frame = frames[idx].copy()
+            for result in results[idx]:
+                if result['inferred']:  # Fresh detections only
+                    logger.log(f"{camera.name}/{result['id']}", result['state'], result['reason'],
+                               camera.get_latency())
+                display_frame = render_result(display_frame, result,
+                                              pipeline.pipelines[idx].get_bench(result['id']),
+                                              danger_animators[idx], connections, show_debug, cosmetic)
+            
+            own = camera_stats[idx]
+            stats = {
+                "Camera": camera.name,
+                "System FPS": f"{int(own['fps'])}",
+                "Latency": f"{int(own['latency'] * 1000)}ms",
+                "Status": "Monitoring" if not own['danger'] else "DANGER DETECTED",
+                "Debug (d)": "ON" if show_debug else "OFF",
+                "Detector": args.detector.upper(),
+                "Cameras": " / ".join(f"{int(cam['fps'])} fps" for cam in camera_stats),
+                "Benches": "{ACTIVE} active / {IDLE} idle / {EMPTY} empty".format(**inference_stats),
+                "Skipped": f"{inference_stats['skip_ratio']:.0%}",
+                "Deferred": f"{inference_stats['deferred']}",
+                "Load": f"L{shedder.level} {shedder.name}"
+            }
+            h, w, _ = display_frame.shape
+            dashboard_panel = create_dashboard_panel(stats, h, width=400)
+            with tracer.span("display", "main"):
+                cv2.imshow(f"Bench Press Guard - {camera.name}", cv2.hconcat([dashboard_panel, display_frame]))
+        
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        elif key == ord('d'):
+            show_debug = not show_debug
+            print(f"Debug mode: {'ON' if show_debug else 'OFF'}")
+
+
+def analyze_files(sources, camera_rois, detector, args):
+    """
+    Offline mode: analyze each video file (every frame, media timestamps)
+    and write its per-bench report to args.report_dir.
+    """
+    person_detector = create_person_detector(args.detector, args.device)
+    for source, rois in zip(sources, camera_rois):
+        print(f"[Offline] Analyzing {source} ({len(rois)} bench(es))...")
+        report = analyze_video(source, rois, detector, person_detector=person_detector,
+                               tracker_mode=args.tracker, rate=args.rate)
+        report['detector'] = args.detector
+        path = report_path(source, args.report_dir)
+        write_report(report, path)
+        print_report(report)
+        print(f"[Offline] Report written to {path}")
+
+
+def analyze_files_segmented(sources, camera_rois, model_size, args):
+    """
+    Offline mode with --segments: each video is split into time segments
+    analyzed in parallel processes and merged into one report.
+    """
+    for source, rois in zip(sources, camera_rois):
+        report = analyze_segments(source, rois, args.detector, args.device, model_size, args.segments)
+        report['detector'] = args.detector
+        path = report_path(source, args.report_dir)
+        write_report(report, path)
+        print_report(report)
+        print(f"[Offline] Report written to {path}")
+
+
+def shutdown(cameras, detector, args):
+    """Stop the cameras, release the detector and save the trace"""
+    for camera in cameras:
         camera.stop()
-        print("[DEBUG] Camera stopped")
-        time.sleep(0.5)
-        camera = CameraStream(src=source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT).start()
-        print("[DEBUG] Camera restarted")
-        time.sleep(1.0)
-        print("[DEBUG] Ready to process")
+    if isinstance(detector, (InferencePool, RemotePoseDetector)):
+        detector.close()
+    cv2.destroyAllWindows()
+    
+    if tracer.enabled:
+        tracer.save(args.trace)
+
+
+def main():
+    # Parse Arguments (a saved profile provides source, ROIs and detector defaults)
+    profile_parser = argparse.ArgumentParser(add_help=False)
+    profile_parser.add_argument('--profile', type=str, default=None,
+                                help='Camera profile to resume (created from the ROI selection if missing)')
+    profile_name = profile_parser.parse_known_args()[0].profile
+    profile = get_profile(profile_name) if profile_name else None
+    
+    parser = argparse.ArgumentParser(description='Bench Press Guard', parents=[profile_parser])
+    parser.add_argument('--video', type=str, action='append',
+                        help='Video file or camera index (repeat for several cameras sharing one model)')
+    parser.add_argument('--detector', type=str, default=DETECTOR_TYPE, 
+                        choices=list(DETECTORS), 
+                        help='Pose detector to use')
+    parser.add_argument('--device', type=str, default=GPU_DEVICE,
+                        help='Device for inference: cuda:0 or cpu')
+    parser.add_argument('--model-size', type=str, default=YOLO_MODEL_SIZE,
+                        choices=['n', 's', 'm', 'l', 'x', 'auto'],
+                        help="YOLO model size ('auto' = largest that fits the frame budget on this machine)")
+    parser.add_argument('--tracker', type=str, default=TRACKER_MODE,
+                        choices=['off', 'lk', 'kalman'],
+                        help='Bridge keypoints between sparse detections (every TRACKER_DETECT_INTERVAL frames)')
+    parser.add_argument('--workers', type=int, default=INFERENCE_WORKERS,
+                        help='Run inference in N worker processes (0 = in the main process)')
+    parser.add_argument('--remote', type=str, default=REMOTE_INFERENCE_HOST,
+                        help='Offload inference to a pose server at HOST[:PORT] (local fallback on deadline miss)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Analyze --video files as fast as possible on media time and write a report')
+    parser.add_argument('--segments', type=int, default=0,
+                        help='--offline: split each video into N time segments analyzed in parallel processes')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='--offline: pace the analysis at RATE x real time (default: as fast as possible)')
+    parser.add_argument('--report-dir', type=str, default=OFFLINE_REPORT_DIR,
+                        help='Directory for --offline reports')
+    parser.add_argument('--start', type=parse_clock, default=0.0,
+                        help="Video files: start playback at a media time, e.g. an event's 00:47:12")
+    parser.add_argument('--trace', type=str, nargs='?', const=TRACE_OUTPUT, default=None,
+                        help='Record a Chrome trace of the pipeline (optional output path)')
+    if profile is not None:
+        parser.set_defaults(detector=profile['detector'], device=profile['device'],
+                            model_size=profile['model_size'])
+    args = parser.parse_args()
+    
+    if args.trace:
+        tracer.enable()
+    tracer.set_thread_name("Main")
+
+    # 1. Initialize System
+    print("="*60)
+    print("Initializing Bench Press Guard")
+    print("="*60)
+    print(f"Detector: {args.detector.upper()}")
+    print(f"Device: {args.device}")
+    print(f"Tracker: {args.tracker}")
+    print(f"Inference workers: {args.workers or 'in-process'}")
+    if args.remote:
+        print(f"Remote inference: {args.remote}")
+    
+    # Determine sources (--video may be repeated, one camera each)
+    # Check if each value is a digit (camera index) or path
+    sources = [profile['source'] if profile is not None else 0]
+    if args.video:
+        sources = [int(video) if video.isdigit() else video for video in args.video]
+        for source in sources:
+            if isinstance(source, str):
+                print(f"Running in Video Demo Mode: {source}")
+    if args.offline and not all(isinstance(source, str) and os.path.isfile(source) for source in sources):
+        parser.error("--offline needs video files (--video PATH)")
+    if len(sources) > 1 and profile is not None:
+        print("[Profile] --profile holds one camera - ignored with several --video sources")
+        profile = None
+
+    # Initialize components
+    cameras = [CameraStream(src=source, name=default_name(source), width=CAMERA_WIDTH,
+                            height=CAMERA_HEIGHT, start_sec=args.start).start() for source in sources]
+    
+    # Wait for camera to warm up
+    time.sleep(2.0)
+    
+    # --- Multi-ROI Selection (skipped for a saved profile) ---
+    camera_rois = []
+    if profile is not None:
+        camera_rois.append(profile['rois'])
+        print(f"[Profile] '{profile['name']}': {len(profile['rois'])} bench(es), source {profile['source']}")
+    elif len(cameras) == 1:
+        rois = select_rois(cameras[0])
+        if rois is None:
+            return
+        camera_rois.append(rois)
+        if args.profile:
+            save_profile(args.profile, make_profile(sources[0], rois, detector=args.detector,
+                                                    device=args.device, model_size=args.model_size))
+    else:
+        # Several cameras: each resumes the profile named after its source
+        # (the name the GUI saves under) or is selected once and saved there
+        for camera, source in zip(cameras, sources):
+            saved = get_profile(camera.name)
+            if saved is not None and saved['source'] == source:
+                camera_rois.append(saved['rois'])
+                print(f"[Profile] '{camera.name}': {len(saved['rois'])} bench(es)")
+                continue
+            print(f"Camera: {camera.name}")
+            rois = select_rois(camera)
+            if rois is None:
+                return
+            camera_rois.append(rois)
+            save_profile(camera.name, make_profile(source, rois, detector=args.detector,
+                                                   device=args.device, model_size=args.model_size))
+
+    frame = cameras[0].read()
+    h, w = frame.shape[:2] if frame is not None else (CAMERA_HEIGHT, CAMERA_WIDTH)
+    
+    # CRITICAL FIX: Restart video stream to reset from beginning
+    for idx, camera in enumerate(cameras):
+        print(f"[DEBUG] camera.is_file = {camera.is_file}")
+        if camera.is_file and not args.offline:
+            print("[INFO] Restarting video stream...")
+            camera.stop()
+            print("[DEBUG] Camera stopped")
+            time.sleep(0.5)
+            cameras[idx] = CameraStream(src=camera.src, name=camera.name, width=CAMERA_WIDTH,
+                                        height=CAMERA_HEIGHT, start_sec=args.start).start()
+            print("[DEBUG] Camera restarted")
+            time.sleep(1.0)
+            print("[DEBUG] Ready to process")
+    
+    # Initialize detector based on selection (after ROI selection, so
+    # YOLO_MODEL_SIZE = 'auto' is calibrated for the real benches of every camera)
+    model_size = args.model_size
+    if args.detector == 'yolo':
+        model_size = resolve_model_size([roi for rois in camera_rois for roi in rois], w, h,
+                                        args.device, model_size)
+        print(f"Model size: {model_size}")
+
+    if args.offline and args.segments > 0:
+        # Every segment worker loads its own detector
+        analyze_files_segmented(sources, camera_rois, model_size, args)
+        shutdown(cameras, None, args)
+        return
+    
+    def create_local_detector():
+        return create_detector(args.detector, args.device, model_size)
     
-    # Build benches list with unique colors
-    benches = []
-    for idx, roi in enumerate(rois):
-        benches.append({
-            "id": idx + 1,
-            "roi": roi,
-            "analyzer": BenchPressAnalyzer(fps=TARGET_FPS),
-            "color": BENCH_COLORS[idx % len(BENCH_COLORS)]
-        })
+    if args.remote:
+        # Local model is only loaded if the server misses a deadline
+        host, _, port = args.remote.partition(':')
+        detector = RemotePoseDetector(host, int(port) if port else REMOTE_PORT,
+                                      fallback=create_local_detector, kind=args.detector)
+    elif args.workers > 0:
+        pool_detector, pool_kwargs = detector_spec(args.detector, args.device, model_size)
+        detector = InferencePool(args.workers, detector=pool_detector,
+                                 detector_kwargs=pool_kwargs).start()
+    else:
+        detector = create_local_detector()
     
-    print(f"Monitoring {len(benches)} bench(es)")
+    if args.offline:
+        analyze_files(sources, camera_rois, detector, args)
+        shutdown(cameras, detector, args)
+        return
+    
+    # Skeleton used for debug drawing
+    if args.detector in COCO_DETECTORS:
+        connections = COCO_CONNECTIONS
+    else:
+        import mediapipe as mp  # detector may live in worker processes
+        connections = mp.solutions.pose.POSE_CONNECTIONS
+    
+    if len(cameras) > 1:
+        monitor_cameras(cameras, camera_rois, detector, connections, args)
+        shutdown(cameras, detector, args)
+        return
+    camera, rois = cameras[0], camera_rois[0]
+    
+    # Build pipeline (one analyzer per bench)
+    pipeline = BenchPipeline(detector, fps=TARGET_FPS, tracker=KeypointTracker(args.tracker),
+                             person_detector=create_person_detector(args.detector, args.device),
+                             trace_cat="main")
+    pipeline.set_rois(rois)
+    
+    print(f"Monitoring {len(pipeline.benches)} bench(es)")
     
     logger = FailureLogger()
+    shedder = LoadShedder(logger=logger)
     
     # Initialize animations
     danger_animator = DangerAnimator()
@@ -164,126 +503,48 @@ def main():
 
     prev_frame_time = 0
     show_debug = False
-    playback_speed = 1.0  # Speed control
+    playback_speed = 1.0  # Speed control (recorded video, applied by the camera thread)
+    last_frame = None
     
     while True:
-        # Loop start time
-        start_time = time.time()
-        
         # 1. Get Frame
         if camera.stopped:
             print("Video source ended.")
             break
 
-        frame = camera.read()
+        # Recorded video is analyzed on media time, so fast-forward and slow
+        # motion keep the analyzer's time windows right
+        timestamp = None
+        if camera.is_file:
+            frame, timestamp = camera.read_media()
+            if frame is last_frame:
+                time.sleep(0.001)  # Not analyzed twice at the same media time
+                continue
+            last_frame = frame
+        else:
+            frame = camera.read()
         if frame is None:
             continue
+        frame_time = camera.last_frame_time
             
         # Clone frame for drawing
         display_frame = frame.copy()
-        h, w, c = frame.shape
         
-        # 2. Process Each Bench
-        for bench in benches:
-            roi_def = bench['roi']
-            
-            # Extract ROI Image
-            # Handle normalized coords
-            r_x = int(roi_def['x'] * w)
-            r_y = int(roi_def['y'] * h)
-            r_w = int(roi_def['w'] * w)
-            r_h = int(roi_def['h'] * h)
-            
-            # Clamp
-            r_x = max(0, r_x)
-            r_y = max(0, r_y)
-            r_w = min(w - r_x, r_w)
-            r_h = min(h - r_y, r_h)
-            
-            roi_img = frame[r_y:r_y+r_h, r_x:r_x+r_w]
-            
-            if roi_img.size == 0: continue
-            
-        # 3. Detect Pose in ROI
-            detector.find_pose(roi_img, draw=False) 
-            lm_list = detector.find_position(roi_img)
-            
-            # Draw Debug if enabled
-            if show_debug:
-                # Check detector type and draw accordingly
-                if args.detector == 'yolo':
-                    # YOLO: Draw keypoints manually
-                    if lm_list and len(lm_list) > 0:
-                        roi_display = display_frame[r_y:r_y+r_h, r_x:r_x+r_w]
-                        
-                        # Draw skeleton connections (COCO format)
-                        connections = [
-                            (5, 6), (5, 7), (7, 9), (6, 8), (8, 10),  # Arms
-                            (5, 11), (6, 12), (11, 12),  # Torso
-                            (11, 13), (13, 15), (12, 14), (14, 16)  # Legs
-                        ]
-                        
-                        # Draw connections
-                        for conn in connections:
-                            if conn[0] < len(lm_list) and conn[1] < len(lm_list):
-                                p1 = lm_list[conn[0]]
-                                p2 = lm_list[conn[1]]
-                                if p1['visibility'] > 0.3 and p2['visibility'] > 0.3:
-                                    cv2.line(roi_display, 
-                                            (p1['x_px'], p1['y_px']),
-                                            (p2['x_px'], p2['y_px']),
-                                            (0, 255, 255), 2)
-                        
-                        # Draw keypoints
-                        for landmark in lm_list:
-                            if landmark['visibility'] > 0.3:
-                                cv2.circle(roi_display, 
-                                          (landmark['x_px'], landmark['y_px']),
-                                          4, (0, 255, 0), -1)
-                                cv2.circle(roi_display,
-                                          (landmark['x_px'], landmark['y_px']),
-                                          6, (255, 255, 255), 1)
-                        
-                        # Draw Barbell Line
-                        barbell = bench['analyzer']._extract_barbell(lm_list)
-                        if barbell:
-                            p1 = (barbell['left']['x_px'], barbell['left']['y_px'])
-                            p2 = (barbell['right']['x_px'], barbell['right']['y_px'])
-                            cv2.line(roi_display, p1, p2, (255, 0, 255), 4)
-                            cv2.circle(roi_display, p1, 8, (255, 0, 255), -1)
-                            cv2.circle(roi_display, p2, 8, (255, 0, 255), -1)
-                
-                else:  # MediaPipe
-                    if hasattr(detector, 'results') and detector.results and hasattr(detector.results, 'pose_landmarks'):
-                        if detector.results.pose_landmarks:
-                            roi_display = display_frame[r_y:r_y+r_h, r_x:r_x+r_w]
-                            detector.mp_draw.draw_landmarks(roi_display, detector.results.pose_landmarks, 
-                                                           detector.mp_pose.POSE_CONNECTIONS)
-                            
-                            # Draw Barbell Line
-                            barbell = bench['analyzer']._extract_barbell(lm_list)
-                            if barbell:
-                                p1 = (barbell['left']['x_px'], barbell['left']['y_px'])
-                                p2 = (barbell['right']['x_px'], barbell['right']['y_px'])
-                                cv2.line(roi_display, p1, p2, (255, 0, 255), 4)
-                                cv2.circle(roi_display, p1, 8, (255, 0, 255), -1)
-                                cv2.circle(roi_display, p2, 8, (255, 0, 255), -1)
-
-            # 4. Analyze State
-            state, reason = bench['analyzer'].analyze(lm_list)
-            
-            # 5. Log
-            logger.log(bench['id'], state, reason, camera.get_latency())
-            
-            # 6. Animate danger if needed
-            if state == "DANGER":
-                display_frame = danger_animator.animate_danger_pulse(display_frame, roi_def, intensity=0.4)
-            else:
-                danger_animator.reset()
+        # 2-4. Detect pose and analyze state for each bench
+        results = pipeline.process(frame, timestamp)
+        
+        # Degrade / recover on frame arrival -> results latency
+        if shedder.update(time.time() - frame_time, time.time()):
+            shedder.apply(pipeline)
+        cosmetic = shedder.render_enabled
+        
+        for result in results:
+            # 5. Log (fresh detections only)
+            if result['inferred']:
+                logger.log(result['id'], result['state'], result['reason'], camera.get_latency())
             
-            # 7. Visualize
-            # Pass usage info or reason
-            draw_roi(display_frame, roi_def, state, reason if state == "DANGER" else "")
+            display_frame = render_result(display_frame, result, pipeline.get_bench(result['id']),
+                                          danger_animator, connections, show_debug, cosmetic)
         
         # 7. System Stats & Dashboard
         curr_time = time.time()
@@ -291,13 +552,18 @@ def main():
         prev_frame_time = curr_time
         
         # Collect stats for dashboard
+        inference_stats = pipeline.stats()
         stats = {
             "System FPS": f"{int(fps)}",
             "Latency": f"{int(camera.get_latency()*1000)}ms",
-            "Status": "Monitoring" if not any(b['analyzer'].state == "DANGER" for b in benches) else "DANGER DETECTED",
+            "Status": "Monitoring" if not any(r['state'] == "DANGER" for r in results) else "DANGER DETECTED",
             "Debug (d)": "ON" if show_debug else "OFF",
             "Detector": args.detector.upper(),
-            "Speed": f"{playback_speed:.1f}x"
+            "Benches": "{ACTIVE} active / {IDLE} idle / {EMPTY} empty".format(**inference_stats),
+            "Skipped": f"{inference_stats['skip_ratio']:.0%}",
+            "Deferred": f"{inference_stats['deferred']}",
+            "Load": f"L{shedder.level} {shedder.name}",
+            "Speed": f"{playback_speed:g}x"
         }
         
         # Create dashboard panel (LEFT) and combine with video (RIGHT)
@@ -307,31 +573,26 @@ def main():
         combined_frame = cv2.hconcat([dashboard_panel, display_frame])
         
         # Show combined view
-        cv2.imshow("Bench Press Guard", combined_frame)
-        
-        # 9. Keyboard Controls  
-        key = cv2.waitKey(1) & 0xFF
+        with tracer.span("display", "main"):
+            cv2.imshow("Bench Press Guard", combined_frame)
+            
+            # 9. Keyboard Controls  
+            key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             break
         elif key == ord('d'):
             show_debug = not show_debug
             print(f"Debug mode: {'ON' if show_debug else 'OFF'}")
         elif key == 82 or key == ord('+'):  # Up arrow or +
-            playback_speed = min(playback_speed + 0.1, 3.0)
-            print(f"Speed: {playback_speed:.1f}x")
+            playback_speed = camera.speed = step_speed(playback_speed, faster=True)
+            print(f"Speed: {playback_speed:g}x")
         elif key == 84 or key == ord('-'):  # Down arrow or -  
-            playback_speed = max(playback_speed - 0.1, 0.1)
-            print(f"Speed: {playback_speed:.1f}x")
+            playback_speed = camera.speed = step_speed(playback_speed, faster=False)
+            print(f"Speed: {playback_speed:g}x")
         elif key == ord('r'):  # Reset speed
-            playback_speed = 1.0
-            print(f"Speed reset to 1.0x")
-        
-        # Apply playback speed (delay for slow motion)
-        if camera.is_file and playback_speed < 1.0:
-            delay_time = (1.0 / TARGET_FPS) * (1.0 / playback_speed)
-            time.sleep(max(0, delay_time - (time.time() - start_time)))
-    camera.stop()
-    cv2.destroyAllWindows()
+            playback_speed = camera.speed = 1.0
+            print(f"Speed reset to 1x")
+    shutdown([camera], detector, args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,70 @@
+"""
+Analyze a library of recorded session videos in parallel.
+
+    python scripts/batch_analyze.py clips/ --profile "Gym A"
+    python scripts/batch_analyze.py "clips/2026-10-*/*.mp4" --profile "Gym A" --out reports/rules-v2
+
+Every video is analyzed offline (all frames, media timestamps) with the
+bench ROIs and detector settings of a saved camera profile. Per-video
+reports, DANGER event logs and a batch summary are written to --out;
+re-running the same command skips videos that are already done.
+"""
+import argparse
+import os
+import sys
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import BATCH_OUTPUT_DIR, TRACKER_MODE, CAMERA_WIDTH, CAMERA_HEIGHT
+from core.batch import find_videos, run_batch
+from core.profiles import get_profile
+
+
+def frame_size(video):
+    """Frame size of a video (for 'auto' model size calibration)"""
+    cap = cv2.VideoCapture(video)
+    w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return (w, h) if w > 0 and h > 0 else (CAMERA_WIDTH, CAMERA_HEIGHT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch offline analysis of recorded videos')
+    parser.add_argument('inputs', nargs='+', help='Video directories (searched recursively) or glob patterns')
+    parser.add_argument('--profile', type=str, required=True,
+                        help='Camera profile with the bench ROIs and detector settings')
+    parser.add_argument('--out', type=str, default=BATCH_OUTPUT_DIR, help='Output directory')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: sized to cores and free memory)')
+    parser.add_argument('--tracker', type=str, default=TRACKER_MODE, choices=['off', 'lk', 'kalman'])
+    parser.add_argument('--force', action='store_true', help='Re-analyze videos that already have a report')
+    args = parser.parse_args()
+
+    profile = get_profile(args.profile)
+    if profile is None:
+        parser.error(f"Profile '{args.profile}' not found (save one from the GUI or main.py --profile)")
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error(f"No video files found in {args.inputs}")
+
+    # Resolve 'auto' once here, not concurrently in every worker
+    model_size = profile['model_size']
+    if profile['detector'] == 'yolo' and model_size == 'auto':
+        from core.calibration import resolve_model_size
+        model_size = resolve_model_size(profile['rois'], *frame_size(videos[0]), profile['device'])
+
+    print(f"[Batch] {len(videos)} video(s), profile '{profile['name']}' "
+          f"({len(profile['rois'])} bench(es), {profile['detector'].upper()} on {profile['device']})")
+    summary = run_batch(videos, profile['rois'], args.out, profile['detector'], profile['device'],
+                        model_size, args.tracker, workers=args.workers, force=args.force)
+
+    print(f"[Batch] {summary['analyzed']} analyzed, {summary['skipped']} skipped, "
+          f"{summary['failed']} failed -> {os.path.join(args.out, 'summary.csv')}")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
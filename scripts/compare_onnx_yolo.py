@@ -0,0 +1,145 @@
+"""
+Compare the ONNX Runtime backend (fp32 and int8) against the PyTorch YOLO
+path on recorded frames: per-crop latency and keypoint agreement.
+
+    python scripts/compare_onnx_yolo.py --video data/demo.mp4 --frames 200
+
+Accuracy is measured against PyTorch as reference, on the DEFAULT_ROI crop:
+    - detection agreement: both found a person / both found none
+    - mean keypoint error in pixels and as % of the ROI diagonal
+    - PCK@5%: share of keypoints within 5% of the ROI diagonal
+    - wrist error (the barbell line the analyzer relies on)
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH,
+    ONNX_INTRA_THREADS, ONNX_INTER_THREADS, DEFAULT_ROI
+)
+from utils.geometry import roi_to_pixels
+
+VISIBLE = 0.3
+WRISTS = (9, 10)
+
+
+def read_crops(video, count):
+    """DEFAULT_ROI crops of evenly spaced frames"""
+    cap = cv2.VideoCapture(video)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    step = max(1, total // count)
+
+    crops = []
+    for idx in range(0, total, step):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        h, w = frame.shape[:2]
+        x, y, rw, rh = roi_to_pixels(DEFAULT_ROI, w, h)
+        crops.append(frame[y:y+rh, x:x+rw].copy())
+        if len(crops) >= count:
+            break
+    cap.release()
+    return crops
+
+
+def run(detector, crops, warmup=5):
+    """
+    Returns:
+        keypoints: list of (17, 3) arrays (x_px, y_px, visibility) or None
+        latencies: seconds per crop (after warm-up)
+    """
+    for crop in crops[:warmup]:
+        detector.find_pose(crop)
+
+    keypoints, latencies = [], []
+    for crop in crops:
+        start = time.perf_counter()
+        detector.find_pose(crop)
+        lm_list = detector.find_position(crop)
+        latencies.append(time.perf_counter() - start)
+        keypoints.append(np.array([[lm['x_px'], lm['y_px'], lm['visibility']] for lm in lm_list])
+                         if lm_list else None)
+    return keypoints, np.array(latencies)
+
+
+def compare(reference, candidate, diagonal):
+    agree, errors, wrist_errors = 0, [], []
+    for ref, cand in zip(reference, candidate):
+        if (ref is None) == (cand is None):
+            agree += 1
+        if ref is None or cand is None:
+            continue
+        visible = (ref[:, 2] > VISIBLE) & (cand[:, 2] > VISIBLE)
+        dist = np.linalg.norm(ref[:, :2] - cand[:, :2], axis=1)
+        errors.extend(dist[visible])
+        wrist_errors.extend(dist[list(WRISTS)][visible[list(WRISTS)]])
+
+    errors = np.array(errors)
+    return {
+        'agreement': agree / len(reference),
+        'error_px': errors.mean() if len(errors) else float('nan'),
+        'error_pct': 100 * errors.mean() / diagonal if len(errors) else float('nan'),
+        'pck': (errors < 0.05 * diagonal).mean() if len(errors) else float('nan'),
+        'wrist_px': np.mean(wrist_errors) if wrist_errors else float('nan')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ONNX Runtime vs PyTorch YOLO11-Pose')
+    parser.add_argument('--video', required=True, help='Recorded video to sample frames from')
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--model-size', default='m', help='PyTorch reference size (same as the exported model)')
+    parser.add_argument('--device', default='cpu', help='Device for the PyTorch reference')
+    parser.add_argument('--intra-threads', type=int, default=ONNX_INTRA_THREADS)
+    parser.add_argument('--inter-threads', type=int, default=ONNX_INTER_THREADS)
+    args = parser.parse_args()
+
+    crops = read_crops(args.video, args.frames)
+    if not crops:
+        print(f"✗ Could not read frames from {args.video}")
+        sys.exit(1)
+    h, w = crops[0].shape[:2]
+    diagonal = float(np.hypot(w, h))
+    print(f"{len(crops)} crops of {w}x{h} from {args.video}\n")
+
+    from core.detector_yolo import YOLOPoseDetector
+    from core.detector_onnx import YOLOOnnxPoseDetector
+
+    backends = [('pytorch', lambda: YOLOPoseDetector(model_size=args.model_size, device=args.device))]
+    for name, path in (('onnx-fp32', ONNX_MODEL_PATH), ('onnx-int8', ONNX_INT8_MODEL_PATH)):
+        if os.path.exists(path):
+            backends.append((name, lambda path=path: YOLOOnnxPoseDetector(
+                model_path=path, device='cpu',
+                intra_threads=args.intra_threads, inter_threads=args.inter_threads)))
+        else:
+            print(f"[Skip] {name}: {path} not found (scripts/export_yolo_onnx.py)")
+
+    results = {}
+    for name, factory in backends:
+        results[name] = run(factory(), crops)
+
+    reference = results['pytorch'][0]
+    print("\n" + "=" * 92)
+    print(f"{'Backend':<11} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'agree':>7} "
+          f"{'err px':>8} {'err %':>7} {'PCK@5%':>8} {'wrist px':>9}")
+    print("-" * 92)
+    for name, (keypoints, latencies) in results.items():
+        ms = latencies * 1000
+        acc = compare(reference, keypoints, diagonal)
+        print(f"{name:<11} {ms.mean():8.1f} {np.percentile(ms, 50):8.1f} {np.percentile(ms, 95):8.1f} "
+              f"{acc['agreement']:7.1%} {acc['error_px']:8.2f} {acc['error_pct']:7.2f} "
+              f"{acc['pck']:8.1%} {acc['wrist_px']:9.2f}")
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Export YOLO11-Pose to ONNX for --detector onnx, optionally with a static int8
+quantized copy calibrated on frames from a recorded gym video.
+
+    python scripts/export_yolo_onnx.py
+    python scripts/export_yolo_onnx.py --int8 --calib-video data/demo.mp4
+"""
+import argparse
+import os
+import shutil
+import sys
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH, DEFAULT_ROI
+from core.detector_onnx import letterbox, to_tensor
+from utils.geometry import roi_to_pixels
+
+
+def export_fp32(model_size, output, imgsz):
+    from ultralytics import YOLO
+
+    print(f"\nExporting yolo11{model_size}-pose.pt -> {output} (imgsz={imgsz})")
+    exported = YOLO(f'yolo11{model_size}-pose.pt').export(format='onnx', imgsz=imgsz, opset=17,
+                                                          simplify=True, dynamic=False)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    if os.path.abspath(exported) != os.path.abspath(output):
+        shutil.move(exported, output)
+    print(f"✓ FP32 model: {output}")
+
+
+def calibration_tensors(video, count, imgsz):
+    """Letterboxed DEFAULT_ROI crops from evenly spaced video frames (what the detector sees)"""
+    cap = cv2.VideoCapture(video)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    step = max(1, total // count)
+
+    tensors = []
+    for idx in range(0, total, step):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        h, w = frame.shape[:2]
+        x, y, rw, rh = roi_to_pixels(DEFAULT_ROI, w, h)
+        padded, _, _ = letterbox(frame[y:y+rh, x:x+rw], imgsz)
+        tensors.append(to_tensor(padded))
+        if len(tensors) >= count:
+            break
+    cap.release()
+    return tensors[:count]
+
+
+def quantize_int8(fp32_path, output, video, count):
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    model = onnx.load(fp32_path)
+    input_name = model.graph.input[0].name
+    imgsz = model.graph.input[0].type.tensor_type.shape.dim[2].dim_value
+
+    tensors = calibration_tensors(video, count, imgsz)
+    if not tensors:
+        print(f"✗ No calibration frames could be read from {video}")
+        sys.exit(1)
+    print(f"\nCalibrating int8 on {len(tensors)} crops from {video}")
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.items = iter(tensors)
+
+        def get_next(self):
+            tensor = next(self.items, None)
+            return None if tensor is None else {input_name: tensor}
+
+    # The box/keypoint decode at the end of the graph mixes pixel-scale and
+    # 0-1 values; keeping it in float avoids most of the keypoint error.
+    decode_nodes = [node.name for node in model.graph.node[-30:]
+                    if node.op_type in ('Mul', 'Add', 'Sub', 'Div', 'Concat', 'Sigmoid')]
+
+    preprocessed = fp32_path.replace('.onnx', '-prep.onnx')
+    quant_pre_process(fp32_path, preprocessed)
+    quantize_static(preprocessed, output, FrameReader(),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    per_channel=True,
+                    calibrate_method=CalibrationMethod.Percentile,
+                    nodes_to_exclude=decode_nodes)
+    os.remove(preprocessed)
+    print(f"✓ INT8 model: {output} ({len(decode_nodes)} decode nodes kept in float)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLO11-Pose to ONNX (+ static int8)')
+    parser.add_argument('--model-size', default='m', help='n, s, m, l or x (match ONNX_MODEL_PATH)')
+    parser.add_argument('--imgsz', type=int, default=640, help='Square input size')
+    parser.add_argument('--output', default=ONNX_MODEL_PATH)
+    parser.add_argument('--int8', action='store_true', help='Also write a static int8 model')
+    parser.add_argument('--int8-output', default=ONNX_INT8_MODEL_PATH)
+    parser.add_argument('--calib-video', help='Recorded video used for int8 calibration')
+    parser.add_argument('--calib-frames', type=int, default=200, help='Number of calibration crops')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Exporting YOLO11-Pose for ONNX Runtime")
+    print("=" * 60)
+
+    if args.int8 and not args.calib_video:
+        parser.error('--int8 needs --calib-video (static quantization is calibrated on real frames)')
+
+    export_fp32(args.model_size, args.output, args.imgsz)
+    if args.int8:
+        quantize_int8(args.output, args.int8_output, args.calib_video, args.calib_frames)
+
+    print("\nYou can now run:")
+    print("  python main.py --detector onnx --device cpu")
+    print("  python scripts/compare_onnx_yolo.py --video VIDEO")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Batch resume tests (core/batch.py).
+
+Checks which finished reports are reused: the key covers the file, the ROIs
+and the analysis settings. No video is decoded and no worker is started.
+"""
+import json
+import os
+import sys
+import tempfile
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from core.batch import settings_fingerprint, source_info, is_finished
+
+ROIS = [{'x': 0.1, 'y': 0.1, 'w': 0.8, 'h': 0.8}]
+
+
+def _finished(tmp, settings):
+    """A fake video and a report written for it with these settings"""
+    video = os.path.join(tmp, 'clip.mp4')
+    with open(video, 'wb') as f:
+        f.write(b'\0' * 64)
+    report_file = os.path.join(tmp, 'clip.json')
+    with open(report_file, 'w') as f:
+        json.dump({'events': [], 'source': source_info(video, ROIS, settings)}, f)
+    return video, report_file
+
+
+def test_fingerprint_covers_settings_and_thresholds():
+    base = settings_fingerprint('yolo', 'm', 'lk')
+    assert settings_fingerprint('yolo', 'm', 'lk') == base
+    assert settings_fingerprint('onnx', 'm', 'lk') != base
+    assert settings_fingerprint('yolo', 's', 'lk') != base
+    assert settings_fingerprint('yolo', 'm', 'off') != base
+
+    for name in ('DANGER_STALL_TIME', 'TILT_THRESHOLD'):
+        original = getattr(config, name)
+        setattr(config, name, original + 1.0)
+        try:
+            assert settings_fingerprint('yolo', 'm', 'lk') != base
+        finally:
+            setattr(config, name, original)
+    assert settings_fingerprint('yolo', 'm', 'lk') == base
+
+
+def test_report_reused_only_with_same_settings():
+    settings = settings_fingerprint('yolo', 'm', 'lk')
+    with tempfile.TemporaryDirectory() as tmp:
+        video, report_file = _finished(tmp, settings)
+        assert is_finished(report_file, video, ROIS, settings)
+
+        # Another model, or other ROIs: analyzed again
+        assert not is_finished(report_file, video, ROIS, settings_fingerprint('yolo', 's', 'lk'))
+        assert not is_finished(report_file, video, [dict(ROIS[0], w=0.5)], settings)
+
+        # Reports from before the settings were part of the key are not reused
+        with open(report_file) as f:
+            report = json.load(f)
+        del report['source']['settings']
+        with open(report_file, 'w') as f:
+            json.dump(report, f)
+        assert not is_finished(report_file, video, ROIS, settings)
+
+
+if __name__ == "__main__":
+    for test in (test_fingerprint_covers_settings_and_thresholds, test_report_reused_only_with_same_settings):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
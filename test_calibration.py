@@ -0,0 +1,106 @@
+"""
+Model-size calibration tests (core/calibration.py).
+
+time_model() is replaced by a fake cost model (ms per bench for each size),
+so no YOLO weights are loaded and nothing is timed.
+"""
+import os
+import sys
+import tempfile
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import core.calibration as calibration
+from config import TARGET_FPS, CALIBRATION_BUDGET, CALIBRATION_SIZES
+
+BUDGET_MS = 1000.0 * CALIBRATION_BUDGET / TARGET_FPS
+ROI = {'x': 0.1, 'y': 0.1, 'w': 0.3, 'h': 0.6}
+ROI_2 = {'x': 0.5, 'y': 0.1, 'w': 0.3, 'h': 0.6}
+
+
+class FakeTimer:
+    """Stands in for time_model(): each size costs a fixed share of the budget per bench"""
+
+    def __init__(self, share):
+        self.share = share  # size -> fraction of the frame budget per bench
+        self.timed = []
+
+    def __call__(self, model_size, device, sizes, runs=None):
+        self.timed.append(model_size)
+        return self.share[model_size] * len(sizes) * BUDGET_MS / 1000.0
+
+
+def _with_timer(timer, func, *args, **kwargs):
+    original = calibration.time_model
+    calibration.time_model = timer
+    try:
+        return func(*args, **kwargs)
+    finally:
+        calibration.time_model = original
+
+
+def _shares(*values):
+    return dict(zip(CALIBRATION_SIZES, values))
+
+
+def test_calibrate_picks_largest_that_fits():
+    timer = FakeTimer(_shares(0.1, 0.2, 0.4, 0.8, 1.6))
+
+    chosen, frame_ms = _with_timer(timer, calibration.calibrate, [(200, 300)], 'cpu')
+    assert chosen == 'l'
+    assert abs(frame_ms['l'] - 0.8 * BUDGET_MS) < 1e-6
+
+    # Two benches double the frame time: 'm' is the largest that still fits
+    chosen, _ = _with_timer(timer, calibration.calibrate, [(200, 300)] * 2, 'cpu')
+    assert chosen == 'm'
+
+
+def test_calibrate_stops_at_first_size_over_budget():
+    # 's' is too slow; 'm' would fit but is never tried (larger models are only slower)
+    timer = FakeTimer(_shares(0.5, 1.5, 0.5, 0.5, 0.5))
+    chosen, frame_ms = _with_timer(timer, calibration.calibrate, [(200, 300)], 'cpu')
+    assert chosen == 'n'
+    assert timer.timed == ['n', 's'] and list(frame_ms) == ['n', 's']
+
+    # Even the smallest model too slow: it is still the one used
+    timer = FakeTimer(_shares(2.0, 3.0, 4.0, 5.0, 6.0))
+    chosen, _ = _with_timer(timer, calibration.calibrate, [(200, 300)], 'cpu')
+    assert chosen == CALIBRATION_SIZES[0] and timer.timed == ['n']
+
+
+def test_resolve_model_size_uses_cache():
+    timer = FakeTimer(_shares(0.1, 0.2, 0.4, 0.8, 1.6))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'calibration.json')
+
+        def resolve(rois):
+            return _with_timer(timer, calibration.resolve_model_size, rois, 1280, 720, 'cpu',
+                               model_size='auto', cache_path=cache)
+
+        assert resolve([ROI]) == 'l'
+        assert len(timer.timed) == len(CALIBRATION_SIZES)
+
+        # Same ROI sizes (moved bench): cache hit, nothing timed
+        timer.timed.clear()
+        moved = dict(ROI, x=0.2)
+        assert resolve([moved]) == 'l'
+        assert timer.timed == []
+
+        # Another bench count is a new key: calibrated once, then cached too
+        assert resolve([ROI, ROI_2]) == 'm'
+        assert timer.timed == ['n', 's', 'm', 'l']
+        timer.timed.clear()
+        assert resolve([ROI_2, ROI]) == 'm' and resolve([ROI]) == 'l'
+        assert timer.timed == []
+
+    # A fixed size is used as is
+    assert calibration.resolve_model_size([ROI], 1280, 720, 'cpu', model_size='s') == 's'
+
+
+if __name__ == "__main__":
+    for test in (test_calibrate_picks_largest_that_fits, test_calibrate_stops_at_first_size_over_budget,
+                 test_resolve_model_size_uses_cache):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
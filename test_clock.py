@@ -0,0 +1,187 @@
+"""
+Deterministic timing tests (core/clock.py).
+
+The analyzer and pipeline run on a ManualClock instead of time.time(), and
+offline analysis on a MediaClock, so state changes, debounce and reports
+can be checked exactly, with a fake detector and no model weights.
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import TARGET_FPS, STATE_CONSISTENCY_WINDOW, DANGER_STALL_TIME
+from core.analyzer import BenchPressAnalyzer
+from core.clock import ManualClock
+from core.offline import analyze_video
+from core.pipeline import BenchPipeline
+
+ROI = {"x": 0.1, "y": 0.1, "w": 0.8, "h": 0.8}
+
+
+def _landmarks(flipped):
+    """MediaPipe-style landmarks, bar held at the top; flipped wrists read as a 180 degree tilt"""
+    lm_list = [{"x": 0.5, "y": 0.5} for _ in range(33)]
+    lm_list[11] = {"x": 0.4, "y": 0.2}
+    lm_list[12] = {"x": 0.6, "y": 0.2}
+    lm_list[15] = {"x": 0.6 if flipped else 0.4, "y": 0.3}
+    lm_list[16] = {"x": 0.4 if flipped else 0.6, "y": 0.3}
+    return lm_list
+
+
+class BrightnessDetector:
+    """Fake detector: 17 keypoints, wrists uneven when the crop is bright"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def find_pose(self, img, draw=False):
+        self.calls += 1
+        self.img = img
+        return img
+
+    def find_position(self, img):
+        h, w = img.shape[:2]
+        tilted = self.img.mean() > 70
+        points = {i: (0.5, 0.5) for i in range(17)}
+        points[5], points[6] = (0.35, 0.5), (0.65, 0.5)
+        points[9], points[10] = (0.2, 0.3), (0.8, 0.45 if tilted else 0.3)
+        return [{"id": i, "x": x, "y": y, "x_px": int(x * w), "y_px": int(y * h), "visibility": 0.9}
+                for i, (x, y) in points.items()]
+
+
+class PressThenStallDetector:
+    """Fake detector: 33 landmarks, bar pressed for `press_sec` of media time, then held still"""
+
+    def __init__(self, fps, press_sec):
+        self.fps = fps
+        self.press_sec = press_sec
+        self.calls = 0
+
+    def find_pose(self, img, draw=False):
+        self.calls += 1
+        return img
+
+    def find_position(self, img):
+        h, w = img.shape[:2]
+        t = (self.calls - 1) / self.fps  # One call per frame with every_frame
+        bar = 0.5 + (0.1 * math.sin(math.pi * t) if t < self.press_sec else 0.0)
+        points = {i: (0.5, 0.5) for i in range(33)}
+        # Head and ankles span the ROI, so the tight crop stays the full ROI
+        points[0], points[27], points[28] = (0.5, 0.1), (0.1, 0.9), (0.9, 0.9)
+        points[11], points[12] = (0.35, 0.4), (0.65, 0.4)
+        points[15], points[16] = (0.1, bar), (0.9, bar)
+        return [{"id": i, "x": x, "y": y, "x_px": int(x * w), "y_px": int(y * h), "visibility": 0.9}
+                for i, (x, y) in points.items()]
+
+
+def _frame(idx):
+    """Flickering frame (keeps the motion gate open), bright for frames 100-159"""
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    frame[:] = (idx % 2) * 40 + (120 if 100 <= idx < 160 else 20)
+    return frame
+
+
+def test_analyzer_debounce_on_manual_clock():
+    clock = ManualClock()
+    analyzer = BenchPressAnalyzer(fps=TARGET_FPS, clock=clock)
+    step = 1.0 / TARGET_FPS
+
+    # Steady bar for 1 s, flipped bar for 1 s with one steady frame 0.2 s in
+    # (inside STATE_CONSISTENCY_WINDOW), steady again
+    script = [False] * TARGET_FPS + [True] * TARGET_FPS + [False] * TARGET_FPS
+    script[TARGET_FPS + 4] = False
+    states, changes = [], []
+    for flipped in script:
+        states.append(analyzer.analyze(_landmarks(flipped))[0])
+        if len(states) > 1 and states[-1] != states[-2]:
+            changes.append((len(states) - 1, analyzer.last_state_change))
+        clock.advance(step)
+
+    print(f"State changes (frame, time): {changes}")
+    # DANGER is immediate (the last change, at t=0, is older than the window),
+    # the steady blip is suppressed, NORMAL returns with the steady bar
+    assert [frame for frame, _ in changes] == [TARGET_FPS, 2 * TARGET_FPS]
+    assert all(abs(when - frame * step) < 1e-9 for frame, when in changes)
+    assert states[TARGET_FPS + 4] == "DANGER"
+
+    # A change inside the window is suppressed
+    analyzer.update_state("DANGER", "Flip")
+    clock.advance(STATE_CONSISTENCY_WINDOW / 2)
+    assert analyzer.update_state("NORMAL", "")[0] == "DANGER"
+    clock.advance(STATE_CONSISTENCY_WINDOW)
+    assert analyzer.update_state("NORMAL", "")[0] == "NORMAL"
+
+
+def test_pipeline_on_manual_clock():
+    def run():
+        clock = ManualClock(start=1000.0)
+        pipeline = BenchPipeline(BrightnessDetector(), fps=TARGET_FPS, clock=clock)
+        pipeline.set_rois([ROI])
+        trace = []
+        for idx in range(200):
+            result = pipeline.process(_frame(idx))[0]
+            if result['inferred']:
+                # Keypoints are stamped with the pipeline clock, not wall time
+                assert result['keypoints_time'] == clock.time()
+            trace.append((clock.time(), result['state'], result['reason'], result['inferred']))
+            clock.advance(1.0 / TARGET_FPS)
+        return trace
+
+    first, second = run(), run()
+    print(f"{sum(1 for _, state, _, _ in first if state == 'DANGER')} DANGER frames of {len(first)}")
+    assert first == second
+    assert any(state == "DANGER" for _, state, _, _ in first)
+
+
+def test_offline_report_independent_of_rate():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (320, 240))
+        for idx in range(300):
+            writer.write(_frame(idx))
+        writer.release()
+
+        reports = []
+        for rate in (None, None, 50):
+            report = analyze_video(path, [ROI], BrightnessDetector(), progress_sec=0, rate=rate)
+            for key in ('processing_sec', 'speed'):
+                report.pop(key)
+            reports.append(json.dumps(report, sort_keys=True))
+            print(f"rate={rate}: {report['frames']} frames, {len(report['events'])} DANGER event(s)")
+
+    assert reports[0] == reports[1] == reports[2]
+
+
+def test_offline_stall_timing_at_60_fps():
+    fps, press_sec = 60, 2.0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip60.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (160, 120))
+        for idx in range(9 * fps):
+            writer.write(_frame(idx)[:120, :160])
+        writer.release()
+
+        report = analyze_video(path, [ROI], PressThenStallDetector(fps, press_sec), progress_sec=0,
+                               every_frame=True)
+    print(f"events: {report['events']}")
+
+    # Analyzers run at the clip's 60 fps: the stall is reported DANGER_STALL_TIME
+    # after the bar stops, not once a TARGET_FPS-sized buffer has forgotten the press
+    assert [event['reason'] for event in report['events']] == ["Stalled: No motion > 5s"]
+    assert report['events'][0]['start'] >= press_sec + DANGER_STALL_TIME - 0.2
+
+
+if __name__ == "__main__":
+    for test in (test_analyzer_debounce_on_manual_clock, test_pipeline_on_manual_clock,
+                 test_offline_report_independent_of_rate, test_offline_stall_timing_at_60_fps):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,67 @@
+"""
+Tight crop tests (core/crop.py).
+
+Pure geometry on landmark dicts - no detector needed.
+"""
+import os
+import sys
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import TIGHT_CROP_MARGIN
+from core.crop import TightCropper
+
+LANDMARKS = [{"x": 0.4, "y": 0.3, "visibility": 0.9}, {"x": 0.6, "y": 0.7, "visibility": 0.9},
+             {"x": 0.0, "y": 0.0, "visibility": 0.1}]  # Invisible point ignored
+
+
+def test_crop_window_and_mapping():
+    cropper = TightCropper(enabled=True)
+    bench = {}
+    assert cropper.crop_rect(bench, 400, 300) is None  # No person yet: full ROI
+
+    cropper.update(bench, LANDMARKS)
+    assert bench["person_box"] == (0.4, 0.3, 0.6, 0.7)
+
+    x, y, w, h = cropper.crop_rect(bench, 400, 300)
+    # Box height 0.4 + margin on both sides; width grown to the minimum size
+    assert abs(y - (0.3 - 0.4 * TIGHT_CROP_MARGIN) * 300) <= 1
+    assert abs(h - 0.4 * (1 + 2 * TIGHT_CROP_MARGIN) * 300) <= 1
+    assert w >= cropper.min_size * 400
+
+    # Landmarks detected in the window map back to the ROI
+    mapped = cropper.to_roi([{"x": 0.5, "y": 0.5, "x_px": w // 2, "y_px": h // 2}], (x, y, w, h), 400, 300)
+    assert abs(mapped[0]["x"] - (x + w / 2) / 400) < 1e-9
+    assert abs(mapped[0]["y"] - (y + h / 2) / 300) < 1e-9
+    assert mapped[0]["x_px"] == x + w // 2
+
+
+def test_lost_person_uses_full_roi():
+    cropper = TightCropper(enabled=True)
+    bench = {}
+    cropper.update(bench, LANDMARKS)
+    cropper.update(bench, [])
+    assert bench["person_box"] is None
+    assert cropper.crop_rect(bench, 400, 300) is None
+
+
+def test_box_covering_roi_uses_full_roi():
+    cropper = TightCropper(enabled=True)
+    bench = {"person_box": (0.05, 0.05, 0.95, 0.95)}
+    assert cropper.crop_rect(bench, 400, 300) is None
+
+
+def test_disabled_cropper_uses_full_roi():
+    cropper = TightCropper(enabled=False)
+    bench = {}
+    cropper.update(bench, LANDMARKS)
+    assert cropper.crop_rect(bench, 400, 300) is None
+
+
+if __name__ == "__main__":
+    for test in (test_crop_window_and_mapping, test_lost_person_uses_full_roi,
+                 test_box_covering_roi_uses_full_roi, test_disabled_cropper_uses_full_roi):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
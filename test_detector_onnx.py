@@ -0,0 +1,140 @@
+"""
+Tests for the ONNX YOLO11-Pose post-processing (core/detector_onnx.py):
+letterbox, NMS, head decoding and mapping keypoints back to the image.
+
+Works on synthetic model outputs, so no exported model is needed (only the
+onnxruntime package the module imports).
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("onnxruntime")
+
+from core.detector_onnx import (
+    letterbox, nms, decode_pose, YOLOOnnxPoseDetector, NUM_KEYPOINTS, LETTERBOX_COLOR
+)
+
+SIZE = 640
+
+
+def _anchor(box, score, keypoints):
+    """One anchor column of the raw head: cx, cy, w, h, score, (x, y, visibility) * 17"""
+    x1, y1, x2, y2 = box
+    return np.concatenate([[(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1, score],
+                           np.asarray(keypoints, dtype=np.float32).ravel()])
+
+
+def _output(anchors):
+    """(1, 56, anchors) model output"""
+    return np.stack(anchors, axis=1)[None].astype(np.float32)
+
+
+def _keypoints(x0, y0, visibility=0.9):
+    return [(x0 + 10 * k, y0 + 5 * k, visibility) for k in range(NUM_KEYPOINTS)]
+
+
+class FakeSession:
+    """Returns a fixed raw output whatever the input tensor"""
+
+    def __init__(self, output):
+        self.output = output
+        self.inputs = []
+
+    def run(self, names, feeds):
+        self.inputs.append(next(iter(feeds.values())))
+        return [self.output]
+
+
+def _detector(output):
+    detector = YOLOOnnxPoseDetector.__new__(YOLOOnnxPoseDetector)
+    detector.session = FakeSession(output)
+    detector.input_name = 'images'
+    detector.input_size = SIZE
+    detector.conf_threshold = 0.25
+    detector.iou_threshold = 0.45
+    detector._padded = np.empty((SIZE, SIZE, 3), dtype=np.uint8)
+    detector._tensor = np.empty((1, 3, SIZE, SIZE), dtype=np.float32)
+    detector.keypoints = None
+    return detector
+
+
+def test_letterbox_pads_to_square():
+    img = np.full((360, 640, 3), 200, dtype=np.uint8)
+    padded, scale, (pad_x, pad_y) = letterbox(img, SIZE)
+
+    assert padded.shape == (SIZE, SIZE, 3)
+    assert scale == 1.0 and (pad_x, pad_y) == (0, 140)
+    assert (padded[:140] == LETTERBOX_COLOR).all() and (padded[500:] == LETTERBOX_COLOR).all()
+    assert (padded[140:500] == 200).all()
+
+    # Tall crop, scaled up, into a reused buffer
+    out = np.zeros((SIZE, SIZE, 3), dtype=np.uint8)
+    padded, scale, (pad_x, pad_y) = letterbox(np.zeros((320, 160, 3), dtype=np.uint8), SIZE, out)
+    assert padded is out
+    assert scale == 2.0 and (pad_x, pad_y) == (160, 0)
+    assert (out[:, :160] == LETTERBOX_COLOR).all() and (out[:, 160:480] == 0).all()
+
+
+def test_nms_keeps_best_of_overlapping():
+    boxes = np.array([[0, 0, 100, 100], [5, 5, 105, 105], [200, 200, 300, 300], [0, 0, 100, 100]],
+                     dtype=np.float32)
+    scores = np.array([0.8, 0.9, 0.7, 0.3])
+
+    # Box 0 and 3 overlap box 1 (IoU > 0.8) and are dropped; box 2 is apart
+    assert nms(boxes, scores, 0.45) == [1, 2]
+    # A threshold above their overlap keeps everything, still by score
+    assert nms(boxes, scores, 0.99) == [1, 0, 2]
+
+
+def test_decode_pose_filters_and_sorts():
+    output = _output([
+        _anchor((100, 100, 200, 300), 0.6, _keypoints(110, 120)),
+        _anchor((102, 98, 202, 302), 0.9, _keypoints(112, 118)),   # Same person, better score
+        _anchor((400, 100, 500, 300), 0.1, _keypoints(410, 120)),  # Below conf_threshold
+        _anchor((300, 50, 380, 250), 0.5, _keypoints(310, 60, 0.4))
+    ])
+    boxes, scores, keypoints = decode_pose(output, 0.25, 0.45)
+
+    np.testing.assert_allclose(scores, [0.9, 0.5])
+    np.testing.assert_allclose(boxes, [[102, 98, 202, 302], [300, 50, 380, 250]])
+    assert keypoints.shape == (2, NUM_KEYPOINTS, 3)
+    np.testing.assert_allclose(keypoints[0], _keypoints(112, 118), rtol=1e-6)
+    np.testing.assert_allclose(keypoints[1, :, 2], 0.4, rtol=1e-6)
+
+    # Nobody above the threshold
+    boxes, scores, keypoints = decode_pose(output, 0.95, 0.45)
+    assert boxes.shape == (0, 4) and scores.shape == (0,) and keypoints.shape == (0, NUM_KEYPOINTS, 3)
+
+
+def test_infer_undoes_letterbox():
+    # 320x160 crop: scale 2, padded 160 px on the left inside the 640 input
+    img = np.zeros((320, 160, 3), dtype=np.uint8)
+    true_points = [(20 + 5 * k, 40 + 10 * k, 0.9) for k in range(NUM_KEYPOINTS)]
+    model_points = [(160 + 2 * x, 2 * y, v) for x, y, v in true_points]
+    detector = _detector(_output([_anchor((200, 40, 400, 600), 0.8, model_points)]))
+
+    boxes, scores, keypoints = detector.infer(img)
+    np.testing.assert_allclose(boxes, [[20, 20, 120, 300]])
+    np.testing.assert_allclose(keypoints[0], true_points, rtol=1e-6)
+    assert detector.session.inputs[0].shape == (1, 3, SIZE, SIZE)
+
+    # find_position() normalizes to the crop
+    detector.find_pose(img)
+    lm_list = detector.find_position(img)
+    assert len(lm_list) == NUM_KEYPOINTS
+    assert (lm_list[3]['x_px'], lm_list[3]['y_px']) == (35, 70)
+    assert lm_list[3]['x'] == pytest.approx(35 / 160) and lm_list[3]['y'] == pytest.approx(70 / 320)
+
+
+if __name__ == "__main__":
+    for test in (test_letterbox_pads_to_square, test_nms_keeps_best_of_overlapping,
+                 test_decode_pose_filters_and_sorts, test_infer_undoes_letterbox):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
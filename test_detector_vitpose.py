@@ -0,0 +1,101 @@
+"""
+Tests for the ViTPose heatmap decoding (core/detector_vitpose.py).
+
+Synthetic Gaussian heatmaps: the subpixel refinement must recover the peak
+exactly, and integer peaks must decode like the former per-keypoint argmax
+loop. No model is needed (only the onnxruntime package the module imports).
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("onnxruntime")
+
+from core.detector_vitpose import decode_heatmaps, ViTPoseDetector
+
+HEATMAP_H, HEATMAP_W = 64, 48  # 256x192 input, stride 4
+KEYPOINTS = 17
+SIGMA = 2.0
+
+
+def _gaussians(centers, peak=0.9):
+    """(1, K, H, W) heatmaps with one Gaussian per keypoint at float (x, y) centers"""
+    ys, xs = np.mgrid[0:HEATMAP_H, 0:HEATMAP_W].astype(np.float64)
+    maps = [peak * np.exp(-((xs - cx) ** 2 + (ys - cy) ** 2) / (2 * SIGMA ** 2)) for cx, cy in centers]
+    return np.stack(maps)[None].astype(np.float32)
+
+
+def _centers(offset):
+    return [(5 + 2 * k + offset[0], 4 + 3 * k + offset[1]) for k in range(KEYPOINTS)]
+
+
+def _loop_decode(heatmaps, target_w, scale, pad):
+    """The per-keypoint argmax loop decode_heatmaps()/postprocess() replaced"""
+    keypoints = []
+    for i in range(heatmaps.shape[1]):
+        heatmap = heatmaps[0, i]
+        y, x = np.unravel_index(np.argmax(heatmap), heatmap.shape)
+        stride = target_w / heatmap.shape[1]
+        keypoints.append([(x * stride - pad[0]) / scale, (y * stride - pad[1]) / scale, float(heatmap.max())])
+    return np.array(keypoints)
+
+
+def _detector():
+    detector = ViTPoseDetector.__new__(ViTPoseDetector)
+    detector.target_h, detector.target_w = 4 * HEATMAP_H, 4 * HEATMAP_W
+    return detector
+
+
+def test_gaussian_peak_decodes_exactly():
+    centers = _centers((0.3, -0.2))
+    coords, maxvals = decode_heatmaps(_gaussians(centers))
+
+    assert coords.shape == (1, KEYPOINTS, 2) and maxvals.shape == (1, KEYPOINTS)
+    np.testing.assert_allclose(coords[0], centers, atol=1e-3)
+    assert (maxvals > 0.85).all() and (maxvals <= 0.9).all()
+
+
+def test_border_peak_is_not_refined():
+    heatmaps = np.zeros((1, 1, HEATMAP_H, HEATMAP_W), dtype=np.float32)
+    heatmaps[0, 0, 0, 7] = 0.8
+    heatmaps[0, 0, 1, 7] = 0.4
+    coords, maxvals = decode_heatmaps(heatmaps)
+    np.testing.assert_array_equal(coords[0, 0], [7, 0])
+    assert maxvals[0, 0] == pytest.approx(0.8)
+
+
+def test_postprocess_matches_loop_on_integer_peaks():
+    detector = _detector()
+    heatmaps = _gaussians(_centers((0, 0)))
+
+    # 100x200 crop: scale 1.28, 32 px of padding on each side
+    params = [(1.28, (32, 0))]
+    keypoints = detector.postprocess(heatmaps, params)
+    assert keypoints.shape == (1, KEYPOINTS, 3)
+    np.testing.assert_allclose(keypoints[0], _loop_decode(heatmaps, detector.target_w, *params[0]),
+                               rtol=1e-5, atol=1e-3)
+
+
+def test_postprocess_batch_uses_each_crop_params():
+    detector = _detector()
+    centers = [_centers((0.25, 0.5)), _centers((-0.4, 0.1))]
+    heatmaps = np.concatenate([_gaussians(c) for c in centers])
+    params = [(1.28, (32, 0)), (0.5, (0, 40))]
+
+    keypoints = detector.postprocess(heatmaps, params)
+    for crop, (scale, (pad_w, pad_h)) in enumerate(params):
+        expected = [((4 * x - pad_w) / scale, (4 * y - pad_h) / scale) for x, y in centers[crop]]
+        np.testing.assert_allclose(keypoints[crop, :, :2], expected, atol=1e-2)
+
+
+if __name__ == "__main__":
+    for test in (test_gaussian_peak_decodes_exactly, test_border_peak_is_not_refined,
+                 test_postprocess_matches_loop_on_integer_peaks, test_postprocess_batch_uses_each_crop_params):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
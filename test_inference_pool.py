@@ -0,0 +1,153 @@
+"""
+Tests for the multiprocess inference pool (core/inference_pool.py): frame
+publishing, worker supervision and the in-process fallback.
+
+Spawns real worker processes with a small fake detector (imported from this
+file by the workers), so no model weights are needed.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.inference_pool import InferencePool
+
+DETECTOR = 'test_inference_pool:HangingDetector'
+GOOD = (0, 0, 100, 100)
+HANG = (100, 0, 100, 100)  # Bright crop: the detector never returns
+
+
+class HangingDetector:
+    """Fake detector: 17 keypoints per crop, hangs forever on a bright crop"""
+
+    def find_pose(self, img, draw=False):
+        if img.mean() > 128:
+            time.sleep(3600)
+        return img
+
+    def find_position(self, img):
+        return [{"id": i, "x_px": 50, "y_px": 50, "x": 0.5, "y": 0.5, "visibility": 0.9}
+                for i in range(17)]
+
+
+class FlakyDetector(HangingDetector):
+    """Fake detector that cannot be loaded while `flag` exists"""
+
+    def __init__(self, flag):
+        if os.path.exists(flag):
+            raise RuntimeError("model file missing")
+
+
+def _frame():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    frame[:, 100:] = 255
+    return frame
+
+
+def _wait_ready(pool, workers, timeout=30.0):
+    start = time.monotonic()
+    while pool.ready != set(range(workers)):
+        assert time.monotonic() - start < timeout, "worker was not restarted"
+        pool.detect_batch(_frame(), [GOOD])
+        time.sleep(0.1)
+
+
+def test_hung_worker_is_replaced():
+    pool = InferencePool(2, detector=DETECTOR, timeout=1.0).start()
+    try:
+        pids = [p.pid for p in pool.processes]
+        assert all(len(lm) == 17 for lm in pool.detect_batch(_frame(), [GOOD, GOOD]))
+
+        # Worker 1 gets the bright crop and hangs: the frame returns at the deadline
+        start = time.monotonic()
+        out = pool.detect_batch(_frame(), [GOOD, HANG])
+        elapsed = time.monotonic() - start
+        print(f"Hung frame returned in {elapsed:.2f}s")
+        assert len(out[0]) == 17 and out[1] == []
+        assert elapsed < 3.0
+
+        # Replaced by a new process; meanwhile shards go to worker 0 only
+        assert pool.processes[1].pid != pids[1]
+        assert pool.processes[0].pid == pids[0]
+        _wait_ready(pool, 2)
+        assert all(len(lm) == 17 for lm in pool.detect_batch(_frame(), [GOOD, GOOD, GOOD]))
+    finally:
+        pool.close()
+
+
+def test_dead_worker_is_replaced():
+    pool = InferencePool(1, detector=DETECTOR, timeout=1.0).start()
+    try:
+        pid = pool.processes[0].pid
+        pool.processes[0].kill()
+        pool.processes[0].join()
+
+        # The closed pipe gives the crash away at once, without waiting for the deadline
+        start = time.monotonic()
+        assert pool.detect_batch(_frame(), [GOOD]) == [[]]
+        assert time.monotonic() - start < 0.5
+        assert pool.processes[0].pid != pid
+        _wait_ready(pool, 1)
+        assert len(pool.detect_batch(_frame(), [GOOD])[0]) == 17
+    finally:
+        pool.close()
+
+
+def test_frame_copied_once_per_frame():
+    pool = InferencePool(2, detector=DETECTOR, timeout=5.0).start()
+    try:
+        view = pool.publish(_frame())
+        assert pool.ring.counter == 1
+
+        # Tight crops, then the full-ROI retry: both read the published copy
+        assert len(pool.detect_batch(view, [GOOD, GOOD])[1]) == 17
+        assert len(pool.detect_batch(view, [GOOD])[0]) == 17
+        assert pool.ring.counter == 1
+
+        # An array that is not a ring slot is still copied in
+        assert len(pool.detect_batch(_frame(), [GOOD])[0]) == 17
+        assert pool.ring.counter == 2
+    finally:
+        pool.close()
+
+
+def test_all_workers_failed_detects_in_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        flag = os.path.join(tmp, "broken")
+        pool = InferencePool(1, detector='test_inference_pool:FlakyDetector',
+                             detector_kwargs={'flag': flag}, timeout=1.0).start()
+        try:
+            # The model disappears; the crashed worker cannot be restarted
+            open(flag, 'w').close()
+            pool.processes[0].kill()
+            # Once that is noticed, loading in-process fails too: an error
+            # instead of empty results forever
+            start, error = time.monotonic(), None
+            while error is None:
+                assert time.monotonic() - start < 30.0, "restart failure not noticed"
+                try:
+                    assert pool.detect_batch(_frame(), [GOOD]) == [[]]
+                except RuntimeError as e:
+                    error = e
+                time.sleep(0.1)
+            assert "model file missing" in str(error)
+            assert pool.failed == {0}
+
+            os.remove(flag)
+            assert len(pool.detect_batch(_frame(), [GOOD])[0]) == 17
+            assert pool.local is not None
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    for test in (test_hung_worker_is_replaced, test_dead_worker_is_replaced,
+                 test_frame_copied_once_per_frame, test_all_workers_failed_detects_in_process):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
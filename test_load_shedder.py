@@ -0,0 +1,150 @@
+"""
+Load shedding tests (core/load_shedder.py).
+
+Feeds per-frame latencies on a ManualClock and checks the level changes,
+the hold/hysteresis behaviour and the hand-off of the smaller model loaded
+in the background, with a fake YOLO detector - no weights needed.
+"""
+import os
+import sys
+import threading
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import TARGET_FPS, SHED_HOLD_SEC, SHED_IMGSZ, SHED_NORMAL_INTERVAL
+from core.clock import ManualClock
+from core.load_shedder import LoadShedder, LEVELS, SYSTEM_BENCH_ID
+from core.pipeline import BenchPipeline
+
+LIMIT = 0.5
+HIGH = 2.0 * LIMIT  # Well over the limit
+OK = 0.75 * LIMIT  # Between the step-up and step-down thresholds
+LOW = 0.1 * LIMIT
+
+
+class FakeYOLO:
+    """model_size/imgsz like YOLOPoseDetector; shedder-built copies load only once `loaded` is set"""
+
+    DEFAULT_IMGSZ = 640
+    loaded = threading.Event()
+
+    def __init__(self, model_size, device, block=True):
+        if block:
+            self.loaded.wait(10.0)
+        self.model_size = model_size
+        self.device = device
+        self.imgsz = self.DEFAULT_IMGSZ
+
+
+class FakeLogger:
+    def __init__(self):
+        self.rows = []
+
+    def log(self, bench_id, state, reason, latency_sec):
+        self.rows.append((bench_id, state))
+
+
+def _feed(shedder, clock, latency, seconds, pipeline=None):
+    """One latency sample per frame for `seconds`; returns the level after each frame"""
+    levels = []
+    for _ in range(int(round(seconds * TARGET_FPS))):
+        clock.advance(1.0 / TARGET_FPS)
+        if shedder.update(latency, clock.time()) and pipeline is not None:
+            shedder.apply(pipeline)
+        levels.append(shedder.level)
+    return levels
+
+
+def test_steps_down_one_level_per_hold():
+    logger = FakeLogger()
+    shedder, clock = LoadShedder(enabled=True, limit=LIMIT, logger=logger), ManualClock()
+
+    levels = _feed(shedder, clock, HIGH, 2.5 * SHED_HOLD_SEC)
+    # First step one hold period after going over the limit, the next a full hold later
+    assert levels[int(SHED_HOLD_SEC * TARGET_FPS) - 2] == 0
+    assert levels[int(SHED_HOLD_SEC * TARGET_FPS)] == 1
+    assert levels[-1] == 2 and shedder.name == 'imgsz'
+    assert all(b - a in (0, 1) for a, b in zip(levels, levels[1:]))
+    assert logger.rows == [(SYSTEM_BENCH_ID, 'DEGRADED')] * 2
+
+    # Never past the last level
+    _feed(shedder, clock, HIGH, len(LEVELS) * 2 * SHED_HOLD_SEC)
+    assert shedder.name == LEVELS[-1]
+
+
+def test_steps_back_up_when_latency_recovers():
+    logger = FakeLogger()
+    shedder, clock = LoadShedder(enabled=True, limit=LIMIT, logger=logger), ManualClock()
+    _feed(shedder, clock, HIGH, 2.5 * SHED_HOLD_SEC)
+    assert shedder.level == 2
+
+    levels = _feed(shedder, clock, LOW, 3 * SHED_HOLD_SEC)
+    assert levels[-1] == 0
+    assert all(a - b in (0, 1) for a, b in zip(levels, levels[1:]))
+    # The two steps up are a hold period apart
+    first, second = levels.index(1), levels.index(0)
+    assert second - first >= int(SHED_HOLD_SEC * TARGET_FPS)
+    assert logger.rows[-2:] == [(SYSTEM_BENCH_ID, 'DEGRADED'), (SYSTEM_BENCH_ID, 'NORMAL')]
+
+
+def test_hold_ignores_short_spikes_and_dead_band():
+    shedder, clock = LoadShedder(enabled=True, limit=LIMIT), ManualClock()
+
+    # Spikes shorter than the hold period never step down
+    for _ in range(5):
+        assert _feed(shedder, clock, HIGH, SHED_HOLD_SEC / 4)[-1] == 0
+        _feed(shedder, clock, LOW, SHED_HOLD_SEC / 2)
+    assert shedder.level == 0
+
+    # Between the thresholds the level is kept in both directions
+    _feed(shedder, clock, HIGH, 1.5 * SHED_HOLD_SEC)
+    assert shedder.level == 1
+    assert set(_feed(shedder, clock, OK, 5 * SHED_HOLD_SEC)) == {1}
+
+    # Disabled: never leaves 'full'
+    shedder = LoadShedder(enabled=False, limit=LIMIT)
+    assert set(_feed(shedder, clock, HIGH, 5 * SHED_HOLD_SEC)) == {0}
+
+
+def test_smaller_model_handed_off_when_ready():
+    FakeYOLO.loaded.clear()
+    full = FakeYOLO('m', 'cpu', block=False)
+    pipeline = BenchPipeline(full)
+    shedder, clock = LoadShedder(enabled=True, limit=LIMIT), ManualClock()
+    try:
+        # 'cadence', then 'imgsz': the smaller model starts loading in the background
+        _feed(shedder, clock, HIGH, 2.5 * SHED_HOLD_SEC, pipeline)
+        assert shedder.name == 'imgsz'
+        assert pipeline.scheduler.normal_interval == SHED_NORMAL_INTERVAL
+        assert pipeline.detector is full and full.imgsz == SHED_IMGSZ
+
+        # 'model' before the load finished: the current model keeps serving
+        _feed(shedder, clock, HIGH, SHED_HOLD_SEC, pipeline)
+        assert shedder.name == 'model' and pipeline.detector is full
+
+        # Loaded: the next update() asks for apply() without a level change
+        FakeYOLO.loaded.set()
+        shedder._small_loader.join(10.0)
+        clock.advance(1.0 / TARGET_FPS)
+        assert shedder.update(OK, clock.time())
+        assert shedder.name == 'model'
+        shedder.apply(pipeline)
+        assert pipeline.detector.model_size == 's' and pipeline.detector.imgsz == SHED_IMGSZ
+        assert not shedder.update(OK, clock.time())
+
+        # Recovering goes back to the full model at full size
+        _feed(shedder, clock, LOW, 4 * SHED_HOLD_SEC, pipeline)
+        assert shedder.level == 0
+        assert pipeline.detector is full and full.imgsz == FakeYOLO.DEFAULT_IMGSZ
+        assert pipeline.scheduler.normal_interval == 0.0
+    finally:
+        FakeYOLO.loaded.set()
+
+
+if __name__ == "__main__":
+    for test in (test_steps_down_one_level_per_hold, test_steps_back_up_when_latency_recovers,
+                 test_hold_ignores_short_spikes_and_dead_band, test_smaller_model_handed_off_when_ready):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
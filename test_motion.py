@@ -0,0 +1,90 @@
+"""
+Motion gate tests (core/motion.py).
+
+Synthetic ROI crops - no detector needed.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import MOTION_MAX_REUSE_SEC, CADENCE_EMPTY_INTERVAL, CADENCE_EMPTY_MISSES
+from core.analyzer import BenchPressAnalyzer
+from core.motion import MotionGate
+from core.scheduler import InferenceScheduler
+
+
+def _roi(value=80):
+    return np.full((240, 320, 3), value, dtype=np.uint8)
+
+
+def test_static_roi_reuses_keypoints():
+    gate = MotionGate(enabled=True)
+    bench = {}
+
+    # First frame always moves (no reference yet)
+    assert gate.check(bench, _roi())
+    gate.mark_inferred(bench)
+    bench["lm_time"] = 0.0
+
+    # Same picture: reusable until MOTION_MAX_REUSE_SEC
+    assert not gate.check(bench, _roi())
+    assert gate.can_reuse(bench, MOTION_MAX_REUSE_SEC / 2)
+    assert not gate.can_reuse(bench, MOTION_MAX_REUSE_SEC + 0.1)
+
+    # A lifter's arm moving through the ROI
+    moved = _roi()
+    moved[100:140, 150:200] = 200
+    assert gate.check(bench, moved)
+    assert not gate.can_reuse(bench, 0.1)
+
+    gate.mark_skipped()
+    assert gate.skip_ratio() == 0.5
+
+
+def test_slow_drift_accumulates():
+    gate = MotionGate(enabled=True)
+    bench = {"lm_time": 0.0}
+    gate.check(bench, _roi())
+    gate.mark_inferred(bench)
+
+    # Each frame differs by a few gray levels only, but the reference stays put
+    moved = False
+    for step in range(1, 10):
+        frame = _roi()
+        frame[:, :80] = 80 + 3 * step
+        moved = gate.check(bench, frame)
+        if moved:
+            break
+    assert moved and step > 1
+
+
+def test_motion_promotes_low_rate_bench():
+    scheduler = InferenceScheduler(enabled=True)
+    bench = {"id": 1, "state": "NORMAL", "analyzer": BenchPressAnalyzer()}
+    scheduler.init_bench(bench)
+    for _ in range(CADENCE_EMPTY_MISSES):
+        scheduler.update(bench, 0.0, [])
+    assert not scheduler.is_due(bench, CADENCE_EMPTY_INTERVAL / 2)
+
+    scheduler.promote(bench)
+    assert scheduler.is_due(bench, 0.1)
+
+
+def test_disabled_gate_never_reuses():
+    gate = MotionGate(enabled=False)
+    bench = {"lm_time": 0.0}
+    assert not gate.check(bench, _roi())
+    gate.mark_inferred(bench)
+    assert not gate.can_reuse(bench, 0.1)
+
+
+if __name__ == "__main__":
+    for test in (test_static_roi_reuses_keypoints, test_slow_drift_accumulates,
+                 test_motion_promotes_low_rate_bench, test_disabled_gate_never_reuses):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,111 @@
+"""
+Camera profile tests (core/profiles.py).
+
+Every test works on a profiles file in a temporary directory.
+"""
+import json
+import os
+import sys
+import tempfile
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import BENCH_COLORS, DETECTOR_TYPE, GPU_DEVICE, YOLO_MODEL_SIZE
+from core.profiles import (
+    make_profile, save_profile, get_profile, profile_names, set_last, default_name, detector_settings
+)
+
+ROIS = [{'x': 0.1, 'y': 0.2, 'w': 0.3, 'h': 0.4}, {'x': 0.5, 'y': 0.2, 'w': 0.4, 'h': 0.6}]
+COLORS = [(255, 0, 0), (0, 255, 0)]
+
+
+def _path(tmp):
+    return os.path.join(tmp, 'sub', 'profiles.json')  # Directory created on first save
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _path(tmp)
+        profile = make_profile('gym.mp4', ROIS, COLORS, detector='onnx', device='cpu', model_size='s')
+        save_profile('Gym', profile, path=path)
+
+        loaded = get_profile('Gym', path=path)
+        assert loaded['name'] == 'Gym' and loaded['source'] == 'gym.mp4'
+        assert loaded['rois'] == ROIS
+        assert loaded['colors'] == COLORS  # Tuples again after JSON lists
+        assert detector_settings(loaded) == {'detector': 'onnx', 'device': 'cpu', 'model_size': 's'}
+        assert 'saved' in loaded
+
+        # Camera sources stay ints; saving under the same name overwrites
+        save_profile('Gym', make_profile(0, ROIS[:1]), path=path)
+        loaded = get_profile('Gym', path=path)
+        assert loaded['source'] == 0 and len(loaded['rois']) == 1
+        assert profile_names(path=path) == ['Gym']
+
+
+def test_invalid_rois_filtered():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _path(tmp)
+        _write(path, {'last': 'A', 'profiles': {
+            'A': {'source': 0, 'rois': ROIS + [
+                {'x': 0.1, 'y': 0.1, 'w': 0.0, 'h': 0.5},     # Empty
+                {'x': 1.2, 'y': 0.1, 'w': 0.2, 'h': 0.5},     # Off the frame
+                {'x': 0.1, 'y': 0.1, 'w': 0.2},               # Missing key
+                {'x': 'left', 'y': 0.1, 'w': 0.2, 'h': 0.5}   # Not a number
+            ]},
+            'B': {'source': 0, 'rois': [{'x': 0.1, 'y': 0.1, 'w': 0.0, 'h': 0.5}]},
+            'C': {'source': None, 'rois': ROIS}
+        }})
+
+        profile = get_profile('A', path=path)
+        assert profile['rois'] == ROIS
+        # Older profiles without detector settings or colors get the defaults
+        assert detector_settings(profile) == {
+            'detector': DETECTOR_TYPE, 'device': GPU_DEVICE, 'model_size': YOLO_MODEL_SIZE}
+        assert profile['colors'] == [tuple(color) for color in BENCH_COLORS]
+
+        # Nothing usable left, or no source: not resumable
+        assert get_profile('B', path=path) is None
+        assert get_profile('C', path=path) is None
+
+
+def test_last_profile():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _path(tmp)
+        assert get_profile(path=path) is None  # No file yet
+        assert profile_names(path=path) == []
+
+        save_profile('Camera 1', make_profile(1, ROIS), path=path)
+        save_profile('Camera 0', make_profile(0, ROIS), path=path)
+        assert profile_names(path=path) == ['Camera 0', 'Camera 1']
+        assert get_profile(path=path)['name'] == 'Camera 0'  # Last saved
+
+        set_last('Camera 1', path=path)
+        assert get_profile(path=path)['name'] == 'Camera 1'
+        set_last('Missing', path=path)  # Unknown names are ignored
+        assert get_profile(path=path)['name'] == 'Camera 1'
+        assert get_profile('Missing', path=path) is None
+
+        # A corrupt file reads as empty instead of failing startup
+        with open(path, 'w') as f:
+            f.write('{not json')
+        assert get_profile(path=path) is None and profile_names(path=path) == []
+
+
+def test_default_name():
+    assert default_name(0) == 'Camera 0'
+    assert default_name(os.path.join('videos', 'gym.mp4')) == 'gym.mp4'
+
+
+if __name__ == "__main__":
+    for test in (test_round_trip, test_invalid_rois_filtered, test_last_profile, test_default_name):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,160 @@
+"""
+Localhost tests for the remote inference protocol (core/remote.py).
+
+Runs a PoseServer and RemotePoseDetector in one process with a small fake
+detector, so no model weights or GPU are needed.
+"""
+import time
+import sys
+import os
+
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.remote import PoseServer, RemotePoseDetector
+
+
+class MarkerDetector:
+    """Fake detector: 17 keypoints at the brightest pixel of the image"""
+
+    def __init__(self, delay=0.0, visibility=0.9):
+        self.delay = delay
+        self.visibility = visibility
+        self.calls = 0
+
+    def find_pose(self, img, draw=False):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        self.img = img
+        return img
+
+    def find_position(self, img):
+        gray = self.img.max(axis=2)
+        if gray.max() < 128:
+            return []
+        y, x = np.unravel_index(np.argmax(gray), gray.shape)
+        h, w = gray.shape
+        return [{"id": i, "x_px": int(x), "y_px": int(y), "x": x / w, "y": y / h,
+                 "visibility": self.visibility} for i in range(17)]
+
+
+def _frame_with_markers(points, shape=(360, 640)):
+    frame = np.zeros(shape + (3,), dtype=np.uint8)
+    for x, y in points:
+        frame[y-2:y+3, x-2:x+3] = 255
+    return frame
+
+
+def _start_server(detector, kind='yolo'):
+    return PoseServer(detector, host='127.0.0.1', port=0, kind=kind).start()
+
+
+def test_roundtrip_raw_and_jpeg():
+    server = _start_server(MarkerDetector())
+    frame = _frame_with_markers([(100, 120)])
+    try:
+        for encoding in ('raw', 'jpeg'):
+            client = RemotePoseDetector('127.0.0.1', server.port, deadline=2.0, encoding=encoding)
+            client.find_pose(frame)
+            lm_list = client.find_position(frame)
+            client.close()
+
+            print(f"{encoding}: {len(lm_list)} keypoints at ({lm_list[0]['x_px']}, {lm_list[0]['y_px']})")
+            assert len(lm_list) == 17
+            assert abs(lm_list[0]['x_px'] - 100) <= 2 and abs(lm_list[0]['y_px'] - 120) <= 2
+            assert client.remote == 1 and client.fallbacks == 0
+    finally:
+        server.stop()
+
+
+def test_pipelined_batch():
+    server = _start_server(MarkerDetector())
+    points = [(50 + 100 * i, 100 + 20 * i) for i in range(6)]
+    frame = _frame_with_markers(points)
+    rects = [(x - 40, y - 40, 80, 80) for x, y in points]
+    try:
+        client = RemotePoseDetector('127.0.0.1', server.port, deadline=2.0, max_inflight=2, encoding='raw')
+        lm_lists = client.detect_batch(frame, rects)
+        client.close()
+
+        print(f"Batch: {client.remote} remote, {client.fallbacks} fallback")
+        assert client.remote == len(rects) and client.fallbacks == 0
+        for lm_list in lm_lists:
+            assert abs(lm_list[0]['x_px'] - 40) <= 2 and abs(lm_list[0]['y_px'] - 40) <= 2
+    finally:
+        server.stop()
+
+
+def test_deadline_fallback():
+    # Server needs 300 ms per crop, client allows 100 ms
+    server = _start_server(MarkerDetector(delay=0.3, visibility=0.9))
+    local = MarkerDetector(visibility=0.5)
+    frame = _frame_with_markers([(200, 200)])
+    try:
+        client = RemotePoseDetector('127.0.0.1', server.port, deadline=0.1, fallback=local, encoding='raw')
+        start = time.time()
+        lm_lists = client.detect_batch(frame, [(0, 0, 640, 360)] * 3)
+        elapsed = time.time() - start
+        client.close()
+
+        print(f"Deadline: {client.fallbacks} fallback in {elapsed * 1000:.0f} ms, "
+              f"local calls {local.calls}")
+        assert client.fallbacks == 3 and client.remote == 0
+        assert all(lm_list[0]['visibility'] == 0.5 for lm_list in lm_lists)  # From the local detector
+        assert elapsed < 0.3  # Did not wait for the slow server
+
+        # Queued requests that expired are skipped by the server
+        time.sleep(0.8)
+        print(f"Server: {server.served} served, {server.expired} expired")
+        assert server.expired >= 1
+    finally:
+        server.stop()
+
+
+def test_server_down_fallback():
+    local = MarkerDetector(visibility=0.5)
+    frame = _frame_with_markers([(200, 200)])
+
+    # Lazy fallback factory: only built once the server is unreachable
+    client = RemotePoseDetector('127.0.0.1', 1, deadline=0.1, fallback=lambda: local)
+    client.find_pose(frame)
+    lm_list = client.find_position(frame)
+    client.close()
+
+    print(f"Server down: {len(lm_list)} keypoints from local fallback")
+    assert len(lm_list) == 17 and client.fallbacks == 1
+
+
+def test_layout_handshake():
+    # MediaPipe server (33 keypoints) vs a client whose fallback is YOLO (17)
+    server = _start_server(MarkerDetector(), kind='mediapipe')
+    local = MarkerDetector(visibility=0.5)
+    frame = _frame_with_markers([(200, 200)])
+    try:
+        client = RemotePoseDetector('127.0.0.1', server.port, deadline=0.5, fallback=local, kind='yolo')
+        lm_lists = client.detect_batch(frame, [(0, 0, 640, 360)] * 2)
+        client.close()
+
+        print(f"Mismatch: rejected={client.rejected}, {client.fallbacks} fallback")
+        assert client.rejected and client.fallbacks == 2 and client.remote == 0
+        assert all(lm_list[0]['visibility'] == 0.5 for lm_list in lm_lists)
+        assert server.served == 0
+
+        # A client with the same layout is served
+        client = RemotePoseDetector('127.0.0.1', server.port, deadline=0.5, fallback=local, kind='mediapipe')
+        client.detect_batch(frame, [(0, 0, 640, 360)])
+        client.close()
+        assert client.remote == 1 and not client.rejected
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    for test in (test_roundtrip_raw_and_jpeg, test_pipelined_batch,
+                 test_deadline_fallback, test_server_down_fallback, test_layout_handshake):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,141 @@
+"""
+Adaptive inference cadence and danger-priority scheduling tests (core/scheduler.py).
+
+Scheduling decisions on fake benches - no detector or analyzer history needed.
+"""
+import os
+import sys
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CADENCE_EMPTY_INTERVAL, CADENCE_EMPTY_MISSES, TARGET_FPS, PRIORITY_BUDGET, PRIORITY_STARVATION_SEC
+from core.scheduler import InferenceScheduler, EMPTY, ACTIVE
+
+
+class FakeAnalyzer:
+    def __init__(self, near=False, tilting=False, state="NORMAL"):
+        self.near = near
+        self.tilting = tilting
+        self.state = state
+
+    def near_danger(self):
+        return self.near
+
+    def tilt_rising(self):
+        return self.tilting
+
+
+def _bench(bench_id, state="NORMAL", **analyzer):
+    return {"id": bench_id, "state": state, "analyzer": FakeAnalyzer(**analyzer)}
+
+
+def test_new_bench_starts_active():
+    scheduler = InferenceScheduler(enabled=True)
+    bench = _bench(1)
+    scheduler.init_bench(bench)
+    assert bench["activity"] == ACTIVE
+    assert scheduler.is_due(bench, 0.0)
+
+
+def test_empty_bench_inferred_at_low_rate():
+    scheduler = InferenceScheduler(enabled=True)
+    bench = _bench(1)
+    scheduler.init_bench(bench)
+
+    for _ in range(CADENCE_EMPTY_MISSES):
+        scheduler.update(bench, 0.0, [])
+    assert bench["activity"] == EMPTY
+    assert not scheduler.is_due(bench, CADENCE_EMPTY_INTERVAL / 2)
+    assert scheduler.is_due(bench, CADENCE_EMPTY_INTERVAL)
+    assert scheduler.activity_counts([bench]) == {EMPTY: 1, "IDLE": 0, ACTIVE: 0}
+
+
+def test_single_miss_keeps_full_rate():
+    scheduler = InferenceScheduler(enabled=True)
+    bench = _bench(1)
+    scheduler.init_bench(bench)
+
+    for _ in range(CADENCE_EMPTY_MISSES - 1):
+        scheduler.update(bench, 0.0, [])
+        assert bench["activity"] == ACTIVE
+        assert scheduler.is_due(bench, 0.05)
+
+
+def test_danger_bench_never_empty():
+    scheduler = InferenceScheduler(enabled=True)
+    bench = _bench(1, state="DANGER", near=True)
+    bench["analyzer"].state = "DANGER"
+    scheduler.init_bench(bench)
+
+    # Lifter pinned under the bar on a still scene: pose keeps missing
+    for _ in range(3 * CADENCE_EMPTY_MISSES):
+        scheduler.update(bench, 0.0, [])
+    assert bench["activity"] == ACTIVE
+    assert scheduler.is_due(bench, 0.05)
+
+
+def test_cadence_disabled_always_due():
+    scheduler = InferenceScheduler(enabled=False)
+    bench = _bench(1)
+    scheduler.init_bench(bench)
+    scheduler.update(bench, 0.0, [])
+    assert scheduler.is_due(bench, 0.01)
+
+
+def test_priority_serves_urgent_first_and_never_starves():
+    scheduler = InferenceScheduler(enabled=True, priority=True)
+    # Measured cost: two crops fit in the per-frame budget
+    scheduler.record_inference(PRIORITY_BUDGET / TARGET_FPS, 2)
+    assert scheduler.slots() == 2
+
+    calm = [_bench(idx) for idx in range(1, 4)]
+    danger = _bench(4, state="DANGER")
+    tilting = _bench(5, tilting=True)
+
+    serve, defer = scheduler.prioritize(calm + [danger, tilting], 0.0)
+    assert serve == [danger, tilting]  # Urgent benches take the slots
+    assert defer == calm
+    assert scheduler.deferred == 3
+
+    # Deferred benches keep their waiting time and are served once starving
+    serve, defer = scheduler.prioritize(calm, PRIORITY_STARVATION_SEC)
+    assert serve == calm and defer == []
+
+
+def test_urgent_benches_exceed_budget():
+    scheduler = InferenceScheduler(enabled=True, priority=True)
+    scheduler.record_inference(PRIORITY_BUDGET / TARGET_FPS, 1)
+    assert scheduler.slots() == 1
+
+    urgent = [_bench(1, state="DANGER"), _bench(2, near=True)]
+    calm = _bench(3)
+    serve, defer = scheduler.prioritize(urgent + [calm], 0.0)
+    assert serve == urgent and defer == [calm]
+
+
+def test_unknown_cost_serves_everything():
+    scheduler = InferenceScheduler(enabled=True, priority=True)
+    benches = [_bench(idx) for idx in range(6)]
+    assert scheduler.slots() is None
+    serve, defer = scheduler.prioritize(benches, 0.0)
+    assert serve == benches and defer == []
+
+
+def test_priority_disabled_serves_everything():
+    scheduler = InferenceScheduler(enabled=True, priority=False)
+    scheduler.record_inference(1.0, 1)
+    benches = [_bench(idx) for idx in range(6)]
+    serve, defer = scheduler.prioritize(benches, 0.0)
+    assert serve == benches and defer == []
+
+
+if __name__ == "__main__":
+    for test in (test_new_bench_starts_active, test_empty_bench_inferred_at_low_rate,
+                 test_single_miss_keeps_full_rate, test_danger_bench_never_empty,
+                 test_cadence_disabled_always_due, test_priority_serves_urgent_first_and_never_starves,
+                 test_urgent_benches_exceed_budget, test_unknown_cost_serves_everything,
+                 test_priority_disabled_serves_everything):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
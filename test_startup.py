@@ -0,0 +1,89 @@
+"""
+Cold-start tests.
+
+Kiosk PCs reboot nightly, so the GUI window must appear before the pose
+model stack (torch, ultralytics, onnxruntime, mediapipe) is imported. These
+tests run the real entry points under `python -X importtime` in a fresh
+interpreter:
+
+    - the configuration and pipeline modules stay free of heavy imports
+    - gui_app.py paints its window (offscreen) within STARTUP_PAINT_BUDGET_SEC
+      and before any heavy module is loaded
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Setup path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT)
+
+from config import STARTUP_PAINT_BUDGET_SEC
+
+HEAVY_MODULES = ('torch', 'ultralytics', 'onnxruntime', 'mediapipe')
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run_importtime(args, env=None, timeout=60):
+    """
+    Run python -X importtime with args from the repo root.
+
+    Returns:
+        (stdout, imports, seconds): imports maps top-level module names to
+                                    cumulative import time in seconds
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT,
+                          capture_output=True, text=True, timeout=timeout,
+                          env=dict(os.environ, **(env or {})))
+    seconds = time.perf_counter() - start
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    imports = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports[match.group(4)] = int(match.group(2)) / 1e6
+    return proc.stdout, imports, seconds
+
+
+def test_core_imports_are_light():
+    _, imports, _ = run_importtime(['-c', 'import config, core.pipeline, core.detector_factory, '
+                                          'core.remote, core.load_shedder'])
+
+    heavy = sorted(name for name in imports if name.split('.')[0] in HEAVY_MODULES)
+    slowest = sorted(imports.items(), key=lambda item: -item[1])[:5]
+    print("Slowest imports: " + ", ".join(f"{name} {sec * 1000:.0f} ms" for name, sec in slowest))
+    assert not heavy, f"Heavy modules imported by core: {heavy[:10]}"
+
+
+def test_config_does_not_import_cv2():
+    _, imports, _ = run_importtime(['-c', 'import config'])
+    assert 'cv2' not in imports
+
+
+def test_first_paint_budget():
+    pytest.importorskip("PyQt6.QtWidgets")
+
+    stdout, imports, seconds = run_importtime(['gui_app.py', '--startup-check'],
+                                              env={'QT_QPA_PLATFORM': 'offscreen'})
+    match = re.search(r"First paint after ([\d.]+)s", stdout)
+    assert match, f"No first paint reported: {stdout[-500:]}"
+
+    print(f"First paint after {match.group(1)}s in-process, {seconds:.2f}s including interpreter start")
+    heavy = sorted(name for name in imports if name.split('.')[0] in HEAVY_MODULES)
+    assert not heavy, f"Heavy modules imported before first paint: {heavy[:10]}"
+    assert seconds <= STARTUP_PAINT_BUDGET_SEC, \
+        f"First paint took {seconds:.2f}s (budget {STARTUP_PAINT_BUDGET_SEC}s)"
+
+
+if __name__ == "__main__":
+    for test in (test_core_imports_are_light, test_config_does_not_import_cv2,
+                 test_first_paint_budget):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,182 @@
+"""
+Tests for the split-process deployment (core/supervisor.py, core/stages.py):
+the relay between stage queues, restarting a crashed stage, and the
+analysis stage keeping bench history across an ROI edit.
+
+The supervisor tests spawn small fake stages (imported from this file by
+the stage processes), so no camera, model or GUI is needed.
+"""
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import core.supervisor as supervisor
+from config import SUPERVISOR_RESTART_DELAY
+from core.stages import analysis_stage, drain, put_latest
+
+ROI_A = {'x': 0.0, 'y': 0.0, 'w': 0.5, 'h': 1.0}
+ROI_B = {'x': 0.5, 'y': 0.0, 'w': 0.5, 'h': 1.0}
+RECT = (0, 0, 100, 100)
+
+
+def fake_inference(control, keypoints_out):
+    """Producer: one numbered item every 20 ms"""
+    count = 0
+    while not any(msg[0] == 'stop' for msg in drain(control)):
+        put_latest(keypoints_out, ('tick', count))
+        count += 1
+        time.sleep(0.02)
+
+
+def fake_analysis(control, keypoints_in, states_out):
+    """Consumer: forwards items tagged with its pid and ROI version; exits(3) on 'crash'"""
+    rois_version = None
+    while True:
+        for msg in drain(control):
+            if msg[0] == 'stop':
+                return
+            if msg[0] == 'crash':
+                os._exit(3)
+            if msg[0] == 'rois':
+                rois_version = msg[1]
+        try:
+            item = keypoints_in.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        put_latest(states_out, (os.getpid(), rois_version, item))
+
+
+FAKE_STAGES = {
+    'inference': 'test_supervisor:fake_inference',
+    'analysis': 'test_supervisor:fake_analysis'
+}
+
+
+def _supervisor():
+    """Supervisor whose inference/analysis stages are the fakes above"""
+    sup = supervisor.Supervisor()
+    sup.inputs['ui'] = sup.ctx.Queue(maxsize=4)  # Stands in for the GUI stage
+    sup.rois, sup.rois_version = [ROI_A], 1
+    return sup
+
+
+def _next_from(sup, pid, timeout=30.0):
+    """Next relayed item that the analysis process `pid` produced"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            item = sup.inputs['ui'].get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if item[0] == pid:
+            return item
+    raise AssertionError(f"nothing relayed from process {pid}")
+
+
+def test_relay_forwards_between_stages():
+    stages = dict(supervisor.STAGES)
+    supervisor.STAGES.update(FAKE_STAGES)
+    sup = _supervisor()
+    try:
+        sup._start('inference')
+        sup._start('analysis')
+        pid = sup.processes['analysis'].pid
+
+        # inference -> relay -> analysis -> relay -> ui, in order
+        _, version, first = _next_from(sup, pid)
+        _, _, second = _next_from(sup, pid)
+        assert version == 1
+        assert first[0] == 'tick' and second[1] > first[1]
+    finally:
+        sup.shutdown()
+        supervisor.STAGES.update(stages)
+
+
+def test_crashed_stage_is_restarted():
+    stages = dict(supervisor.STAGES)
+    supervisor.STAGES.update(FAKE_STAGES)
+    sup = _supervisor()
+    try:
+        sup._start('inference')
+        sup._start('analysis')
+        old = sup.processes['analysis']
+        producer = sup.processes['inference']
+        _next_from(sup, old.pid)
+
+        sup._set_rois([ROI_A, ROI_B])
+        sup.controls['analysis'].put(('crash',))
+        old.join(30.0)
+        assert old.exitcode == 3
+
+        # Restarted only after the delay; the other stages keep running
+        now = time.time()
+        assert sup._check_stages(now)
+        assert sup.processes['analysis'] is old
+        assert sup._check_stages(now + SUPERVISOR_RESTART_DELAY)
+        new = sup.processes['analysis']
+        assert new is not old and new.is_alive()
+        assert sup.processes['inference'] is producer and producer.is_alive()
+
+        # The running producer now feeds the new process through fresh
+        # queues, and the current ROIs were replayed to it
+        _, version, item = _next_from(sup, new.pid)
+        assert version == 2 and item[0] == 'tick'
+    finally:
+        sup.shutdown()
+        supervisor.STAGES.update(stages)
+
+
+def _analyze(keypoints_in, states_out, message):
+    """Send one keypoints message until the stage has picked up its ROI version"""
+    for _ in range(20):
+        keypoints_in.put(message)
+        try:
+            return states_out.get(timeout=0.5)[2]
+        except queue.Empty:
+            continue  # Read before the ROI change and dropped as stale
+    raise AssertionError("analysis stage published nothing")
+
+
+def test_analysis_keeps_history_across_roi_edit():
+    control, keypoints_in, states_out = queue.Queue(), queue.Queue(), queue.Queue()
+    cwd = os.getcwd()
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)  # The stage's FailureLogger writes its CSV to the working directory
+    stage = threading.Thread(target=analysis_stage, args=(control, keypoints_in, states_out), daemon=True)
+    stage.start()
+    try:
+        info = {'analyzed': True, 'inferred': True, 'tracked': False,
+                'activity': 'ACTIVE', 'keypoints_time': 1.0}
+        control.put(('rois', 1, [ROI_A]))
+        results = _analyze(keypoints_in, states_out, ('keypoints', 1, 1.0, [(1, RECT, None, info)]))
+        assert results[0]['state'] == 'NO_POSE' and results[0]['activity'] == 'ACTIVE'
+
+        # A bench is added and bench 1 is not re-analyzed on this frame: it
+        # keeps its state instead of starting over
+        reused = dict(info, analyzed=False, inferred=False, activity='EMPTY')
+        control.put(('rois', 2, [ROI_A, ROI_B]))
+        results = _analyze(keypoints_in, states_out,
+                           ('keypoints', 2, 2.0, [(1, RECT, None, reused), (2, RECT, None, info)]))
+        assert [r['id'] for r in results] == [1, 2]
+        assert results[0]['state'] == 'NO_POSE'
+        assert results[0]['inferred'] is False and results[0]['activity'] == 'EMPTY'
+        assert results[1]['roi'] == ROI_B
+    finally:
+        control.put(('stop',))
+        stage.join(5.0)
+        os.chdir(cwd)
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    for test in (test_relay_forwards_between_stages, test_crashed_stage_is_restarted,
+                 test_analysis_keeps_history_across_roi_edit):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,100 @@
+"""
+Top-down pipeline tests (core/pipeline.py with a person detector).
+
+Runs BenchPipeline with fake pose and person detectors on blank frames and
+counts the calls each one gets, so no model is needed.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import TARGET_FPS, TOPDOWN_REDETECT_SEC
+from core.pipeline import BenchPipeline
+from core.scheduler import InferenceScheduler
+from core.motion import MotionGate
+from core.tracker import KeypointTracker
+
+ROI = {'x': 0.1, 'y': 0.1, 'w': 0.5, 'h': 0.8}
+FRAMES = int(TOPDOWN_REDETECT_SEC * TARGET_FPS) // 2  # All within one box refresh period
+
+
+class FakePose:
+    """17 keypoints in the middle of every crop, none on the frames in `misses`"""
+
+    def __init__(self, misses=()):
+        self.misses = set(misses)
+        self.frame = 0
+        self.calls = []
+
+    def detect_batch(self, frame, rects):
+        self.calls.append(self.frame)
+        if self.frame in self.misses:
+            return [[] for _ in rects]
+        return [[{"id": i, "x_px": int(w * 0.5), "y_px": int(h * (0.2 + 0.035 * i)),
+                  "x": 0.5, "y": 0.2 + 0.035 * i, "visibility": 0.9} for i in range(17)]
+                for _, _, w, h in rects]
+
+
+class FakePersons:
+    """The same lifter box for every ROI (None = empty bench)"""
+
+    def __init__(self, box=(0.3, 0.1, 0.7, 0.9)):
+        self.box = box
+        self.frames = []
+        self.pose = None
+
+    def detect_boxes(self, frame, rects, previous=None):
+        self.frames.append(self.pose.frame)
+        return [self.box for _ in rects]
+
+
+def _run(pose, persons):
+    """Process FRAMES frames with every bench due every frame; returns the states"""
+    persons.pose = pose
+    pipeline = BenchPipeline(pose, scheduler=InferenceScheduler(enabled=False, priority=False),
+                             motion_gate=MotionGate(enabled=False), tracker=KeypointTracker('off'),
+                             person_detector=persons)
+    pipeline.set_rois([ROI])
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    states = []
+    for idx in range(FRAMES):
+        pose.frame = idx
+        states.append(pipeline.process(frame, idx / TARGET_FPS)[0]['state'])
+    return states
+
+
+def test_lost_lifter_is_found_on_next_frame():
+    pose, persons = FakePose(misses={3}), FakePersons()
+    states = _run(pose, persons)
+    print(f"states: {states}, person detections on frames {persons.frames}")
+
+    # Frame 3: pose misses in the box and again after the same-frame refresh
+    assert states[3] == 'NO_POSE'
+    assert pose.calls.count(3) == 2
+    # Frame 4: the lost box is looked for again, then posed - not left
+    # without a pose call until the box goes stale
+    assert persons.frames == [0, 3, 4]
+    assert set(range(FRAMES)) <= set(pose.calls)
+    assert all(state != 'NO_POSE' for state in states[4:])
+
+
+def test_empty_bench_waits_for_redetect_period():
+    pose, persons = FakePose(), FakePersons(box=None)
+    states = _run(pose, persons)
+
+    # Nobody found: one person detection per TOPDOWN_REDETECT_SEC, no pose call
+    assert persons.frames == [0]
+    assert pose.calls == []
+    assert all(state == 'NO_POSE' for state in states)
+
+
+if __name__ == "__main__":
+    for test in (test_lost_lifter_is_found_on_next_frame, test_empty_bench_waits_for_redetect_period):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
@@ -0,0 +1,144 @@
+"""
+Keypoint tracker tests (core/tracker.py).
+
+Runs the tracker the way BenchPipeline does - detect when needs_detection()
+says so, otherwise track and fall back to a detection below
+TRACKER_MIN_CONFIDENCE - on a steady lift, and counts the bridged frames.
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# Setup path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import TARGET_FPS, TRACKER_DETECT_INTERVAL, TRACKER_MIN_CONFIDENCE
+from core.tracker import KeypointTracker, ANALYZER_KEYPOINTS
+
+ROI_SIZE = 200
+FRAMES = 60
+WARMUP = 2 * TRACKER_DETECT_INTERVAL  # Kalman needs two detections to learn the velocity
+
+
+class FakeAnalyzer:
+    def __init__(self, near=False):
+        self.near = near
+
+    def near_danger(self):
+        return self.near
+
+
+def _landmarks(points):
+    """MediaPipe-style landmark list with the analyzer keypoints at `points` (ROI-normalized)"""
+    lm_list = [{"x": 0.5, "y": 0.5, "x_px": 100, "y_px": 100, "visibility": 0.1} for _ in range(33)]
+    for idx, (x, y) in zip(ANALYZER_KEYPOINTS, points):
+        lm_list[idx] = {"x": x, "y": y, "x_px": int(x * ROI_SIZE), "y_px": int(y * ROI_SIZE),
+                        "visibility": 0.9}
+    return lm_list
+
+
+def _lift(idx):
+    """Shoulders and wrists of a bar pressed up at a constant 0.2 ROI/s"""
+    rise = 0.2 * idx / TARGET_FPS
+    return [(0.4, 0.6), (0.6, 0.6), (0.35, 0.7 - rise), (0.65, 0.7 - rise)]
+
+
+def _texture():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (2 * ROI_SIZE, 2 * ROI_SIZE, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 2)
+
+
+def _panning(idx, texture):
+    """ROI crop of a texture panning up 1 px per frame, and where the points moved to"""
+    top = 50 - idx
+    crop = np.ascontiguousarray(texture[50 + idx:50 + idx + ROI_SIZE, 100:100 + ROI_SIZE])
+    points = [(0.3, 0.5), (0.7, 0.5), (0.3, 0.7), (0.7, 0.7)]
+    return crop, [(x, y + (top - 50) / ROI_SIZE) for x, y in points]
+
+
+def _run(tracker, frame_at, analyzer=None):
+    """
+    Pipeline loop over FRAMES frames.
+
+    Returns:
+        (trace, error): 'D' (detected) or 'T' (bridged) per frame; largest
+                        tracked-vs-true keypoint error (ROI units)
+    """
+    bench = {"track": None, "lm_list": [], "analyzer": analyzer or FakeAnalyzer()}
+    trace, error = [], 0.0
+    for idx in range(FRAMES):
+        now = idx / TARGET_FPS
+        roi_img, points = frame_at(idx)
+        if not tracker.needs_detection(bench):
+            lm_list, confidence = tracker.track(bench, roi_img, now)
+            if confidence >= TRACKER_MIN_CONFIDENCE:
+                bench["lm_list"] = lm_list
+                trace.append("T")
+                error = max(error, max(abs(lm_list[k]["x"] - x) + abs(lm_list[k]["y"] - y)
+                                       for k, (x, y) in zip(ANALYZER_KEYPOINTS, points)))
+                continue
+        bench["lm_list"] = _landmarks(points)
+        tracker.reset(bench, bench["lm_list"], roi_img, now)
+        trace.append("D")
+    return "".join(trace), error
+
+
+def _bridged_per_interval(length):
+    """One detection, then TRACKER_DETECT_INTERVAL - 1 bridged frames, repeated"""
+    return (("D" + "T" * (TRACKER_DETECT_INTERVAL - 1)) * length)[:length]
+
+
+def test_kalman_bridges_interval():
+    blank = np.zeros((ROI_SIZE, ROI_SIZE, 3), dtype=np.uint8)
+    trace, error = _run(KeypointTracker("kalman"), lambda idx: (blank, _lift(idx)))
+    print(f"kalman: {trace} (max error {error:.4f})")
+
+    # Velocity is learned by the second detection; from the third on, every
+    # interval is bridged in full
+    start = trace.index("D" + "T" * (TRACKER_DETECT_INTERVAL - 1))
+    assert start <= WARMUP
+    assert trace[start:] == _bridged_per_interval(FRAMES - start)
+    assert error < 0.005
+
+
+def test_lk_bridges_interval():
+    texture = _texture()
+    trace, error = _run(KeypointTracker("lk"), lambda idx: _panning(idx, texture))
+    print(f"lk: {trace} (max error {error:.4f})")
+
+    assert trace == _bridged_per_interval(FRAMES)
+    assert trace.count("T") == FRAMES * (TRACKER_DETECT_INTERVAL - 1) // TRACKER_DETECT_INTERVAL
+    assert error < 0.01
+
+
+def test_lk_falls_back_when_occluded():
+    texture = _texture()
+    occluded = np.full((ROI_SIZE, ROI_SIZE, 3), 128, dtype=np.uint8)
+
+    def frame_at(idx):
+        crop, points = _panning(idx, texture)
+        # Camera covered for frames 1-4: nothing to track, every frame is detected
+        return (occluded if 0 < idx < TRACKER_DETECT_INTERVAL else crop), points
+
+    trace, _ = _run(KeypointTracker("lk"), frame_at)
+    print(f"lk, occluded: {trace}")
+    assert trace[:TRACKER_DETECT_INTERVAL + 1] == "D" * (TRACKER_DETECT_INTERVAL + 1)
+    assert trace[TRACKER_DETECT_INTERVAL:] == _bridged_per_interval(FRAMES - TRACKER_DETECT_INTERVAL)
+
+
+def test_near_danger_always_detects():
+    blank = np.zeros((ROI_SIZE, ROI_SIZE, 3), dtype=np.uint8)
+    for mode in ("lk", "kalman"):
+        trace, _ = _run(KeypointTracker(mode), lambda idx: (blank, _lift(idx)), FakeAnalyzer(near=True))
+        assert trace == "D" * FRAMES
+
+
+if __name__ == "__main__":
+    for test in (test_kalman_bridges_interval, test_lk_bridges_interval,
+                 test_lk_falls_back_when_occluded, test_near_danger_always_detects):
+        print(f"\n--- {test.__name__} ---")
+        test()
+        print("Result: OK")
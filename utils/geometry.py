@@ -46,3 +46,36 @@ def normalize_coordinate(value, dimension):
 def pixel_coordinate(value, dimension):
     """Converts normalized 0-1 to pixel coordinate."""
     return int(value * dimension)
+
+def roi_to_pixels(roi, frame_w, frame_h):
+    """
+    Converts a normalized ROI dict to a pixel rect clamped to the frame.
+    Returns (x, y, w, h) or None if nothing of the ROI is inside the frame.
+    """
+    x = max(0, int(roi['x'] * frame_w))
+    y = max(0, int(roi['y'] * frame_h))
+    w = min(frame_w - x, int(roi['w'] * frame_w))
+    h = min(frame_h - y, int(roi['h'] * frame_h))
+
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
+
+def roi_overlap(a, b):
+    """
+    Intersection of two normalized ROI dicts as a fraction of the smaller
+    one (1.0 when one contains the other, e.g. an ROI tightened in place).
+    """
+    w = max(0.0, min(a['x'] + a['w'], b['x'] + b['w']) - max(a['x'], b['x']))
+    h = max(0.0, min(a['y'] + a['h'], b['y'] + b['h']) - max(a['y'], b['y']))
+    smaller = min(a['w'] * a['h'], b['w'] * b['h'])
+    return w * h / smaller if smaller > 0 else 0.0
+
+def remap_point(x, y, old_roi, new_roi):
+    """
+    Converts a point normalized to old_roi into coordinates normalized to
+    new_roi (both ROIs normalized to the same frame).
+    """
+    frame_x = old_roi['x'] + x * old_roi['w']
+    frame_y = old_roi['y'] + y * old_roi['h']
+    return (frame_x - new_roi['x']) / new_roi['w'], (frame_y - new_roi['y']) / new_roi['h']
@@ -129,6 +129,8 @@ def create_dashboard_panel(stats, height, width=400):
         "Status": "*" if "DANGER" not in str(stats.get("Status", "")).upper() else "!",
         "Debug (d)": "#",
         "Detector": "+",
+        "Benches": "=",
+        "Skipped": "-",
         "Speed": "~"
     }
     